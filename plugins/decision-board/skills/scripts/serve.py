@@ -5,20 +5,62 @@ Render and serve a decision-board board from a JSON spec.
 Default mode opens a tiny HTTP server. The user picks options in the browser,
 clicks Submit, and the server writes the result to disk and shuts itself down.
 With ``--static`` the renderer just writes a self-contained HTML file (no server,
-no Submit, user copies the result back manually — for sharing/archiving).
+no Submit, user copies the result back manually — for sharing/archiving) with
+the spec, CSS and JS inlined.
 
 Usage:
     serve.py <spec.json>                            # serve at http://localhost:7117
     serve.py <spec.json> --port 8080                # different port
     serve.py <spec.json> --output result.json       # explicit result location
     serve.py <spec.json> --static board.html        # write a single HTML file and exit
+    serve.py specs/*.json --check                   # validate many, report timing
+    serve.py specs/ --static out/ --jobs 8          # render a directory of specs
+    serve.py --multi                                # one process, many boards
+    serve.py <spec.json> --attach                   # register with a --multi server
 
 Endpoints (server mode):
-    GET  /                 → board HTML (re-rendered on each request)
-    POST /api/submit       → save the JSON result, then shut down (exit 0)
+    GET  /                 → board shell: the template's markup, linking its
+                             CSS / JS from content-hashed /static/ URLs
+    GET  /static/board.<hash>.{css,js}
+                           → template assets, cached as ``immutable``
+    GET  /api/spec         → the validated spec as JSON (re-read only when
+                             the file changes on disk)
+                             Shell and spec carry ETags and gzip, so a
+                             repeat load is 304s plus two memory-cache hits
+    POST /api/submit       → save the JSON result, then shut down (exit 0).
+                             The body is capped (--max-body) and the file
+                             is replaced atomically, in --result-format
     POST /api/cancel       → user-initiated abort, then shut down (exit 125)
-    POST /api/heartbeat    → liveness ping; if missing for ~60s the server
-                             shuts down on its own (exit 124)
+    POST /api/draft        → autosave: changed picks since the last post,
+                             coalesced and appended to the draft journal
+                             (--draft) about once a second
+    GET  /api/draft        → the saved draft, for the page to restore
+    GET  /api/metrics      → request timing and cache stats (--metrics only)
+    GET  /api/events       → Server-Sent Events stream; the browser's
+                             liveness signal. While one is open the board
+                             can't time out; when the last one closes the
+                             board ends with 124 after a short grace
+                             (--disconnect-grace) unless a tab reconnects.
+                             Spec edits are pushed here as a per-decision
+                             diff (``spec`` event) — no reload needed
+    POST /api/heartbeat    → fallback liveness ping for browsers without
+                             EventSource; if missing for ~60s the server
+                             shuts down on its own (exit 124). Each ping
+                             re-arms one deadline (--heartbeat-timeout)
+
+Both modes run a threaded HTTP/1.1 server with keep-alive, so a slow GET of a
+big board never holds up heartbeats or Submit.
+
+Multi-board mode (``--multi``) mounts the same endpoints per board under
+``/b/<board-id>/`` on one server and adds a control API:
+    POST   /api/boards              → register {"spec", "output"?, "id"?,
+                                       "format"?, "draft"?}
+    GET    /api/boards              → list boards
+    GET    /api/boards/<id>/wait    → long-poll until the board finishes
+    DELETE /api/boards/<id>         → retire a board (pending ones end as 125)
+``--attach`` wraps that API so the agent contract below holds unchanged: it
+registers the spec, prints the same header, blocks, and exits with the
+board's code.
 
 Agent contract:
     On startup the first stdout line is ``RESULT_PATH=<absolute path>``. The
@@ -33,19 +75,31 @@ Stdlib only.
 from __future__ import annotations
 
 import argparse
+import collections
 import datetime as _dt
+import glob
+import gzip
+import hashlib
 import json
+import math
 import os
+import re
+import select
 import signal
-import subprocess
+import socket
 import sys
+import tempfile
 import threading
 import time
 import webbrowser
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import Request, urlopen
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 SKILL_DIR = SCRIPT_DIR.parent
@@ -59,7 +113,24 @@ DEFAULT_PORT = 7117
 # ---------------------------------------------------------------------------
 
 class SpecError(ValueError):
-    """Raised when the spec fails validation."""
+    """Raised when the spec fails validation.
+
+    ``errors`` lists every problem found as ``{"pointer", "message"}``, the
+    pointer being an RFC 6901 JSON pointer into the spec ("" for the root).
+    The message is the single error's text, or all of them, one per line.
+    """
+
+    def __init__(self, message: str, errors: list[dict[str, str]] | None = None):
+        super().__init__(message)
+        self.errors = errors if errors is not None else [{"pointer": "", "message": message}]
+
+    @classmethod
+    def from_errors(cls, errors: list[dict[str, str]]) -> SpecError:
+        if len(errors) == 1:
+            return cls(errors[0]["message"], errors)
+        lines = [f"spec has {len(errors)} errors:"]
+        lines += [f"  {e['pointer'] or '/'}: {e['message']}" for e in errors]
+        return cls("\n".join(lines), errors)
 
 
 def load_spec(path: Path) -> dict[str, Any]:
@@ -78,369 +149,2340 @@ def load_spec(path: Path) -> dict[str, Any]:
 REVERSIBILITY_VALUES = {"easy", "hard"}
 
 
-def validate_spec(spec: dict[str, Any]) -> None:
-    """Validate the spec in place, coercing decision ids to strings."""
+def _pointer(*parts: str | int) -> str:
+    """RFC 6901 JSON pointer from path segments."""
+    return "".join(
+        "/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts
+    )
+
+
+def spec_errors(spec: Any) -> list[dict[str, str]]:
+    """Every validation error in the spec, in document order, in one pass.
+
+    Never raises. Checks that depend on a broken parent (the options of a
+    decision that isn't an object, say) are skipped rather than reported
+    twice. Valid decision ids are coerced to strings in place, as
+    validate_spec always has.
+    """
+    errors: list[dict[str, str]] = []
+
+    def error(message: str, *where: str | int) -> None:
+        errors.append({"pointer": _pointer(*where), "message": message})
+
     if not isinstance(spec, dict):
-        raise SpecError("spec must be a JSON object")
+        error("spec must be a JSON object")
+        return errors
     if not spec.get("title"):
-        raise SpecError("spec.title is required")
+        error("spec.title is required", "title")
     decisions = spec.get("decisions")
     if not isinstance(decisions, list) or not decisions:
-        raise SpecError("spec.decisions must be a non-empty array")
+        error("spec.decisions must be a non-empty array", "decisions")
+        decisions = []
 
     seen_ids: set[str] = set()
     declared_categories = spec.get("categories")
-    used_categories: set[str] = set()
+    if declared_categories is not None and not isinstance(declared_categories, list):
+        error("spec.categories must be an array of strings", "categories")
+        declared_categories = None
 
+    # Pointer segments are spelled out in each error() call rather than kept
+    # in per-decision tuples: the happy path builds nothing it won't use.
     for index, decision in enumerate(decisions):
-        loc = f"decisions[{index}]"
         if not isinstance(decision, dict):
-            raise SpecError(f"{loc} must be an object")
+            error(f"decisions[{index}] must be an object", "decisions", index)
+            continue
         title = decision.get("title")
         # locator used in error messages downstream — prefer human-readable title
-        where = f"decision {title!r}" if title else f"{loc}"
+        where = f"decision {title!r}" if title else f"decisions[{index}]"
         if "id" not in decision:
-            raise SpecError(f"{where} is missing 'id'")
-        # accept int or string id; coerce to string for result map alignment
-        raw_id = decision["id"]
-        if not isinstance(raw_id, (str, int)) or isinstance(raw_id, bool):
-            raise SpecError(
-                f"{where} has invalid id {raw_id!r}: must be a string or integer"
-            )
-        sid = str(raw_id)
-        if not sid:
-            raise SpecError(f"{where} has empty id")
-        if sid in seen_ids:
-            raise SpecError(f"{where} has duplicate id={sid!r}")
-        seen_ids.add(sid)
-        decision["id"] = sid  # coerce in place so downstream uses string consistently
+            error(f"{where} is missing 'id'", "decisions", index, "id")
+        else:
+            # accept int or string id; coerce to string for result map alignment
+            raw_id = decision["id"]
+            sid = str(raw_id)
+            if not isinstance(raw_id, (str, int)) or isinstance(raw_id, bool):
+                error(
+                    f"{where} has invalid id {raw_id!r}: must be a string or integer",
+                    "decisions", index, "id",
+                )
+            elif not sid:
+                error(f"{where} has empty id", "decisions", index, "id")
+            elif sid in seen_ids:
+                error(f"{where} has duplicate id={sid!r}", "decisions", index, "id")
+            else:
+                seen_ids.add(sid)
+                decision["id"] = sid  # downstream uses string ids
         if not title:
-            raise SpecError(f"{where} is missing 'title'")
+            error(f"{where} is missing 'title'", "decisions", index, "title")
         options = decision.get("options")
         if not isinstance(options, list) or not options:
-            raise SpecError(f"{where} has no options")
+            error(f"{where} has no options", "decisions", index, "options")
+            options = []
         seen_keys: set[str] = set()
         for opt_index, option in enumerate(options):
             if not isinstance(option, dict):
-                raise SpecError(
-                    f"{where} option #{opt_index} must be an object"
+                error(
+                    f"{where} option #{opt_index} must be an object",
+                    "decisions", index, "options", opt_index,
                 )
+                continue
             key = option.get("key")
             if not key or not isinstance(key, str):
-                raise SpecError(
-                    f"{where} option #{opt_index} is missing a 'key' (non-empty string)"
+                error(
+                    f"{where} option #{opt_index} is missing a 'key' (non-empty string)",
+                    "decisions", index, "options", opt_index, "key",
                 )
-            opt_where = f"{where} option {key!r}"
-            if key in seen_keys:
-                raise SpecError(f"{opt_where} has duplicate key within this decision")
-            seen_keys.add(key)
+                opt_where = f"{where} option #{opt_index}"
+            elif key in seen_keys:
+                opt_where = f"{where} option {key!r}"
+                error(
+                    f"{opt_where} has duplicate key within this decision",
+                    "decisions", index, "options", opt_index, "key",
+                )
+            else:
+                opt_where = None  # only built if an error needs it
+                seen_keys.add(key)
             if not option.get("label"):
-                raise SpecError(f"{opt_where} is missing 'label'")
+                opt_where = opt_where or f"{where} option {key!r}"
+                error(
+                    f"{opt_where} is missing 'label'",
+                    "decisions", index, "options", opt_index, "label",
+                )
             reversibility = option.get("reversibility")
             if reversibility is not None and reversibility not in REVERSIBILITY_VALUES:
-                raise SpecError(
+                opt_where = opt_where or f"{where} option {key!r}"
+                error(
                     f"{opt_where} has invalid reversibility {reversibility!r}: "
-                    f"must be one of {sorted(REVERSIBILITY_VALUES)}"
+                    f"must be one of {sorted(REVERSIBILITY_VALUES)}",
+                    "decisions", index, "options", opt_index, "reversibility",
                 )
         category = decision.get("category")
-        if category:
-            used_categories.add(category)
-
-    if declared_categories is not None:
-        if not isinstance(declared_categories, list):
-            raise SpecError("spec.categories must be an array of strings")
-        unused = used_categories - set(declared_categories)
-        if unused:
-            raise SpecError(
-                "decisions reference categories not in spec.categories: "
-                + ", ".join(sorted(unused))
+        # a list, not a set: categories are few and may hold unhashable junk
+        if category and declared_categories is not None and category not in declared_categories:
+            error(
+                f"{where} references category {category!r}, which is not in spec.categories",
+                "decisions", index, "category",
             )
+    return errors
+
 
+def validate_spec(spec: dict[str, Any]) -> None:
+    """Validate the spec in place, coercing decision ids to strings.
+
+    Raises one SpecError carrying every problem (see spec_errors).
+    """
+    errors = spec_errors(spec)
+    if errors:
+        raise SpecError.from_errors(errors)
 
-def render_html_from_spec(spec_path: Path) -> str:
-    spec = load_spec(spec_path)
-    validate_spec(spec)
 
-    if not TEMPLATE_PATH.is_file():
-        raise SpecError(f"template not found: {TEMPLATE_PATH}")
+def read_template(template_path: Path = TEMPLATE_PATH) -> str:
+    """The board template, checked for the spec placeholder."""
+    if not template_path.is_file():
+        raise SpecError(f"template not found: {template_path}")
 
-    template = TEMPLATE_PATH.read_text(encoding="utf-8")
+    template = template_path.read_text(encoding="utf-8")
     if SPEC_PLACEHOLDER not in template:
         raise SpecError(
             f"template missing the {SPEC_PLACEHOLDER!r} marker — was it edited?"
         )
+    return template
+
+
+def inline_spec(template: str, spec: dict[str, Any]) -> str:
+    """Inline an already-validated spec into a template from read_template()."""
     payload = json.dumps(spec, ensure_ascii=False, indent=2)
     return template.replace(SPEC_PLACEHOLDER, f"const SPEC = {payload};")
 
 
-# ---------------------------------------------------------------------------
-# Server
-# ---------------------------------------------------------------------------
+def render_html(spec: dict[str, Any], template_path: Path = TEMPLATE_PATH) -> str:
+    """Inline an already-validated spec into the board template."""
+    return inline_spec(read_template(template_path), spec)
+
 
-def kill_port(port: int) -> None:
-    """Best-effort: free a port held by a previous run."""
+def check_spec(path: Path) -> dict[str, Any]:
+    """Load and validate one spec, timing each step. Never raises.
+
+    Returns ``{"spec", "ok", "error", "errors", "parse_ms", "validate_ms"}``
+    where ``errors`` is SpecError.errors (empty when ok); ``validate_ms`` is
+    None when the spec didn't parse.
+    """
+    report: dict[str, Any] = {
+        "spec": str(path), "ok": False, "error": None, "errors": [],
+        "parse_ms": None, "validate_ms": None,
+    }
+    start = time.perf_counter()
     try:
-        result = subprocess.run(
-            ["lsof", "-ti", f":{port}"],
-            capture_output=True, text=True, timeout=5,
-        )
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        return
-    for pid_str in result.stdout.strip().splitlines():
-        pid_str = pid_str.strip()
-        if not pid_str:
-            continue
-        try:
-            os.kill(int(pid_str), signal.SIGTERM)
-        except (ProcessLookupError, ValueError):
-            continue
+        spec = load_spec(path)
+    except SpecError as exc:
+        report["error"], report["errors"] = str(exc), exc.errors
+        return report
+    finally:
+        report["parse_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    start = time.perf_counter()
+    errors = spec_errors(spec)
+    report["validate_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    if errors:
+        report["error"], report["errors"] = str(SpecError.from_errors(errors)), errors
+    else:
+        report["ok"] = True
+    return report
 
 
-class BoardHandler(BaseHTTPRequestHandler):
-    """Serves the board and accepts the Submit POST."""
+def spec_diff(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """What the browser needs to turn ``old`` into ``new`` in place.
 
-    # Exit codes used to communicate termination cause back to the agent.
-    # See SKILL.md "Result schema" — these are part of the agent contract.
-    EXIT_SUBMITTED = 0
-    EXIT_HEARTBEAT_TIMEOUT = 124
-    EXIT_USER_CANCELLED = 125
+    Only decisions that changed are sent whole; ``order`` lists every id so
+    additions, removals and reordering all apply from one message. Top-level
+    fields (title, subtitle, categories…) go in ``set`` / ``unset``.
+    """
+    old_by_id = {d["id"]: d for d in old["decisions"]}
+    new_ids = [d["id"] for d in new["decisions"]]
+    new_set = set(new_ids)
+    return {
+        "set": {
+            k: v for k, v in new.items()
+            if k != "decisions" and old.get(k) != v
+        },
+        "unset": [k for k in old if k != "decisions" and k not in new],
+        "decisions": [d for d in new["decisions"] if old_by_id.get(d["id"]) != d],
+        "removed": [i for i in old_by_id if i not in new_set],
+        "order": new_ids,
+    }
 
-    def __init__(
-        self,
-        spec_path: Path,
-        result_path: Path,
-        state: dict,
-        *args,
-        **kwargs,
-    ):
-        self.spec_path = spec_path
-        self.result_path = result_path
-        # Shared state across handler instances: last heartbeat time + exit code.
-        self._state = state
-        super().__init__(*args, **kwargs)
 
-    def _send_json(self, status: int, payload: dict) -> None:
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store")
-        self.end_headers()
-        self.wfile.write(body)
+def _stat_key(path: Path) -> tuple[int, int, int]:
+    st = path.stat()
+    # inode catches editors that save via rename; mtime + size catch in-place writes
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
 
-    def _read_json_body(self) -> dict:
-        length = int(self.headers.get("Content-Length", 0))
-        if length <= 0:
-            return {}
-        return json.loads(self.rfile.read(length))
 
-    def do_GET(self) -> None:  # noqa: N802
-        if self.path in ("/", "/index.html"):
-            try:
-                html = render_html_from_spec(self.spec_path)
-            except (SpecError, OSError) as exc:
-                self.send_error(500, f"Spec error: {exc}")
-                return
-            body = html.encode("utf-8")
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html; charset=utf-8")
-            self.send_header("Content-Length", str(len(body)))
-            self.send_header("Cache-Control", "no-store")
-            self.end_headers()
-            self.wfile.write(body)
-            return
+class Rendered:
+    """One rendered payload: raw bytes, lazily gzipped copy, strong ETag.
 
-        self.send_error(404)
+    ``spec`` is the validated spec the bytes were rendered from, if any.
+    """
 
-    def do_POST(self) -> None:  # noqa: N802
-        if self.path == "/api/heartbeat":
-            # Lightweight liveness ping from the browser. We don't read the
-            # body — presence of the request is the signal. last_seen is used
-            # by the watchdog thread to decide whether the client is gone.
-            self._state["last_seen"] = time.time()
-            self._send_json(200, {"ok": True})
-            return
+    def __init__(self, body: bytes, spec: dict[str, Any] | None = None):
+        self.body = body
+        self.spec = spec
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.etag = f'"{self.digest[:32]}"'
+        # gzip is a different representation, so it gets its own strong tag
+        self.gzip_etag = self.etag[:-1] + '-gz"'
+        self._gzipped: bytes | None = None
 
-        if self.path == "/api/cancel":
-            # Explicit user-initiated cancel (UI button or ESC). Distinct exit
-            # code so the agent can tell "user said no" from "we lost contact"
-            # or "user picked answers".
-            self._send_json(200, {"ok": True, "cancelled": True})
-            self._state["exit_code"] = self.EXIT_USER_CANCELLED
-            threading.Thread(target=self.server.shutdown, daemon=True).start()
-            return
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            # mtime=0 keeps the output byte-stable across re-renders
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
 
-        if self.path != "/api/submit":
-            self.send_error(404)
-            return
 
-        try:
-            data = self._read_json_body()
-        except json.JSONDecodeError as exc:
-            self._send_json(400, {"error": f"invalid JSON: {exc}"})
-            return
+class SpecCache:
+    """The spec as served at ``/api/spec``, rebuilt only when the file changes.
 
-        if not isinstance(data, dict):
-            self._send_json(400, {"error": "expected a JSON object"})
-            return
+    A hit costs one ``stat`` call instead of parse + validate + encode, so
+    reloads and extra tabs stay cheap. Edits to the spec still show up on the
+    next refresh because the key is the file's stat signature.
+    """
+
+    def __init__(self, spec_path: Path):
+        self.spec_path = spec_path
+        self._lock = threading.Lock()
+        self._key: tuple | None = None
+        self._entry: Rendered | None = None
+        self.hits = 0
+        self.misses = 0
 
+    def get(self) -> Rendered:
         try:
-            self.result_path.parent.mkdir(parents=True, exist_ok=True)
-            self.result_path.write_text(
-                json.dumps(data, indent=2, ensure_ascii=False) + "\n",
-                encoding="utf-8",
+            key = _stat_key(self.spec_path)
+        except OSError as exc:
+            raise SpecError(f"cannot stat spec: {exc}") from exc
+        with self._lock:
+            if key == self._key and self._entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                spec = load_spec(self.spec_path)
+                validate_spec(spec)
+                payload = json.dumps(spec, ensure_ascii=False, separators=(",", ":"))
+                self._entry = Rendered(payload.encode("utf-8"), spec)
+                self._key = key
+            return self._entry
+
+
+STYLE_RE = re.compile(r"<style>(.*?)</style>", re.DOTALL)
+SCRIPT_RE = re.compile(r"<script>(.*?)</script>", re.DOTALL)
+
+# Server mode loads the script as a module so it can await the spec before
+# anything reads SPEC; --static keeps the classic inline script.
+SPEC_FETCH = (
+    "const SPEC = await fetch('api/spec', { cache: 'no-cache' })"
+    ".then(r => { if (!r.ok) throw new Error(`spec: HTTP ${r.status}`); return r.json(); });"
+)
+
+
+class BoardAssets:
+    """The template split for server mode: shell markup plus hashed CSS / JS.
+
+    The CSS and JS never embed the spec, so their URLs change only when the
+    template does and browsers can cache them as immutable, across boards.
+    """
+
+    def __init__(self, template: str):
+        style = STYLE_RE.search(template)
+        script = SCRIPT_RE.search(template)
+        if not style or not script or SPEC_PLACEHOLDER not in script.group(1):
+            raise SpecError(
+                "template is missing its <style>, <script> or "
+                f"{SPEC_PLACEHOLDER!r} marker — was it edited?"
             )
+        self.css = Rendered(style.group(1).encode("utf-8"))
+        self.js = Rendered(
+            script.group(1).replace(SPEC_PLACEHOLDER, SPEC_FETCH).encode("utf-8")
+        )
+        self.files = {
+            f"board.{self.css.digest[:12]}.css": (self.css, "text/css; charset=utf-8"),
+            f"board.{self.js.digest[:12]}.js": (self.js, "text/javascript; charset=utf-8"),
+        }
+        css_name, js_name = self.files
+        shell = (
+            template[:style.start()]
+            + f'<link rel="stylesheet" href="/static/{css_name}">'
+            + template[style.end():script.start()]
+            + f'<script type="module" src="/static/{js_name}"></script>'
+            + template[script.end():]
+        )
+        self.shell = Rendered(shell.encode("utf-8"))
+
+
+class TemplateCache:
+    """BoardAssets for one template file, rebuilt when it changes on disk."""
+
+    def __init__(self, template_path: Path = TEMPLATE_PATH):
+        self.template_path = template_path
+        self._lock = threading.Lock()
+        self._key: tuple | None = None
+        self._assets: BoardAssets | None = None
+
+    def get(self) -> BoardAssets:
+        try:
+            key = _stat_key(self.template_path)
         except OSError as exc:
-            self._send_json(500, {"error": f"write failed: {exc}"})
-            return
+            raise SpecError(f"template not found: {self.template_path}") from exc
+        with self._lock:
+            if key != self._key or self._assets is None:
+                template = self.template_path.read_text(encoding="utf-8")
+                self._assets = BoardAssets(template)
+                self._key = key
+            return self._assets
 
-        self._send_json(200, {"ok": True, "saved_to": str(self.result_path)})
-        self._state["exit_code"] = self.EXIT_SUBMITTED
-        # Shutdown must run in a separate thread — calling it from inside a
-        # request handler would deadlock serve_forever().
-        threading.Thread(target=self.server.shutdown, daemon=True).start()
 
-    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
-        return
+# Shared by every board in the process: one template, one set of assets.
+TEMPLATE_CACHE = TemplateCache()
+
+
+def _accepts_gzip(header: str | None) -> bool:
+    """True when an Accept-Encoding header allows gzip (q > 0)."""
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _etag_matches(header: str | None, *etags: str) -> bool:
+    """If-None-Match uses weak comparison: ``W/`` prefixes are ignored."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return any(etag in candidates for etag in etags)
 
 
 # ---------------------------------------------------------------------------
-# CLI
+# Result writing
 # ---------------------------------------------------------------------------
 
-def _timestamped_default(spec_path: Path) -> Path:
-    stamp = _dt.datetime.now().strftime("%Y%m%d-%H%M%S")
-    return spec_path.with_name(f"{spec_path.stem}.{stamp}.result.json")
+RESULT_FORMATS = ("pretty", "compact", "ndjson")
 
 
-def main(argv: list[str] | None = None) -> int:
-    parser = argparse.ArgumentParser(
-        description="Render and serve a decision-board board from a JSON spec.",
-    )
-    parser.add_argument("spec", type=Path, help="Path to the JSON spec")
-    parser.add_argument(
-        "--port", "-p", type=int, default=DEFAULT_PORT,
-        help=f"Server port (default: {DEFAULT_PORT})",
-    )
-    parser.add_argument(
-        "--output", "-o", type=Path, default=None,
-        help="Where to save the submitted result. "
-        "Default: <spec-stem>.<timestamp>.result.json next to the spec.",
-    )
-    parser.add_argument(
-        "--no-open", action="store_true",
-        help="Do not open the browser automatically.",
-    )
-    parser.add_argument(
-        "--static", "-s", type=Path, default=None,
-        help="Skip the server. Render the board to this HTML path and exit.",
-    )
-    args = parser.parse_args(argv)
+def _result_chunks(data: dict[str, Any], result_format: str = "pretty") -> Iterator[str]:
+    """Serialize a submitted result piecewise, never as one big string.
 
-    if not args.spec.is_file():
-        print(f"error: spec not found: {args.spec}", file=sys.stderr)
-        return 2
+    ``pretty`` is indented JSON (the default), ``compact`` is one line.
+    ``ndjson`` writes everything but the decisions on the first line, then
+    one ``{"id": …, "choice": …, "comment": …}`` line per decision, so a
+    reader can stream a large result instead of parsing it whole.
+    """
+    if result_format == "pretty":
+        yield from json.JSONEncoder(ensure_ascii=False, indent=2).iterencode(data)
+        yield "\n"
+        return
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    if result_format == "compact":
+        yield from encoder.iterencode(data)
+        yield "\n"
+        return
+    if result_format != "ndjson":
+        raise ValueError(f"unknown result format {result_format!r}")
+    decisions = data.get("decisions")
+    if not isinstance(decisions, dict):
+        yield from encoder.iterencode(data)
+        yield "\n"
+        return
+    yield from encoder.iterencode({k: v for k, v in data.items() if k != "decisions"})
+    yield "\n"
+    for decision_id, entry in decisions.items():
+        line = {"id": decision_id}
+        if isinstance(entry, dict):
+            line.update(entry)
+        else:
+            line["value"] = entry
+        yield from encoder.iterencode(line)
+        yield "\n"
 
-    try:
-        load_spec(args.spec)
-        validate_spec(load_spec(args.spec))
-    except SpecError as exc:
-        print(f"error: {exc}", file=sys.stderr)
-        return 1
 
-    # ---- static mode ------------------------------------------------------
-    if args.static is not None:
+def write_result(path: Path, data: dict[str, Any], result_format: str = "pretty") -> None:
+    """Write the result atomically in ``result_format``."""
+    _write_atomic(path, _result_chunks(data, result_format))
+
+
+def _write_atomic(path: Path, chunks: Iterable[str]) -> None:
+    """Temp file, fsync, rename over ``path``.
+
+    A reader sees either no file or the whole file — never a prefix left by
+    a crash or a full disk. The temp file lives in the target directory so
+    the final ``os.replace`` is a same-filesystem rename.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
         try:
-            html = render_html_from_spec(args.spec)
-        except SpecError as exc:
-            print(f"error: {exc}", file=sys.stderr)
-            return 1
-        args.static.parent.mkdir(parents=True, exist_ok=True)
-        args.static.write_text(html, encoding="utf-8")
-        print(f"wrote {args.static}")
-        return 0
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
 
-    # ---- server mode ------------------------------------------------------
-    result_path = (args.output or _timestamped_default(args.spec)).resolve()
-
-    # Shared state across handler instances. The handler can write here;
-    # the watchdog thread reads here. We bias toward "client is alive" so
-    # the watchdog doesn't fire before the page even loads.
-    state = {
-        "last_seen": time.time(),
-        "exit_code": None,  # set by Submit (0) or Cancel (125) handler
-    }
-    HEARTBEAT_TIMEOUT = 60  # seconds without a ping before assuming the
-                            # browser is gone (background tabs throttle
-                            # timers, so this is generous on purpose)
 
-    kill_port(args.port)
-    handler = partial(BoardHandler, args.spec, result_path, state)
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename. Not every platform can open a directory; skip there."""
     try:
-        server = HTTPServer(("127.0.0.1", args.port), handler)
-        port = args.port
+        fd = os.open(directory, os.O_RDONLY)
     except OSError:
-        server = HTTPServer(("127.0.0.1", 0), handler)
-        port = server.server_address[1]
-        print(
-            f"warning: port {args.port} unavailable, bound to {port} instead",
-            file=sys.stderr,
-        )
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
-    # Agent contract: first stdout line is machine-parseable so the invoking
-    # agent can capture the result location without scraping pretty output.
-    # Machine-parseable header: result location + bound port, in that order.
-    # The port matters when 7117 was busy and we fell back to an OS-assigned
-    # one — the calling agent needs to know which URL to point the user at.
-    print(f"RESULT_PATH={result_path}", flush=True)
-    print(f"PORT={port}", flush=True)
 
-    url = f"http://localhost:{port}"
-    print()
-    print("  Decision Board")
-    print("  ─────────────────────────────────")
-    print(f"  URL:    {url}")
-    print(f"  Spec:   {args.spec}")
-    print(f"  Result: {result_path}")
-    print()
-    print("  Decide in the browser. Submit when done, Cancel to abort.")
-    print("  Server auto-exits on Submit/Cancel/disconnect.")
-    print()
+DRAFT_FLUSH_DELAY = 1.0  # seconds a draft delta waits for more clicks before
+                         # it is appended (one fsync per burst, not per click)
+
+
+def draft_path_for(result_path: Path) -> Path:
+    """``x.result.json`` → ``x.result.draft.ndjson``, next to the result."""
+    return result_path.with_suffix(".draft.ndjson")
+
 
-    if not args.no_open:
+class DraftJournal:
+    """Append-only log of a board's in-progress picks, so a lost browser
+    doesn't lose them.
+
+    Each NDJSON line is ``{"t": <unix time>, "choices": {<id>: {...}}}`` with
+    only the decisions that changed since the line before; replaying the
+    lines in order gives the draft. ``record`` merges into a pending delta
+    and the first one starts a ``delay`` timer, so a burst of clicks costs
+    one append and one fsync. A journal left by an earlier run is replayed
+    on open (and compacted to one line), which is how a restarted board
+    picks up where the last one stopped.
+    """
+
+    def __init__(self, path: Path, delay: float = DRAFT_FLUSH_DELAY):
+        self.path = path
+        self.delay = delay
+        self._lock = threading.Lock()        # guards the dicts and the timer
+        self._write_lock = threading.Lock()  # serializes appends vs. discard
+        self._choices = self._replay()
+        self._pending: dict[str, Any] = {}
+        self._timer: threading.Timer | None = None
+        self._closed = False
+
+    def _replay(self) -> dict[str, Any]:
         try:
-            webbrowser.open(url)
-        except Exception:
-            pass
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return {}
+        except (OSError, UnicodeDecodeError) as exc:
+            print(f"warning: ignoring unreadable draft {self.path}: {exc}", file=sys.stderr)
+            return {}
+        choices: dict[str, Any] = {}
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a torn last line from a crash mid-append
+            delta = entry.get("choices") if isinstance(entry, dict) else None
+            if isinstance(delta, dict):
+                choices.update(delta)
+        if len(lines) > 1:
+            try:
+                _write_atomic(self.path, [self._line(choices)])
+            except OSError:
+                pass  # still replayable as is
+        return choices
 
-    # Watchdog: if the browser stops sending heartbeats for too long, assume
-    # it's gone (tab closed, browser crashed, network died) and shut down
-    # with exit 124. This is the only way to release the agent that's
-    # blocked on us if the client can't send an explicit cancel.
-    def _watchdog():
-        while True:
-            time.sleep(5)
-            if state["exit_code"] is not None:
-                return  # already terminating via Submit or Cancel
-            if time.time() - state["last_seen"] > HEARTBEAT_TIMEOUT:
-                state["exit_code"] = 124
-                threading.Thread(target=server.shutdown, daemon=True).start()
+    @staticmethod
+    def _line(choices: dict[str, Any]) -> str:
+        entry = {"t": round(time.time(), 3), "choices": choices}
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        """The current draft, including deltas not yet on disk."""
+        with self._lock:
+            return {**self._choices, **self._pending}
+
+    def record(self, delta: dict[str, Any]) -> bool:
+        """Queue changed decisions for the next append. False once closed."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._pending.update(delta)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return True
+
+    def flush(self) -> None:
+        """Append the pending delta now, if there is one."""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                delta, self._pending = self._pending, {}
+                self._choices.update(delta)
+            if not delta:
                 return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(self._line(delta))
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as exc:
+                print(f"warning: draft not saved to {self.path}: {exc}", file=sys.stderr)
 
-    threading.Thread(target=_watchdog, daemon=True).start()
+    def close(self) -> None:
+        """Write what's pending and stop accepting deltas; the file stays."""
+        self.flush()
+        with self._lock:
+            self._closed = True
 
-    try:
-        server.serve_forever()
+    def discard(self) -> None:
+        """Drop the draft for good — the result it led to is on disk."""
+        with self._write_lock:
+            with self._lock:
+                self._closed = True
+                self._pending = {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                print(f"warning: could not remove draft {self.path}: {exc}", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+# Boards
+# ---------------------------------------------------------------------------
+
+# Exit codes used to communicate termination cause back to the agent.
+# See SKILL.md "Result schema" — these are part of the agent contract.
+EXIT_SUBMITTED = 0
+EXIT_HEARTBEAT_TIMEOUT = 124
+EXIT_USER_CANCELLED = 125
+
+HEARTBEAT_TIMEOUT = 60.0  # seconds without a ping before assuming the
+                          # browser is gone (background tabs throttle
+                          # timers, so this is generous on purpose)
+DISCONNECT_GRACE = 3.0    # seconds after the last event stream closes —
+                          # long enough for a page reload to reconnect
+EVENTS_KEEPALIVE = 15.0   # comment line on an idle stream, so a dead peer
+                          # surfaces as a write error
+SPEC_POLL_INTERVAL = 0.5  # seconds between spec stat() checks, only while a
+                          # browser is connected
+
+BOARD_ID_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,63}")
+
+
+class Deadline:
+    """A re-armable one-shot timer.
+
+    One thread sleeps until the deadline; ``arm()`` pushes it out without
+    waking anyone, and ``on_expire`` runs exactly once, at expiry, unless
+    ``cancel()`` came first. With a heartbeat every few seconds the thread
+    wakes about once per timeout period instead of on a fixed poll.
+    ``hold()`` suspends the deadline until the next ``arm()``.
+    """
+
+    def __init__(self, timeout: float, on_expire: Callable[[], None]):
+        self.timeout = timeout
+        self._on_expire = on_expire
+        self._cond = threading.Condition()
+        self._deadline = time.monotonic() + timeout
+        self._cancelled = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def arm(self, timeout: float | None = None) -> None:
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            if deadline < self._deadline:
+                self._cond.notify()  # the waiter is sleeping past the new deadline
+            self._deadline = deadline
+
+    def hold(self) -> None:
+        with self._cond:
+            self._deadline = math.inf
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify()
+
+    def _run(self) -> None:
+        with self._cond:
+            while not self._cancelled:
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(None if remaining == math.inf else remaining)
+            if self._cancelled:
+                return
+            self._cancelled = True
+        self._on_expire()
+
+
+class EventStream:
+    """Pending Server-Sent Events for one connected browser.
+
+    ``push`` may be called from any thread. The handler thread that owns the
+    connection sleeps in ``select`` on the client socket and on ``fileno()``
+    (one end of a socketpair), so it wakes for a message or a disconnect and
+    is otherwise idle.
+    """
+
+    def __init__(self):
+        self._pending: collections.deque[bytes] = collections.deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+    def fileno(self) -> int:
+        return self._wake_r.fileno()
+
+    def push(self, message: bytes) -> None:
+        self._pending.append(message)
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass  # buffer full: a wakeup is already pending
+
+    def drain(self) -> list[bytes]:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+        messages = []
+        while self._pending:
+            messages.append(self._pending.popleft())
+        return messages
+
+    def close(self) -> None:
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+def _sse(event: str, data: Any) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Board:
+    """One spec being decided: render cache, result path, liveness, outcome.
+
+    ``exit_code`` is set once, by whichever of Submit / Cancel / heartbeat
+    timeout comes first. ``done`` fires at the same moment so waiters wake
+    without polling. A Submit claims the board (``try_claim``) before it
+    writes the result, so a second Submit or a late Cancel can't race it.
+    """
+
+    def __init__(
+        self,
+        spec_path: Path,
+        result_path: Path,
+        board_id: str = "",
+        result_format: str = "pretty",
+        draft_path: Path | None = None,
+        spec_cache: SpecCache | None = None,
+    ):
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"unknown result format {result_format!r}")
+        self.id = board_id
+        self.spec_path = spec_path
+        self.result_path = result_path
+        self.result_format = result_format
+        self.draft = DraftJournal(draft_path or draft_path_for(result_path))
+        # Pass the cache that validated the spec at startup so the first GET
+        # is already a hit instead of a second parse.
+        self.spec_cache = spec_cache or SpecCache(spec_path)
+        self.last_seen = time.time()
+        self.exit_code: int | None = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._submitting = False
+        self._liveness: Deadline | None = None
+        self._disconnect_grace = DISCONNECT_GRACE
+        self._streams: set[EventStream] = set()
+        self._watching = False
+
+    def watch(
+        self,
+        timeout: float,
+        on_timeout: Callable[[], None],
+        disconnect_grace: float = DISCONNECT_GRACE,
+    ) -> None:
+        """Start the heartbeat deadline.
+
+        It is armed now, not at the first ping, which biases toward "client
+        is alive" so it doesn't fire before the page even loads.
+        """
+        self._disconnect_grace = disconnect_grace
+        self._liveness = Deadline(timeout, on_timeout)
+
+    def attach(self, stream: EventStream) -> None:
+        """An event stream opened: the browser is there for as long as it lasts."""
+        with self._lock:
+            self._streams.add(stream)
+            start_watcher = not self._watching
+            self._watching = True
+        self.last_seen = time.time()
+        if self._liveness is not None:
+            self._liveness.hold()
+        if start_watcher:
+            # Take the baseline here, before the stream reports "hello", so
+            # an edit made right after connecting is never folded into it.
+            try:
+                baseline = self.spec_cache.get().spec
+            except (SpecError, OSError):
+                baseline = None
+            threading.Thread(
+                target=self._watch_spec, args=(baseline,), daemon=True
+            ).start()
+
+    def detach(self, stream: EventStream) -> None:
+        with self._lock:
+            self._streams.discard(stream)
+            last = not self._streams
+        self.last_seen = time.time()
+        if last and self._liveness is not None:
+            self._liveness.arm(self._disconnect_grace)
+
+    def _watch_spec(self, previous: dict[str, Any] | None) -> None:
+        """Push spec edits to connected browsers as a diff.
+
+        Runs only while at least one event stream is open. Each tick is one
+        stat() through the spec cache; a changed spec is re-validated and
+        encoded once, so the next GET is already a cache hit. An invalid
+        edit is reported and the browsers keep the last good spec.
+        """
+        last_error = None
+        while not self.done.wait(SPEC_POLL_INTERVAL):
+            with self._lock:
+                if not self._streams:
+                    self._watching = False
+                    return
+            try:
+                spec = self.spec_cache.get().spec
+            except (SpecError, OSError) as exc:
+                if str(exc) != last_error:
+                    last_error = str(exc)
+                    self.publish("spec_error", {"error": last_error})
+                continue
+            last_error = None
+            if spec is not previous:
+                if previous is not None:
+                    diff = spec_diff(previous, spec)
+                    edited = (
+                        diff["set"] or diff["unset"] or diff["decisions"]
+                        or diff["order"] != [d["id"] for d in previous["decisions"]]
+                    )
+                    if edited:  # a touch or a no-op save sends nothing
+                        self.publish("spec", diff)
+                previous = spec
+
+    def publish(self, event: str, data: Any) -> None:
+        message = _sse(event, data)
+        with self._lock:
+            streams = list(self._streams)
+        for stream in streams:
+            stream.push(message)
+
+    @property
+    def url_path(self) -> str:
+        return f"/b/{self.id}/" if self.id else "/"
+
+    def heartbeat(self) -> None:
+        self.last_seen = time.time()
+        with self._lock:
+            streaming = bool(self._streams)
+        if self._liveness is not None and not streaming:
+            self._liveness.arm()
+
+    def try_claim(self) -> bool:
+        """Reserve the board for one Submit. False if finished or taken."""
+        with self._lock:
+            if self.exit_code is not None or self._submitting:
+                return False
+            self._submitting = True
+            return True
+
+    def release_claim(self) -> None:
+        """The claiming Submit failed; the board is open again."""
+        with self._lock:
+            self._submitting = False
+
+    def finish(self, exit_code: int) -> bool:
+        """Record the outcome. False if the board had already finished, or
+        a Submit holds the claim and this is any other outcome."""
+        with self._lock:
+            if self.exit_code is not None:
+                return False
+            if self._submitting and exit_code != EXIT_SUBMITTED:
+                return False
+            self.exit_code = exit_code
+        if self._liveness is not None:
+            self._liveness.cancel()
+        # Written before ``done`` fires: once the agent sees 124 the draft
+        # on disk is complete.
+        self.draft.close()
+        self.done.set()
+        self.publish("closed", {"exit_code": exit_code})
+        return True
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "url_path": self.url_path,
+            "spec": str(self.spec_path),
+            "result_path": str(self.result_path),
+            "result_format": self.result_format,
+            "draft_path": str(self.draft.path),
+            "exit_code": self.exit_code,
+        }
+
+
+class BoardRegistry:
+    """The boards one server process answers for.
+
+    Single-board mode mounts one ``root`` board at ``/``. Multi-board mode
+    (no root) mounts each board at ``/b/<id>/`` and adds / retires them at
+    runtime. Every board gets a heartbeat deadline of ``heartbeat_timeout``
+    seconds (None disables it) and ``disconnect_grace`` seconds after its
+    last event stream closes; ``on_finish`` runs once per board, right after
+    its exit code is set.
+    """
+
+    def __init__(
+        self,
+        root: Board | None = None,
+        on_finish: Callable[[Board], None] | None = None,
+        heartbeat_timeout: float | None = HEARTBEAT_TIMEOUT,
+        disconnect_grace: float = DISCONNECT_GRACE,
+    ):
+        self.root = root
+        self.on_finish = on_finish
+        self.heartbeat_timeout = heartbeat_timeout
+        self.disconnect_grace = disconnect_grace
+        self._boards: dict[str, Board] = {}
+        self._lock = threading.Lock()
+        if root is not None:
+            self._watch(root)
+
+    def _watch(self, board: Board) -> None:
+        if self.heartbeat_timeout is not None:
+            board.watch(
+                self.heartbeat_timeout,
+                lambda: self.finish(board, EXIT_HEARTBEAT_TIMEOUT),
+                self.disconnect_grace,
+            )
+
+    @property
+    def multi(self) -> bool:
+        return self.root is None
+
+    def boards(self) -> list[Board]:
+        if self.root is not None:
+            return [self.root]
+        with self._lock:
+            return list(self._boards.values())
+
+    def get(self, board_id: str) -> Board | None:
+        with self._lock:
+            return self._boards.get(board_id)
+
+    def add(
+        self,
+        spec_path: Path,
+        result_path: Path | None = None,
+        board_id: str | None = None,
+        result_format: str = "pretty",
+        draft_path: Path | None = None,
+    ) -> Board:
+        """Validate the spec and mount it. Raises SpecError / ValueError."""
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"unknown result format {result_format!r}")
+        spec_cache = SpecCache(spec_path)
+        spec_cache.get()  # parse + validate once; the board serves this copy
+        with self._lock:
+            if board_id:
+                if not BOARD_ID_RE.fullmatch(board_id):
+                    raise ValueError(f"invalid board id {board_id!r}")
+                if board_id in self._boards:
+                    raise ValueError(f"board id {board_id!r} is already in use")
+            else:
+                base = re.sub(r"[^A-Za-z0-9._-]+", "-", spec_path.stem).strip("-.")
+                base = (base or "board")[:56]
+                board_id, n = base, 1
+                while board_id in self._boards:
+                    n += 1
+                    board_id = f"{base}-{n}"
+            board = Board(
+                spec_path,
+                result_path or _timestamped_default(spec_path),
+                board_id,
+                result_format,
+                draft_path,
+                spec_cache,
+            )
+            self._boards[board_id] = board
+        self._watch(board)
+        return board
+
+    def remove(self, board_id: str) -> Board | None:
+        with self._lock:
+            return self._boards.pop(board_id, None)
+
+    def finish(self, board: Board, exit_code: int) -> None:
+        if board.finish(exit_code) and self.on_finish is not None:
+            self.on_finish(board)
+
+    def resolve(self, path: str) -> tuple[Board | None, str]:
+        """Map a request path to (board, path below the board's mount).
+
+        An empty sub-path means the board root was asked for without its
+        trailing slash; the handler redirects so relative API URLs resolve.
+        """
+        if self.root is not None:
+            return self.root, path
+        if not path.startswith("/b/"):
+            return None, path
+        board_id, slash, rest = path[3:].partition("/")
+        return self.get(board_id), ("/" + rest if slash else "")
+
+
+# ---------------------------------------------------------------------------
+# Metrics (--metrics)
+# ---------------------------------------------------------------------------
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+HEARTBEAT_BUCKETS_S = (1, 2, 5, 10, 15, 30, 45, 60, 90, 120)
+
+# Request paths → a bounded set of labels: board ids and asset hashes vary.
+ROUTE_LABELS = (
+    (re.compile(r"^/b/[^/]+"), "/b/*"),
+    (re.compile(r"^/static/[^/]+$"), "/static/*"),
+    (re.compile(r"^/api/boards/[^/]+"), "/api/boards/*"),
+)
+
+
+def _route_label(method: str, path: str) -> str:
+    for pattern, label in ROUTE_LABELS:
+        path = pattern.sub(label, path)
+    return f"{method} {path}"
+
+
+class Histogram:
+    """Counts per upper bound (plus overflow), with sum and max."""
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (max if overflow)."""
+        n = sum(self.counts)
+        if not n:
+            return None
+        rank, seen = q * n, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        n = sum(self.counts)
+        return {
+            "count": n,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / n, 3) if n else None,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{f"le_{b:g}": c for b, c in zip(self.bounds, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class Metrics:
+    """Opt-in request timing for one server process.
+
+    Each handled request adds its latency (request line parsed → response
+    done) to a per-endpoint histogram along with its status and body size.
+    An event stream's "latency" is how long the stream stayed open, so it is
+    kept apart from the request/response endpoints by its label alone.
+    Heartbeat POSTs also record the gap since the board's previous one —
+    the number to look at before tuning --heartbeat-timeout.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, dict[str, Any]] = {}
+        self._last_heartbeat: dict[str, float] = {}
+        self._heartbeats = Histogram(HEARTBEAT_BUCKETS_S)
+
+    def observe(self, method: str, path: str, status: int, seconds: float, sent: int) -> None:
+        label = _route_label(method, path)
+        with self._lock:
+            entry = self._endpoints.get(label)
+            if entry is None:
+                entry = self._endpoints[label] = {
+                    "status": collections.Counter(),
+                    "bytes": 0,
+                    "latency": Histogram(LATENCY_BUCKETS_MS),
+                }
+            entry["status"][str(status)] += 1
+            entry["bytes"] += sent
+            entry["latency"].observe(seconds * 1000)
+
+    def heartbeat(self, board_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_heartbeat.get(board_id)
+            self._last_heartbeat[board_id] = now
+            if last is not None:
+                self._heartbeats.observe(now - last)
+
+    def snapshot(self, boards: list[Board]) -> dict[str, Any]:
+        hits = sum(b.spec_cache.hits for b in boards)
+        misses = sum(b.spec_cache.misses for b in boards)
+        with self._lock:
+            endpoints = {
+                label: {
+                    "count": sum(e["status"].values()),
+                    "status": dict(e["status"]),
+                    "bytes_sent": e["bytes"],
+                    "latency_ms": e["latency"].snapshot(),
+                }
+                for label, e in sorted(self._endpoints.items())
+            }
+            heartbeats = self._heartbeats.snapshot()
+        not_modified = sum(e["status"].get("304", 0) for e in endpoints.values())
+        return {
+            "uptime_s": round(time.time() - self.started, 3),
+            "requests": sum(e["count"] for e in endpoints.values()),
+            "bytes_sent": sum(e["bytes_sent"] for e in endpoints.values()),
+            "not_modified": not_modified,
+            "spec_cache": {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+            },
+            "heartbeat_interval_s": heartbeats,
+            "endpoints": endpoints,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+MAX_BODY = 4 * 1024 * 1024  # bytes; a board's answers are a few KB, so this
+                            # leaves room for long free-text comments
+PORT_RELEASE_WAIT = 3.0     # seconds to wait for a replaced board to let go
+
+
+class RequestBodyError(Exception):
+    """A request body the handler refuses to read; carries the HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# Which board holds which port. One small JSON file per port, written after
+# a successful bind and removed on exit, so a new run can tell "a stale copy
+# of my own board" (replace it) from "somebody else's board" (leave it alone)
+# without shelling out to lsof.
+
+def lock_dir() -> Path:
+    """Per-user directory for port locks: $XDG_RUNTIME_DIR, else the tmp dir."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and Path(runtime).is_dir():
+        return Path(runtime) / "decision-board"
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return Path(tempfile.gettempdir()) / f"decision-board-{user}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # no harmless probe there (signal 0 is CTRL_C_EVENT)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def read_lock(port: int) -> dict[str, Any] | None:
+    """Who holds ``port``: ``{"pid", "port", "spec", "started"}``, or None.
+
+    A lock whose process is gone is removed on sight.
+    """
+    path = lock_dir() / f"port-{port}.json"
+    try:
+        lock = json.loads(path.read_text(encoding="utf-8"))
+        pid = int(lock["pid"])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        lock, pid = None, 0  # unreadable: treat as stale
+    if lock is None or not _pid_alive(pid):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        return None
+    lock["pid"] = pid
+    return lock
+
+
+def write_lock(port: int, spec_path: Path | None) -> None:
+    """Record this process as the holder of ``port``. Best-effort."""
+    lock = {
+        "pid": os.getpid(),
+        "port": port,
+        "spec": str(spec_path.resolve()) if spec_path is not None else None,
+        "started": round(time.time(), 3),
+    }
+    try:
+        directory = lock_dir()
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _write_atomic(directory / f"port-{port}.json", [json.dumps(lock) + "\n"])
+    except OSError as exc:
+        print(f"warning: could not record port lock: {exc}", file=sys.stderr)
+
+
+def release_lock(port: int) -> None:
+    """Remove ``port``'s lock if this process is the one holding it."""
+    path = lock_dir() / f"port-{port}.json"
+    try:
+        if json.loads(path.read_text(encoding="utf-8")).get("pid") == os.getpid():
+            path.unlink()
+    except (OSError, ValueError, AttributeError):
+        pass
+
+
+def claim_port(
+    server_cls: type[HTTPServer],
+    port: int,
+    handler,
+    spec_path: Path | None,
+    takeover: bool = False,
+) -> tuple[HTTPServer, int]:
+    """Bind ``port`` and record the lock, replacing a holder only on purpose.
+
+    If the port is busy and its lock names the same spec (an earlier run of
+    this board the agent is relaunching) or ``takeover`` is set, the holder
+    gets SIGTERM and we wait briefly for the port. Anything else — another
+    board, or a process we have no lock for — is left running and we fall
+    back to an OS-assigned port, as before.
+    """
+    try:
+        server = server_cls(("127.0.0.1", port), handler)
+    except OSError:
+        server = None
+        holder = read_lock(port)
+        same_spec = (
+            holder is not None
+            and spec_path is not None
+            and holder.get("spec") == str(spec_path.resolve())
+        )
+        if holder is not None and (same_spec or takeover) and holder["pid"] != os.getpid():
+            try:
+                os.kill(int(holder["pid"]), signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            except OSError as exc:
+                print(f"warning: cannot stop pid {holder['pid']}: {exc}", file=sys.stderr)
+            deadline = time.monotonic() + PORT_RELEASE_WAIT
+            while server is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+                try:
+                    server = server_cls(("127.0.0.1", port), handler)
+                except OSError:
+                    pass
+        elif holder is not None:
+            print(
+                f"warning: port {port} is held by another board "
+                f"({holder.get('spec') or 'multi-board server'}, pid {holder['pid']}); "
+                "pass --takeover to replace it",
+                file=sys.stderr,
+            )
+    if server is None:
+        server, port = _bind(server_cls, port, handler)
+    write_lock(port, spec_path)
+    return server, port
+
+
+class _CountingWriter:
+    """Wraps a handler's ``wfile`` and counts the bytes written through it."""
+
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        n = self.raw.write(data)
+        self.written += len(data)  # a failed write raised before this
+        return n
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw, name)
+
+
+class BoardHandler(BaseHTTPRequestHandler):
+    """Serves boards and accepts their Submit / Cancel / heartbeat POSTs."""
+
+    EXIT_SUBMITTED = EXIT_SUBMITTED
+    EXIT_HEARTBEAT_TIMEOUT = EXIT_HEARTBEAT_TIMEOUT
+    EXIT_USER_CANCELLED = EXIT_USER_CANCELLED
+
+    # HTTP/1.1 keeps the browser's connection open between the page load and
+    # the heartbeats. Every response therefore carries a Content-Length, and
+    # every request body is consumed even when ignored. An idle connection
+    # gives its thread back after ``timeout`` seconds.
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+    # Headers and body go out as separate writes; with Nagle on, a small
+    # response on a kept-alive connection waits out the client's delayed ACK
+    # (~40 ms). The benchmark's warm /api/spec on a 10-decision board showed it.
+    disable_nagle_algorithm = True
+    MAX_DISCARD = 64 * 1024
+    READ_CHUNK = 64 * 1024
+
+    def __init__(
+        self,
+        registry: BoardRegistry,
+        *args,
+        max_body: int = MAX_BODY,
+        metrics: Metrics | None = None,
+        **kwargs,
+    ):
+        self.registry = registry
+        self.max_body = max_body
+        self.metrics = metrics
+        super().__init__(*args, **kwargs)
+
+    # ---- request timing (only read when --metrics is on) -------------------
+
+    def setup(self) -> None:
+        super().setup()
+        # Body bytes are counted as written, so event streams count too and a
+        # declared Content-Length that was never sent (HEAD, aborts) doesn't.
+        self.wfile = _CountingWriter(self.wfile)
+
+    def handle_one_request(self) -> None:
+        self._started: float | None = None
+        self._status, self._header_bytes = 0, 0
+        start = self.wfile.written
+        super().handle_one_request()
+        if self.metrics is not None and self._started is not None and self._status:
+            self.metrics.observe(
+                self.command, urlsplit(self.path).path, self._status,
+                time.perf_counter() - self._started,
+                self.wfile.written - start - self._header_bytes,
+            )
+
+    def parse_request(self) -> bool:
+        # The clock starts once the request line is in, so idle keep-alive
+        # time between requests isn't counted as latency.
+        self._started = time.perf_counter()
+        return super().parse_request()
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        self._status = code
+        super().send_response(code, message)
+
+    def end_headers(self) -> None:
+        before = self.wfile.written
+        super().end_headers()
+        self._header_bytes += self.wfile.written - before
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        if self.close_connection:
+            # e.g. an unread oversized body: tell the client not to reuse us
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _content_length(self) -> int:
+        try:
+            return max(0, int(self.headers.get("Content-Length", 0)))
+        except ValueError:
+            return 0
+
+    def _read_body(self) -> bytes:
+        """Read the request body in chunks, refusing anything over ``max_body``.
+
+        The size is checked against Content-Length before a byte is read, so
+        an oversized upload costs nothing; the connection is dropped rather
+        than drained. Bodies without a length (chunked uploads) are refused.
+        """
+        raw = self.headers.get("Content-Length")
+        if raw is None:
+            if self.headers.get("Transfer-Encoding"):
+                self.close_connection = True
+            raise RequestBodyError(411, "Content-Length required")
+        try:
+            length = int(raw)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise RequestBodyError(400, "invalid Content-Length")
+        if length > self.max_body:
+            self.close_connection = True
+            raise RequestBodyError(
+                413, f"request body over {self.max_body} bytes"
+            )
+        body = bytearray()
+        while len(body) < length:
+            chunk = self.rfile.read(min(self.READ_CHUNK, length - len(body)))
+            if not chunk:
+                self.close_connection = True
+                raise RequestBodyError(400, "request body truncated")
+            body += chunk
+        return bytes(body)
+
+    def _read_json_body(self) -> Any:
+        """Parse the body as JSON. Raises RequestBodyError."""
+        body = self._read_body()
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise RequestBodyError(400, f"invalid JSON: {exc}") from None
+
+    def _discard_body(self) -> None:
+        """Consume an ignored request body so the next request parses."""
+        length = self._content_length()
+        if length > self.MAX_DISCARD:
+            self.close_connection = True  # not worth reading; drop the socket
+        elif length:
+            self.rfile.read(length)
+
+    def _send_rendered(
+        self,
+        entry: Rendered,
+        content_type: str,
+        cache_control: str = "no-cache",
+    ) -> None:
+        # no-cache (not no-store): the browser keeps the copy but revalidates
+        # every load, so an unchanged board costs a 304 with an empty body.
+        use_gzip = _accepts_gzip(self.headers.get("Accept-Encoding"))
+        etag = entry.gzip_etag if use_gzip else entry.etag
+        if _etag_matches(self.headers.get("If-None-Match"), entry.etag, entry.gzip_etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+        body = entry.gzipped if use_gzip else entry.body
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlsplit(self.path)
+        if url.path == "/api/metrics":
+            if self.metrics is None:
+                self._send_json(404, {"error": "metrics are off; start with --metrics"})
+            else:
+                self._send_json(200, self.metrics.snapshot(self.registry.boards()))
+            return
+        if self.registry.multi and url.path.startswith("/api/boards"):
+            self._control_get(url.path, parse_qs(url.query))
+            return
+
+        if url.path.startswith("/static/"):
+            try:
+                asset = TEMPLATE_CACHE.get().files.get(url.path[len("/static/"):])
+            except (SpecError, OSError) as exc:
+                self.send_error(500, f"Template error: {exc}")
+                return
+            if asset is None:
+                self.send_error(404)  # stale hash from an edited template
+                return
+            entry, content_type = asset
+            self._send_rendered(
+                entry, content_type, "public, max-age=31536000, immutable"
+            )
+            return
+
+        board, sub = self.registry.resolve(url.path)
+        if board is None:
+            self.send_error(404)
+            return
+        if not sub:
+            self.send_response(301)
+            self.send_header("Location", board.url_path)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if sub in ("/", "/index.html"):
+            try:
+                board.spec_cache.get()  # an invalid spec fails the page, not the fetch
+                entry = TEMPLATE_CACHE.get().shell
+            except (SpecError, OSError) as exc:
+                self.send_error(500, f"Spec error: {exc}")
+                return
+            self._send_rendered(entry, "text/html; charset=utf-8")
+            return
+
+        if sub == "/api/spec":
+            try:
+                entry = board.spec_cache.get()
+            except (SpecError, OSError) as exc:
+                self._send_json(500, {"error": f"spec error: {exc}"})
+                return
+            self._send_rendered(entry, "application/json; charset=utf-8")
+            return
+
+        if sub == "/api/draft":
+            self._send_json(200, {"choices": board.draft.snapshot()})
+            return
+
+        if sub == "/api/events":
+            self._serve_events(board)
+            return
+
+        self.send_error(404)
+
+    def _serve_events(self, board: Board) -> None:
+        """Hold a Server-Sent Events stream open until either side leaves.
+
+        The client never writes on this connection, so the socket turning
+        readable means it closed — that's how a closed tab is noticed
+        immediately instead of after a missed-heartbeat timeout.
+        """
+        if board.exit_code is not None:
+            self._send_json(410, {"error": "board is already closed"})
+            return
+        # No Content-Length on an open-ended body: close the connection
+        # when the stream ends instead of keeping it alive.
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        stream = EventStream()
+        board.attach(stream)
+        try:
+            self.wfile.write(b"retry: 1000\n\n" + _sse("hello", {"board": board.id}))
+            while board.exit_code is None:
+                readable, _, _ = select.select(
+                    [self.connection, stream], [], [], EVENTS_KEEPALIVE
+                )
+                if self.connection in readable:
+                    return  # EOF (tab closed), or stray bytes no stream carries
+                messages = stream.drain()
+                self.wfile.write(b"".join(messages) if messages else b": keepalive\n\n")
+            # finished while we were connected: flush the "closed" event
+            self.wfile.write(b"".join(stream.drain()))
+        except OSError:
+            pass  # reset / broken pipe — the browser is gone either way
+        finally:
+            board.detach(stream)
+            stream.close()
+
+    def do_POST(self) -> None:  # noqa: N802
+        path = urlsplit(self.path).path
+        if self.registry.multi and path == "/api/boards":
+            self._control_add()
+            return
+
+        board, sub = self.registry.resolve(path)
+        if board is None:
+            self._discard_body()
+            self.send_error(404)
+            return
+
+        if sub == "/api/heartbeat":
+            # Lightweight liveness ping from the browser. We don't parse the
+            # body — presence of the request is the signal. last_seen is used
+            # by the watchdog thread to decide whether the client is gone.
+            self._discard_body()
+            board.heartbeat()
+            if self.metrics is not None:
+                self.metrics.heartbeat(board.id)
+            self._send_json(200, {"ok": True})
+            return
+
+        if sub == "/api/cancel":
+            # Explicit user-initiated cancel (UI button or ESC). Distinct exit
+            # code so the agent can tell "user said no" from "we lost contact"
+            # or "user picked answers".
+            self._discard_body()
+            self._send_json(200, {"ok": True, "cancelled": True})
+            self.registry.finish(board, self.EXIT_USER_CANCELLED)
+            return
+
+        if sub not in ("/api/submit", "/api/draft"):
+            self._discard_body()
+            self.send_error(404)
+            return
+
+        if board.exit_code is not None:
+            # Multi-board mode keeps finished boards mounted until retired;
+            # a late Submit must not overwrite what the agent already read.
+            self._discard_body()
+            self._send_json(409, {"error": "board is already closed"})
+            return
+
+        if sub == "/api/draft":
+            self._post_draft(board)
+            return
+
+        try:
+            data = self._read_json_body()
+        except RequestBodyError as exc:
+            self._send_json(exc.status, {"error": str(exc)})
+            return
+
+        if not isinstance(data, dict):
+            self._send_json(400, {"error": "expected a JSON object"})
+            return
+
+        # Two tabs (or a double click) may both get this far: only the one
+        # that claims the board writes the result.
+        if not board.try_claim():
+            self._send_json(409, {"error": "board is already closed"})
+            return
+        try:
+            write_result(board.result_path, data, board.result_format)
+        except OSError as exc:
+            board.release_claim()
+            self._send_json(500, {"error": f"write failed: {exc}"})
+            return
+        board.draft.discard()
+
+        self._send_json(200, {"ok": True, "saved_to": str(board.result_path)})
+        self.registry.finish(board, self.EXIT_SUBMITTED)
+
+    def _post_draft(self, board: Board) -> None:
+        """Autosave: the browser posts the decisions changed since its last
+        post, ``{"choices": {<id>: {...}}}``. Returned before anything hits
+        the disk — the journal coalesces and appends on its own timer."""
+        try:
+            data = self._read_json_body()
+        except RequestBodyError as exc:
+            self._send_json(exc.status, {"error": str(exc)})
+            return
+        choices = data.get("choices") if isinstance(data, dict) else None
+        if not isinstance(choices, dict) or not all(
+            isinstance(v, dict) for v in choices.values()
+        ):
+            self._send_json(400, {"error": "expected {\"choices\": {id: {...}}}"})
+            return
+        if not board.draft.record(choices):
+            self._send_json(409, {"error": "board is already closed"})
+            return
+        self._send_json(202, {"ok": True})
+
+    def do_DELETE(self) -> None:  # noqa: N802
+        self._discard_body()
+        path = urlsplit(self.path).path
+        board_id = path.removeprefix("/api/boards/")
+        if not self.registry.multi or board_id == path or "/" in board_id:
+            self.send_error(404)
+            return
+        board = self.registry.get(board_id)
+        if board is None:
+            self._send_json(404, {"error": f"no board {board_id!r}"})
+            return
+        # Retiring a board the user is still looking at ends it like Cancel,
+        # so anyone waiting on it gets a definite answer.
+        self.registry.finish(board, self.EXIT_USER_CANCELLED)
+        self.registry.remove(board_id)
+        self._send_json(200, board.describe())
+
+    # ---- multi-board control API -------------------------------------------
+
+    def _control_add(self) -> None:
+        # Requiring a JSON content type forces a CORS preflight on any
+        # cross-origin browser request, which this server never answers —
+        # so a web page can't register boards (and pick result paths).
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() != "application/json":
+            self._discard_body()
+            self._send_json(415, {"error": "expected Content-Type: application/json"})
+            return
+        try:
+            data = self._read_json_body()
+        except RequestBodyError as exc:
+            self._send_json(exc.status, {"error": str(exc)})
+            return
+        if not isinstance(data, dict) or not isinstance(data.get("spec"), str):
+            self._send_json(400, {"error": "expected {\"spec\": \"/abs/path.json\"}"})
+            return
+
+        spec_path = Path(data["spec"])
+        output, draft = data.get("output"), data.get("draft")
+        if not spec_path.is_absolute() or any(
+            p is not None and not (isinstance(p, str) and Path(p).is_absolute())
+            for p in (output, draft)
+        ):
+            self._send_json(
+                400, {"error": "spec, output and draft must be absolute paths"}
+            )
+            return
+        if any(
+            data.get(key) is not None and not isinstance(data[key], str)
+            for key in ("id", "format")
+        ):
+            self._send_json(400, {"error": "id and format must be strings"})
+            return
+        try:
+            board = self.registry.add(
+                spec_path,
+                Path(output) if output else None,
+                data.get("id") or None,
+                data.get("format") or "pretty",
+                Path(draft) if draft else None,
+            )
+        except SpecError as exc:
+            self._send_json(400, {"error": str(exc), "errors": exc.errors})
+            return
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        self._send_json(201, board.describe())
+
+    def _control_get(self, path: str, query: dict[str, list[str]]) -> None:
+        if path in ("/api/boards", "/api/boards/"):
+            self._send_json(200, {"boards": [b.describe() for b in self.registry.boards()]})
+            return
+
+        board_id, _, action = path.removeprefix("/api/boards/").partition("/")
+        board = self.registry.get(board_id)
+        if board is None:
+            self._send_json(404, {"error": f"no board {board_id!r}"})
+            return
+        if action == "wait":
+            # Long-poll: hold the request until the board finishes or the
+            # timeout passes. The client re-polls on a null exit_code.
+            try:
+                timeout = float(query.get("timeout", ["30"])[0])
+            except ValueError:
+                timeout = 30.0
+            board.done.wait(max(0.0, min(timeout, 300.0)))
+        elif action:
+            self.send_error(404)
+            return
+        self._send_json(200, board.describe())
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _timestamped_default(spec_path: Path) -> Path:
+    stamp = _dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+    return spec_path.with_name(f"{spec_path.stem}.{stamp}.result.json")
+
+
+def _bind(server_cls: type[HTTPServer], port: int, handler) -> tuple[HTTPServer, int]:
+    """Bind ``port``, or an OS-assigned one if it's taken."""
+    try:
+        return server_cls(("127.0.0.1", port), handler), port
+    except OSError:
+        server = server_cls(("127.0.0.1", 0), handler)
+        bound = server.server_address[1]
+        print(
+            f"warning: port {port} unavailable, bound to {bound} instead",
+            file=sys.stderr,
+        )
+        return server, bound
+
+
+def _duration(text: str) -> float:
+    """argparse type: seconds, or milliseconds with an ``ms`` suffix."""
+    raw = text.strip().lower()
+    scale = 1.0
+    if raw.endswith("ms"):
+        raw, scale = raw[:-2], 0.001
+    elif raw.endswith("s"):
+        raw = raw[:-1]
+    try:
+        value = float(raw) * scale
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r}") from None
+    if value <= 0:
+        raise argparse.ArgumentTypeError("duration must be positive")
+    return value
+
+
+def _size(text: str) -> int:
+    """argparse type: bytes, or with a k / m suffix (binary units)."""
+    raw = text.strip().lower().removesuffix("b")
+    scale = 1
+    if raw[-1:] in ("k", "m"):
+        scale = 1024 if raw[-1] == "k" else 1024 * 1024
+        raw = raw[:-1]
+    try:
+        value = int(float(raw) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}") from None
+    if value <= 0:
+        raise argparse.ArgumentTypeError("size must be positive")
+    return value
+
+
+def _check(paths: list[Path], as_json: bool = False) -> int:
+    """``--check``: validate every spec and list every error in each.
+
+    Text mode prints one line per spec, its errors indented below, then a
+    summary. ``--json`` prints one document instead:
+    ``{"ok", "specs": [check_spec() reports], "summary"}``.
+    """
+    if not paths:
+        print("error: no specs matched", file=sys.stderr)
+        return 2
+    reports = []
+    start = time.perf_counter()
+    for path in paths:
+        report = check_spec(path)
+        reports.append(report)
+        if as_json:
+            continue
+        took = report["parse_ms"] + (report["validate_ms"] or 0.0)
+        if report["ok"]:
+            print(f"ok    {path}  ({took:.2f} ms)")
+            continue
+        print(f"FAIL  {path}  ({took:.2f} ms)")
+        for error in report["errors"]:
+            print(f"      {error['pointer'] or '/'}: {error['message']}")
+    failed = sum(not r["ok"] for r in reports)
+    summary = {
+        "specs": len(reports),
+        "invalid": failed,
+        "errors": sum(len(r["errors"]) for r in reports),
+        "parse_ms": round(sum(r["parse_ms"] for r in reports), 3),
+        "validate_ms": round(sum(r["validate_ms"] or 0.0 for r in reports), 3),
+        "wall_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+    if as_json:
+        json.dump(
+            {"ok": not failed, "specs": reports, "summary": summary},
+            sys.stdout, ensure_ascii=False, indent=2,
+        )
+        print()
+    else:
+        print(
+            f"{summary['specs']} spec(s), {failed} invalid, "
+            f"{summary['errors']} error(s) — parse {summary['parse_ms']:.1f} ms, "
+            f"validate {summary['validate_ms']:.1f} ms, wall {summary['wall_ms']:.1f} ms"
+        )
+    return 1 if failed else 0
+
+
+GLOB_CHARS_RE = re.compile(r"[*?\[]")
+
+
+def expand_specs(inputs: list[Path]) -> list[Path]:
+    """Spec paths from files, directories (their ``*.json``) and globs.
+
+    Result files (``*.result.json``) sitting next to their specs are
+    skipped, and a spec named twice is kept once.
+    """
+    found: list[Path] = []
+    for item in inputs:
+        if item.is_dir():
+            found.extend(sorted(item.glob("*.json")))
+        elif GLOB_CHARS_RE.search(str(item)):
+            # quoted on the command line, or a shell that doesn't glob
+            found.extend(sorted(Path(p) for p in glob.glob(str(item), recursive=True)))
+        else:
+            found.append(item)
+    seen: set[Path] = set()
+    specs = []
+    for path in found:
+        if path.name.endswith(".result.json") or path in seen:
+            continue
+        seen.add(path)
+        specs.append(path)
+    return specs
+
+
+_batch_template: str | None = None
+
+
+def _batch_init(template: str) -> None:
+    global _batch_template
+    _batch_template = template
+
+
+def _render_static(job: tuple[Path, Path]) -> tuple[Path, Path, str | None]:
+    """Pool worker: render one spec to one HTML file. Returns (spec, out, error)."""
+    spec_path, out_path = job
+    try:
+        spec = load_spec(spec_path)
+        validate_spec(spec)
+        _write_atomic(out_path, [inline_spec(_batch_template, spec)])
+    except (SpecError, OSError) as exc:
+        return spec_path, out_path, str(exc)
+    return spec_path, out_path, None
+
+
+def _render_batch(specs: list[Path], out_dir: Path, jobs: int | None) -> int:
+    """``--static DIR`` with several specs: one HTML file per spec.
+
+    The template is read once here and handed to each worker at start-up;
+    specs are then rendered across a process pool (in-process for
+    ``--jobs 1`` or a single spec). Every spec gets an ok / FAIL line and
+    a bad one doesn't stop the rest. Exit 1 if any failed.
+    """
+    try:
+        template = read_template()
+    except SpecError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if not specs:
+        print("error: no specs matched", file=sys.stderr)
+        return 2
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs_list, taken = [], set()
+    for spec_path in specs:
+        name, n = spec_path.stem, 1
+        while name in taken:  # same stem from two directories
+            n += 1
+            name = f"{spec_path.stem}-{n}"
+        taken.add(name)
+        jobs_list.append((spec_path, out_dir / f"{name}.html"))
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(jobs_list)))
+    start = time.perf_counter()
+    if workers == 1:
+        _batch_init(template)
+        results = map(_render_static, jobs_list)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(
+            workers, initializer=_batch_init, initargs=(template,)
+        )
+        # a few chunks per worker: cheap IPC, still balanced if sizes vary
+        chunksize = max(1, len(jobs_list) // (workers * 4))
+        results = pool.map(_render_static, jobs_list, chunksize=chunksize)
+    failed = 0
+    try:
+        for spec_path, out_path, error in results:
+            if error is None:
+                print(f"ok    {spec_path} -> {out_path}")
+            else:
+                failed += 1
+                print(f"FAIL  {spec_path}: {error}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(jobs_list) - failed} rendered, {failed} failed "
+        f"in {elapsed:.2f}s ({workers} job{'s' if workers != 1 else ''})"
+    )
+    return 1 if failed else 0
+
+
+def _print_banner(url: str, spec: Path, result_path: Path) -> None:
+    print()
+    print("  Decision Board")
+    print("  ─────────────────────────────────")
+    print(f"  URL:    {url}")
+    print(f"  Spec:   {spec}")
+    print(f"  Result: {result_path}")
+    print()
+    print("  Decide in the browser. Submit when done, Cancel to abort.")
+    print("  Server auto-exits on Submit/Cancel/disconnect.")
+    print()
+
+
+def _open_browser(url: str, no_open: bool) -> None:
+    if no_open:
+        return
+    try:
+        webbrowser.open(url)
+    except Exception:
+        pass
+
+
+def _control(method: str, url: str, payload: dict | None = None) -> dict:
+    """One call to a --multi server's control API."""
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = Request(
+        url, data=data, method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    with urlopen(request, timeout=330) as response:
+        return json.loads(response.read())
+
+
+def _serve_multi(
+    port: int,
+    heartbeat_timeout: float,
+    disconnect_grace: float,
+    max_body: int = MAX_BODY,
+    takeover: bool = False,
+    metrics: Metrics | None = None,
+    metrics_out: Path | None = None,
+) -> int:
+    def _on_finish(board: Board) -> None:
+        print(f"board {board.id}: exit {board.exit_code}", flush=True)
+
+    registry = BoardRegistry(
+        on_finish=_on_finish,
+        heartbeat_timeout=heartbeat_timeout,
+        disconnect_grace=disconnect_grace,
+    )
+    server, port = claim_port(
+        ThreadingHTTPServer, port,
+        partial(BoardHandler, registry, max_body=max_body, metrics=metrics),
+        None, takeover,
+    )
+    print(f"PORT={port}", flush=True)
+    print()
+    print("  Decision Board (multi-board)")
+    print("  ─────────────────────────────────")
+    print(f"  URL:    http://localhost:{port}/b/<board-id>/")
+    print("  Add boards with: serve.py <spec.json> --attach --port", port)
+    print()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        # Like every exit but Submit, Ctrl+C keeps the drafts: flush picks
+        # still waiting in each journal's coalescing window.
+        for board in registry.boards():
+            registry.finish(board, 130)
+        print()
+        print("  Stopped.")
+    finally:
+        release_lock(port)
+        _dump_metrics(metrics, registry, metrics_out)
+    server.server_close()
+    return 130
+
+
+def _dump_metrics(
+    metrics: Metrics | None, registry: BoardRegistry, path: Path | None
+) -> None:
+    """``--metrics-out``: the final snapshot, written once on the way out."""
+    if metrics is None or path is None:
+        return
+    snapshot = metrics.snapshot(registry.boards())
+    try:
+        _write_atomic(path, [json.dumps(snapshot, indent=2) + "\n"])
+    except OSError as exc:
+        print(f"warning: could not write metrics: {exc}", file=sys.stderr)
+
+
+def _attach(
+    spec: Path,
+    result_path: Path,
+    port: int,
+    no_open: bool,
+    result_format: str = "pretty",
+    draft_path: Path | None = None,
+) -> int:
+    base = f"http://127.0.0.1:{port}"
+    payload = {
+        "spec": str(spec.resolve()),
+        "output": str(result_path),
+        "format": result_format,
+    }
+    if draft_path is not None:
+        payload["draft"] = str(draft_path)
+    try:
+        info = _control("POST", f"{base}/api/boards", payload)
+    except HTTPError as exc:
+        try:
+            message = json.loads(exc.read()).get("error", exc.reason)
+        except (ValueError, AttributeError):
+            message = exc.reason
+        print(f"error: {message}", file=sys.stderr)
+        return 1
+    except (URLError, OSError) as exc:
+        print(f"error: no multi-board server on port {port}: {exc}", file=sys.stderr)
+        return 2
+
+    board_id = info["id"]
+    print(f"RESULT_PATH={info['result_path']}", flush=True)
+    print(f"PORT={port}", flush=True)
+    print(f"DRAFT_PATH={info['draft_path']}", flush=True)
+    url = f"http://localhost:{port}{info['url_path']}"
+    _print_banner(url, spec, Path(info["result_path"]))
+    _open_browser(url, no_open)
+
+    try:
+        while info.get("exit_code") is None:
+            info = _control("GET", f"{base}/api/boards/{board_id}/wait?timeout=30")
+    except KeyboardInterrupt:
+        try:
+            _control("DELETE", f"{base}/api/boards/{board_id}")
+        except (URLError, OSError):
+            pass
+        print()
+        print("  Stopped (no submission).")
+        return 130
+    except (URLError, OSError):
+        # The server went away under us — same as losing the browser.
+        return EXIT_HEARTBEAT_TIMEOUT
+
+    try:
+        _control("DELETE", f"{base}/api/boards/{board_id}")
+    except (URLError, OSError):
+        pass
+    return info["exit_code"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Render and serve a decision-board board from a JSON spec.",
+    )
+    parser.add_argument(
+        "spec", type=Path, nargs="*",
+        help="Path to the JSON spec. --check and --static also take several, "
+        "directories (their *.json) or quoted globs.",
+    )
+    parser.add_argument(
+        "--port", "-p", type=int, default=DEFAULT_PORT,
+        help=f"Server port (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--output", "-o", type=Path, default=None,
+        help="Where to save the submitted result. "
+        "Default: <spec-stem>.<timestamp>.result.json next to the spec.",
+    )
+    parser.add_argument(
+        "--draft", type=Path, default=None, metavar="PATH",
+        help="Autosave journal for in-progress picks. An existing one is "
+        "restored into the board. Default: <result-stem>.draft.ndjson next "
+        "to the result; removed on Submit.",
+    )
+    parser.add_argument(
+        "--result-format", choices=RESULT_FORMATS, default="pretty",
+        help="How the result file is written: indented JSON (default), "
+        "one-line JSON, or NDJSON — a header line, then one line per decision.",
+    )
+    parser.add_argument(
+        "--max-body", type=_size, default=MAX_BODY, metavar="SIZE",
+        help="Largest request body the server reads, e.g. 512k or 8m; bigger "
+        f"ones get 413 (default: {MAX_BODY // (1024 * 1024)}m).",
+    )
+    parser.add_argument(
+        "--takeover", action="store_true",
+        help="If --port is held by another board, stop it and take the port. "
+        "Without this only an earlier run of the same spec is replaced; any "
+        "other holder is left alone and the board moves to a free port.",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Time every request and serve the numbers at /api/metrics: "
+        "per-endpoint latency histograms, bytes sent, spec-cache hit ratio, "
+        "heartbeat intervals.",
+    )
+    parser.add_argument(
+        "--metrics-out", type=Path, default=None, metavar="PATH",
+        help="Write the final metrics as JSON here on exit (implies --metrics).",
+    )
+    parser.add_argument(
+        "--no-open", action="store_true",
+        help="Do not open the browser automatically.",
+    )
+    parser.add_argument(
+        "--static", "-s", type=Path, default=None,
+        help="Skip the server. Render the board to this HTML path and exit. "
+        "With several specs, a directory or a glob, this is an output "
+        "directory and each spec becomes <stem>.html in it.",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=None, metavar="N",
+        help="Worker processes for batch --static (default: CPU count).",
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Only validate the given specs, report per-spec parse / validate "
+        "time, and exit 1 if any is invalid.",
+    )
+    parser.add_argument(
+        "--json", action="store_true",
+        help="With --check: print one JSON document listing every error with "
+        "its JSON-pointer location, instead of text.",
+    )
+    parser.add_argument(
+        "--multi", action="store_true",
+        help="Run a multi-board server (no spec). Boards mount at /b/<id>/.",
+    )
+    parser.add_argument(
+        "--attach", action="store_true",
+        help="Register the spec with the --multi server on --port instead of "
+        "starting a server. Prints the same header and exits with the same "
+        "codes as a standalone board.",
+    )
+    parser.add_argument(
+        "--heartbeat-timeout", type=_duration, default=HEARTBEAT_TIMEOUT,
+        metavar="DURATION",
+        help="End the board with exit 124 after this long without a browser "
+        f"heartbeat. Seconds, or e.g. 250ms (default: {HEARTBEAT_TIMEOUT:g}).",
+    )
+    parser.add_argument(
+        "--disconnect-grace", type=_duration, default=DISCONNECT_GRACE,
+        metavar="DURATION",
+        help="End the board with exit 124 this long after its last browser "
+        "event stream closes, unless one reconnects (e.g. a reload). "
+        f"Seconds, or e.g. 500ms (default: {DISCONNECT_GRACE:g}).",
+    )
+    args = parser.parse_args(argv)
+    metrics = Metrics() if args.metrics or args.metrics_out else None
+
+    if args.json and not args.check:
+        parser.error("--json only applies to --check")
+    if args.check:
+        if not args.spec:
+            parser.error("--check needs at least one spec")
+        if args.multi or args.static is not None or args.attach:
+            parser.error("--check only validates; drop --multi / --static / --attach")
+        return _check(expand_specs(args.spec), args.json)
+
+    if args.multi:
+        if args.spec or args.static is not None or args.attach:
+            parser.error("--multi takes no spec; register boards with --attach")
+        return _serve_multi(
+            args.port, args.heartbeat_timeout, args.disconnect_grace,
+            args.max_body, args.takeover, metrics, args.metrics_out,
+        )
+
+    if not args.spec:
+        parser.error("a spec is required (or use --multi)")
+    if args.static is not None and (
+        len(args.spec) > 1
+        or any(p.is_dir() or GLOB_CHARS_RE.search(str(p)) for p in args.spec)
+    ):
+        if args.attach:
+            parser.error("--static and --attach don't mix")
+        return _render_batch(expand_specs(args.spec), args.static, args.jobs)
+    if len(args.spec) > 1:
+        parser.error("one spec per board (validate several with --check)")
+    spec_path = args.spec[0]
+
+    if not spec_path.is_file():
+        print(f"error: spec not found: {spec_path}", file=sys.stderr)
+        return 2
+
+    # The one parse + validate of this run: static mode renders from it and
+    # the server's first GET is served from the same cache entry.
+    spec_cache = SpecCache(spec_path)
+    try:
+        spec = spec_cache.get().spec
+    except SpecError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    # ---- static mode ------------------------------------------------------
+    if args.static is not None:
+        try:
+            html = render_html(spec)
+        except SpecError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        try:
+            _write_atomic(args.static, [html])
+        except OSError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        print(f"wrote {args.static}")
+        return 0
+
+    # ---- server mode ------------------------------------------------------
+    result_path = (args.output or _timestamped_default(spec_path)).resolve()
+
+    draft_path = args.draft.resolve() if args.draft is not None else None
+
+    if args.attach:
+        return _attach(
+            spec_path, result_path, args.port, args.no_open,
+            args.result_format, draft_path,
+        )
+
+    board = Board(
+        spec_path, result_path,
+        result_format=args.result_format, draft_path=draft_path,
+        spec_cache=spec_cache,
+    )
+    registry = BoardRegistry(
+        root=board,
+        heartbeat_timeout=args.heartbeat_timeout,
+        disconnect_grace=args.disconnect_grace,
+    )
+
+    server, port = claim_port(
+        ThreadingHTTPServer, args.port,
+        partial(BoardHandler, registry, max_body=args.max_body, metrics=metrics),
+        spec_path, args.takeover,
+    )
+    try:
+        return _run_board(
+            server, port, board, spec_path, result_path, args.no_open, registry
+        )
+    finally:
+        release_lock(port)
+        _dump_metrics(metrics, registry, args.metrics_out)
+
+
+def _run_board(
+    server: HTTPServer,
+    port: int,
+    board: Board,
+    spec_path: Path,
+    result_path: Path,
+    no_open: bool,
+    registry: BoardRegistry,
+) -> int:
+    """Announce the board, serve it until it finishes, return its exit code."""
+    # Agent contract: first stdout line is machine-parseable so the invoking
+    # agent can capture the result location without scraping pretty output.
+    # Machine-parseable header: result location + bound port, in that order.
+    # The port matters when 7117 was busy and we fell back to an OS-assigned
+    # one — the calling agent needs to know which URL to point the user at.
+    print(f"RESULT_PATH={result_path}", flush=True)
+    print(f"PORT={port}", flush=True)
+    print(f"DRAFT_PATH={board.draft.path}", flush=True)
+
+    url = f"http://localhost:{port}"
+    _print_banner(url, spec_path, result_path)
+    _open_browser(url, no_open)
+
+    # A newer run of this spec (or --takeover) replaces us with SIGTERM. End
+    # like a lost browser — 124, draft flushed — rather than dying mid-write.
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(
+            signal.SIGTERM,
+            lambda *_: registry.finish(board, EXIT_HEARTBEAT_TIMEOUT),
+        )
+
+    # The server runs on a background thread and the main thread just waits
+    # for the board's outcome, so Submit / Cancel / heartbeat expiry need no
+    # extra thread to stop it — and Ctrl+C still lands here.
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        board.done.wait()
     except KeyboardInterrupt:
+        registry.finish(board, 130)  # flushes the draft; it stays on disk
         print()
         print("  Stopped (no submission).")
+        server.shutdown()
         server.server_close()
         return 130
 
+    server.shutdown()
     server.server_close()
-    # exit_code is set by whichever path triggered shutdown: 0 (Submit),
+    # exit_code is set by whichever path finished the board: 0 (Submit),
     # 125 (Cancel), or 124 (heartbeat timeout).
-    return state["exit_code"] if state["exit_code"] is not None else 0
+    return board.exit_code
 
 
 if __name__ == "__main__":
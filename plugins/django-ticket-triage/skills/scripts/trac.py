@@ -3,19 +3,33 @@
 
 from __future__ import annotations
 
+import csv
+import heapq
+import http.client
+import io
 import json
 import random
 import re
+import sqlite3
 import sys
+import threading
 import time
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from email.message import Message
 from email.utils import parsedate_to_datetime
-from typing import Any
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from urllib.parse import unquote, urlencode, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
 from xml.etree import ElementTree
 
+import http_cache
+
 TRAC_BASE_URL = "https://code.djangoproject.com"
 DEFAULT_TIMEOUT = 30.0
 MAX_RETRIES = 5
@@ -23,6 +37,35 @@ BACKOFF_BASE = 1.0
 BACKOFF_CAP = 30.0
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 HEADERS = {"User-Agent": "django-ticket-triage/0.2.0"}
+MAX_REDIRECTS = 5
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+POOL_MAX_IDLE = 8  # idle keep-alive connections kept per host
+RATE_LIMIT = 10.0  # requests per second per host, shared by all threads
+RATE_BURST = 10
+DEFAULT_WORKERS = 4  # get-many: tickets fetched at once (2 requests each)
+SYNC_DEFAULT_DAYS = 30  # sync: window of a fresh mirror
+TICKET_BACKENDS = ("html", "csv", "auto")
+QUERY_CHUNK = 100  # ticket ids per /query?format=csv request
+QUERY_COLUMNS = [
+    "id", "summary", "reporter", "owner", "component", "version", "severity",
+    "status", "resolution", "keywords", "stage", "has_patch", "time",
+    "changetime", "description",
+]
+
+
+# Ticket page extraction (see parse_ticket_page)
+_OLD_VALUES_RE = re.compile(r"old_values\s*=\s*(?=\{)")
+_SUMMARY_RE = re.compile(r"#\d+\s*\((.+?)\)\s*[–-]")
+_DATE_P_RE = re.compile(
+    r"<p[^>]*>(?P<text>(?:(?!</p>).)*?"
+    r'<a[^>]*class="timeline"[^>]*title="See timeline at (?P<date>[^"]+)"'
+    r"(?:(?!</p>).)*)</p>",
+    re.DOTALL,
+)
+_DIV_TAG_RE = re.compile(r"<(/?)div\b")
+_NEXT_PAGE_RE = re.compile(r'<link\s[^>]*rel="next"')
+_json_decoder = json.JSONDecoder()
+_DC_CREATOR = "{http://purl.org/dc/elements/1.1/}creator"
 
 
 def _strip_html(html: str) -> str:
@@ -64,19 +107,247 @@ def _backoff_delay(attempt: int, retry_after: str | None = None) -> float:
     return exponential + jitter
 
 
+# ---------------------------------------------------------------------------
+# Keep-alive connection pool
+# ---------------------------------------------------------------------------
+
+# Errors that mean an idle pooled connection was closed by the server while
+# we were not looking. A request that hits one of these on a reused
+# connection is resent once on a fresh connection before it counts as a
+# failed attempt.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+_pool: dict[tuple[str, str, str], list[http.client.HTTPConnection]] = {}
+_pool_lock = threading.Lock()
+
+
+class _Proxy:
+    """The HTTP proxy for one URL scheme, from ``*_proxy`` environment vars."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        self.netloc = parts.hostname or ""
+        if parts.port:
+            self.netloc = f"{self.netloc}:{parts.port}"
+        self.headers = {}
+        if parts.username is not None:
+            credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+            self.headers["Proxy-Authorization"] = (
+                "Basic " + b64encode(credentials.encode()).decode("ascii")
+            )
+
+
+def _proxy_for(scheme: str, netloc: str) -> _Proxy | None:
+    """The proxy ``urlopen`` would use for ``scheme://netloc``, if any.
+
+    Honours ``HTTP_PROXY`` / ``HTTPS_PROXY`` and ``NO_PROXY`` the way
+    urllib's ProxyHandler does.
+    """
+    url = getproxies().get(scheme)
+    if not url or proxy_bypass(netloc):
+        return None
+    return _Proxy(url)
+
+
+def _acquire(
+    scheme: str, netloc: str, proxy: _Proxy | None = None
+) -> tuple[http.client.HTTPConnection, bool]:
+    """Return ``(connection, reused)`` for ``scheme://netloc``.
+
+    A connection is owned by one caller at a time; hand it back with
+    ``_release`` once its response has been read in full. Through a proxy,
+    HTTPS is tunnelled with CONNECT and plain HTTP goes to the proxy itself.
+    """
+    with _pool_lock:
+        idle = _pool.get((scheme, netloc, proxy.netloc if proxy else ""))
+        if idle:
+            return idle.pop(), True
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    if proxy is None:
+        return cls(netloc, timeout=DEFAULT_TIMEOUT), False
+    conn = cls(proxy.netloc, timeout=DEFAULT_TIMEOUT)
+    if scheme == "https":
+        conn.set_tunnel(netloc, headers=proxy.headers)
+    return conn, False
+
+
+def _release(
+    scheme: str,
+    netloc: str,
+    conn: http.client.HTTPConnection,
+    proxy: _Proxy | None = None,
+) -> None:
+    with _pool_lock:
+        idle = _pool.setdefault((scheme, netloc, proxy.netloc if proxy else ""), [])
+        if len(idle) < POOL_MAX_IDLE:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+def close_connections() -> None:
+    """Close every idle pooled connection."""
+    with _pool_lock:
+        conns = [conn for idle in _pool.values() for conn in idle]
+        _pool.clear()
+    for conn in conns:
+        conn.close()
+
+
+def _get(
+    url: str, headers: dict[str, str] | None = None
+) -> tuple[int, Message, bytes]:
+    """One GET over a pooled connection, following redirects.
+
+    Returns ``(status, headers, body)`` for 2xx and 304 responses. Raises
+    ``HTTPError`` for 4xx/5xx responses and ``URLError`` for connection
+    failures, like ``urlopen`` does, so the retry loop in ``_send`` treats
+    both clients the same.
+    """
+    request_headers = {**HEADERS, **(headers or {})}
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise URLError(f"unsupported URL scheme: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        proxy = _proxy_for(parts.scheme, parts.netloc)
+        hop_headers = request_headers
+        if proxy is not None and parts.scheme == "http":
+            # A forward proxy takes the absolute URL.
+            path = f"http://{parts.netloc}{path}"
+            hop_headers = {**request_headers, **proxy.headers}
+
+        while True:
+            conn, reused = _acquire(parts.scheme, parts.netloc, proxy)
+            try:
+                conn.request("GET", path, headers=hop_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except _STALE_ERRORS as exc:
+                conn.close()
+                if reused:
+                    continue
+                raise URLError(exc) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            _release(parts.scheme, parts.netloc, conn, proxy)
+
+        location = response.getheader("Location")
+        if response.status in REDIRECT_STATUS_CODES and location:
+            url = urljoin(url, location)
+            continue
+        if response.status >= 400:
+            raise HTTPError(
+                url, response.status, response.reason, response.headers, io.BytesIO(body)
+            )
+        return response.status, response.headers, body
+
+    raise URLError(f"too many redirects: {url}")
+
+
+# ---------------------------------------------------------------------------
+# Per-host rate limiting
+# ---------------------------------------------------------------------------
+
+class _HostLimiter:
+    """Token bucket shared by every thread talking to one host.
+
+    ``acquire`` blocks until a request may go out. ``defer`` holds back all
+    requests to the host, e.g. for a ``Retry-After`` the server sent to any
+    one of them.
+    """
+
+    def __init__(self, rate: float | None, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+        self.not_before = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.not_before:
+                    wait = self.not_before - now
+                elif not self.rate:
+                    return
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                    self.stamp = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def defer(self, seconds: float) -> None:
+        with self.lock:
+            self.not_before = max(self.not_before, time.monotonic() + seconds)
+
+
+_limiters: dict[str, _HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter(netloc: str) -> _HostLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(netloc)
+        if limiter is None:
+            limiter = _limiters[netloc] = _HostLimiter(RATE_LIMIT, RATE_BURST)
+        return limiter
+
+
+def set_rate_limit(rate: float | None, burst: int | None = None) -> None:
+    """Set the per-host request rate (requests/second; ``None`` = unlimited)."""
+    global RATE_LIMIT, RATE_BURST
+    with _limiters_lock:
+        RATE_LIMIT = rate
+        if burst is not None:
+            RATE_BURST = burst
+        _limiters.clear()
+
+
 def _request_bytes(url: str, params: dict[str, Any] | None = None) -> bytes:
-    """Perform HTTP GET with retry/backoff for transient failures."""
+    """Perform HTTP GET through the response cache (see ``http_cache``)."""
     query = urlencode(params or {}, doseq=True)
     full_url = f"{url}?{query}" if query else url
+    return http_cache.fetch(full_url, partial(_send, full_url))
+
+
+def _send(url: str, headers: dict[str, str]) -> tuple[int, Message, bytes]:
+    """Perform HTTP GET with retry/backoff for transient failures."""
+    limiter = _limiter(urlsplit(url).netloc)
 
     for attempt in range(1, MAX_RETRIES + 1):
-        request = Request(full_url, headers=HEADERS, method="GET")
+        limiter.acquire()
         try:
-            with urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
-                return response.read()
+            return _get(url, headers)
         except HTTPError as exc:
             if exc.code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
-                time.sleep(_backoff_delay(attempt, exc.headers.get("Retry-After")))
+                retry_after = exc.headers.get("Retry-After")
+                delay = _backoff_delay(attempt, retry_after)
+                if _parse_retry_after(retry_after) is not None:
+                    # The server asked the whole client to slow down, so
+                    # every thread waits it out, not just this one.
+                    limiter.defer(delay)
+                else:
+                    time.sleep(delay)
                 continue
             raise
         except URLError:
@@ -90,9 +361,15 @@ def _request_text(url: str, params: dict[str, Any] | None = None) -> str:
     return _request_bytes(url, params=params).decode("utf-8", errors="replace")
 
 
-def get_ticket(ticket_id: int) -> dict[str, Any]:
+def get_ticket(ticket_id: int, backend: str = "html") -> dict[str, Any]:
     """
-    Get ticket details by parsing HTML page.
+    Get ticket details.
+
+    Args:
+        ticket_id: Ticket number
+        backend: "html" (default) scrapes the ticket page, "csv" reads
+            the fields from Trac's CSV query export, "auto" tries CSV and
+            falls back to the page. Comments always come from the RSS feed.
 
     Returns:
         {
@@ -115,145 +392,383 @@ def get_ticket(ticket_id: int) -> dict[str, Any]:
                 {"author": "Jacob Walls", "date": "...", "content": "..."}
             ]
         }
+
+        With the CSV backend, dates are as Trac exports them (e.g.
+        "2025-12-20T08:56:37+00:00") and the description is raw wiki text.
+        "auto" can therefore return either format, ticket by ticket.
     """
-    html = _request_text(f"{TRAC_BASE_URL}/ticket/{ticket_id}")
-
-    # Extract old_values from JavaScript
-    old_values = _extract_old_values(html)
-
-    # Extract created and last_modified dates from date div
-    created = None
-    last_modified = None
-    date_block = re.search(r'<div class="date">(.*?)</div>', html, re.DOTALL)
-    if date_block:
-        for m in re.finditer(
-            r"<p[^>]*>(.*?)</p>", date_block.group(1), re.DOTALL
-        ):
-            p_html = m.group(1)
-            # title format: "See timeline at Dec 20, 2025, 8:56:37 AM"
-            link = re.search(
-                r'<a[^>]*class="timeline"[^>]*title="See timeline at ([^"]+)"',
-                p_html,
-            )
-            if link:
-                date_str = link.group(1)
-                p_text = _strip_html(p_html)
-                if "Opened" in p_text:
-                    created = date_str
-                elif "Last modified" in p_text:
-                    last_modified = date_str
-
-    # Extract summary from title
-    summary = ""
-    title_m = re.search(r"<title>(.+?)</title>", html)
-    if title_m:
-        # Format: "#36814 (During migration...) – Django"
-        match = re.search(r"#\d+\s*\((.+?)\)\s*[–-]", title_m.group(1))
-        if match:
-            summary = match.group(1)
-
-    # Extract description
-    description = ""
-    desc_m = re.search(
-        r'<div class="description">.*?<div class="searchable">(.*?)</div>',
-        html,
-        re.DOTALL,
-    )
-    if desc_m:
-        description = _strip_html(desc_m.group(1))
+    if backend not in TICKET_BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}; expected one of {TICKET_BACKENDS}")
 
-    # Parse keywords
-    keywords_str = old_values.get("keywords", "")
-    keywords = [k.strip() for k in keywords_str.split(",") if k.strip()]
+    # The fields and the RSS feed (comments) are independent, so the feed is
+    # fetched in the background meanwhile. If the fields fail, that error is
+    # raised right away and the feed result is dropped; if only the feed
+    # fails, its error is raised once the fields are in.
+    executor = ThreadPoolExecutor(max_workers=1)
+    rss = executor.submit(_request_bytes, f"{TRAC_BASE_URL}/ticket/{ticket_id}?format=rss")
+    try:
+        ticket = _get_ticket_fields(ticket_id, backend)
+    except BaseException:
+        rss.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=False)
 
     # Get comments from RSS (more reliable parsing)
-    comments = _get_comments_from_rss(ticket_id)
+    ticket["comments"] = _parse_rss_comments(rss.result())
+    return ticket
 
+
+def _get_ticket_fields(ticket_id: int, backend: str) -> dict[str, Any]:
+    if backend != "html":
+        try:
+            rows = query_tickets([ticket_id])
+        except (HTTPError, ValueError):
+            # Export disabled or not CSV (e.g. a login page): scrape instead.
+            if backend == "csv":
+                raise
+            rows = {}
+        if ticket_id in rows:
+            return rows[ticket_id]
+        if backend == "csv":
+            raise ValueError(f"ticket {ticket_id} not in the CSV export")
+    return _get_ticket_fields_html(ticket_id)
+
+
+def _ticket_fields(
+    ticket_id: int,
+    summary: str,
+    values: dict[str, str],
+    created: str | None,
+    last_modified: str | None,
+    description: str,
+) -> dict[str, Any]:
+    """The ticket dict shared by the HTML and CSV backends (no comments yet)."""
+    keywords_str = values.get("keywords") or ""
+    keywords = [k.strip() for k in keywords_str.split(",") if k.strip()]
     return {
         "id": ticket_id,
         "summary": summary,
-        "reporter": old_values.get("reporter") or None,
-        "owner": old_values.get("owner") or None,
-        "component": old_values.get("component") or None,
-        "version": old_values.get("version") or None,
-        "severity": old_values.get("severity") or None,
-        "status": old_values.get("status") or None,
-        "resolution": old_values.get("resolution") or None,
+        "reporter": values.get("reporter") or None,
+        "owner": values.get("owner") or None,
+        "component": values.get("component") or None,
+        "version": values.get("version") or None,
+        "severity": values.get("severity") or None,
+        "status": values.get("status") or None,
+        "resolution": values.get("resolution") or None,
         "keywords": keywords,
-        "triage_stage": old_values.get("stage") or None,
-        "has_patch": old_values.get("has_patch") == "1",
+        "triage_stage": values.get("stage") or None,
+        "has_patch": values.get("has_patch") == "1",
         "created": created,
         "last_modified": last_modified,
         "description": description,
-        "comments": comments,
     }
 
 
-def _extract_old_values(html: str) -> dict[str, str]:
-    """Extract old_values JavaScript object from HTML."""
-    # Find old_values assignment and parse as JSON
-    # The object can contain nested braces in string values, so we need careful parsing
-    match = re.search(r"old_values\s*=\s*(\{)", html)
-    if not match:
-        return {}
-
-    start = match.start(1)
-    # Find matching closing brace by tracking brace depth
-    depth = 0
-    in_string = False
-    escape_next = False
-    end = start
-
-    for i, char in enumerate(html[start:], start):
-        if escape_next:
-            escape_next = False
-            continue
-        if char == "\\":
-            escape_next = True
-            continue
-        if char == '"':
-            in_string = not in_string
-            continue
-        if not in_string:
-            if char == "{":
-                depth += 1
-            elif char == "}":
-                depth -= 1
-                if depth == 0:
-                    end = i + 1
-                    break
+# ---------------------------------------------------------------------------
+# CSV backend
+# ---------------------------------------------------------------------------
+
+def query_tickets(ticket_ids: Iterable[int]) -> dict[int, dict[str, Any]]:
+    """
+    Fields of many tickets from Trac's CSV query export.
+
+    One ``/query?format=csv`` request covers up to ``QUERY_CHUNK`` tickets.
+    Tickets that do not exist are simply absent from the result. Comments
+    are not included (see ``get_ticket``).
+
+    Raises:
+        ValueError: the response is not a Trac CSV export
+    """
+    ids = sorted(set(ticket_ids))
+    tickets: dict[int, dict[str, Any]] = {}
+    for i in range(0, len(ids), QUERY_CHUNK):
+        chunk = ids[i:i + QUERY_CHUNK]
+        text = _request_text(
+            f"{TRAC_BASE_URL}/query",
+            params={
+                "format": "csv",
+                "id": ",".join(map(str, chunk)),
+                "col": QUERY_COLUMNS,
+                "max": len(chunk),
+                "order": "id",
+            },
+        )
+        for row in _parse_query_csv(text):
+            try:
+                ticket_id = int(row["id"].lstrip("#"))
+            except (TypeError, ValueError):
+                continue
+            tickets[ticket_id] = _ticket_fields(
+                ticket_id,
+                summary=row.get("summary") or "",
+                values=row,
+                created=row.get("time") or None,
+                last_modified=row.get("changetime") or None,
+                description=(row.get("description") or "").replace("\r\n", "\n").strip(),
+            )
+    return tickets
+
 
+def _parse_query_csv(
+    text: str, required: frozenset[str] = frozenset({"id", "summary"})
+) -> list[dict[str, str]]:
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff"), newline=""))
+    if not reader.fieldnames or not required <= set(reader.fieldnames):
+        raise ValueError("not a Trac CSV export")
     try:
-        return json.loads(html[start:end])
-    except json.JSONDecodeError:
-        return {}
+        return list(reader)
+    except csv.Error as exc:
+        raise ValueError(f"malformed Trac CSV export: {exc}") from exc
+
+
+# ---------------------------------------------------------------------------
+# HTML backend
+# ---------------------------------------------------------------------------
+
+def _get_ticket_fields_html(ticket_id: int) -> dict[str, Any]:
+    """Ticket fields scraped from the ticket page."""
+    page = parse_ticket_page(_request_text(f"{TRAC_BASE_URL}/ticket/{ticket_id}"))
+    return _ticket_fields(
+        ticket_id,
+        page["summary"],
+        page["old_values"],
+        page["created"],
+        page["last_modified"],
+        page["description"],
+    )
+
+
+def parse_ticket_page(html: str) -> dict[str, Any]:
+    """
+    Extract summary, dates, description and old_values from a ticket page.
+
+    Each element is located with a literal substring search (``str.find``,
+    or a pattern with a literal prefix), which is much cheaper than regex
+    alternation over the same text, and decoded in place: ``pos``/``endpos``
+    and ``raw_decode`` instead of slicing the page. All four sit at the top
+    of the page, so the change history, most of a long ticket's page, is
+    never scanned.
+    """
+    page: dict[str, Any] = {
+        "summary": "",
+        "created": None,
+        "last_modified": None,
+        "description": "",
+        "old_values": {},
+    }
+
+    start = html.find("<title>")
+    if start >= 0:
+        end = html.find("</title>", start)
+        # Format: "#36814 (During migration...) – Django"
+        summary = _SUMMARY_RE.search(html, start, end if end >= 0 else len(html))
+        if summary:
+            page["summary"] = summary.group(1)
+
+    start = html.find('<div class="date">')
+    if start >= 0:
+        end = html.find("</div>", start)
+        for p in _DATE_P_RE.finditer(html, start, end if end >= 0 else len(html)):
+            # title format: "See timeline at Dec 20, 2025, 8:56:37 AM"
+            text = _strip_html(p.group("text"))
+            if "Opened" in text:
+                page["created"] = p.group("date")
+            elif "Last modified" in text:
+                page["last_modified"] = p.group("date")
+
+    start = html.find('<div class="description">')
+    if start >= 0:
+        start = html.find('<div class="searchable">', start)
+    if start >= 0:
+        start += len('<div class="searchable">')
+        end, depth = len(html), 1
+        # Nested <div>s inside the description do not end it early.
+        for tag in _DIV_TAG_RE.finditer(html, start):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                end = tag.start()
+                break
+        page["description"] = _strip_html(html[start:end])
+
+    match = _OLD_VALUES_RE.search(html)
+    if match:
+        try:
+            # Decodes in place from the opening brace, without copying the rest.
+            values, _ = _json_decoder.raw_decode(html, match.end())
+        except json.JSONDecodeError:
+            values = None
+        if isinstance(values, dict):
+            page["old_values"] = values
+    return page
 
 
 def _get_comments_from_rss(ticket_id: int) -> list[dict[str, str]]:
     """Get comments from RSS feed (easier to parse)."""
+    return get_comments(ticket_id)
+
+
+def get_comments(
+    ticket_id: int, since: datetime | None = None, limit: int | None = None
+) -> list[dict[str, str]]:
+    """
+    Comments on a ticket, oldest first.
+
+    Args:
+        ticket_id: Ticket number
+        since: Only comments posted at or after this time (naive = UTC)
+        limit: Only the newest ``limit`` comments
+
+    Returns:
+        [{"author": "Jacob Walls", "date": "...", "content": "..."}, ...]
+    """
     content = _request_bytes(f"{TRAC_BASE_URL}/ticket/{ticket_id}?format=rss")
+    return _select_comments(iter_rss_comments(content, since=since), limit)
+
 
-    comments = []
-    root = ElementTree.fromstring(content)
+def iter_rss_comments(
+    content: bytes, since: datetime | None = None
+) -> Iterator[dict[str, str]]:
+    """
+    Stream the comments out of a ticket RSS feed, in feed order.
 
-    # RSS namespaces
-    ns = {"dc": "http://purl.org/dc/elements/1.1/"}
+    Uses ``iterparse`` and drops each ``<item>`` once it has been read, so
+    only one comment's markup is held at a time instead of the whole tree.
+    """
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    channel = None
+    for event, elem in ElementTree.iterparse(io.BytesIO(content), events=("start", "end")):
+        if event == "start":
+            if elem.tag == "channel":
+                channel = elem
+            continue
+        if elem.tag != "item":
+            continue
 
-    for item in root.findall(".//item"):
-        author_elem = item.find("dc:creator", ns)
-        date_elem = item.find("pubDate")
-        desc_elem = item.find("description")
+        author = elem.findtext(_DC_CREATOR) or ""
+        date = elem.findtext("pubDate") or ""
+        description = elem.findtext("description")
+        if channel is not None:
+            channel.remove(elem)
+        elem.clear()
 
-        author = author_elem.text if author_elem is not None else ""
-        date = date_elem.text if date_elem is not None else ""
-        content_text = ""
-        if desc_elem is not None and desc_elem.text:
+        if since is not None:
+            posted = _rss_date(date)
+            if posted is not None and posted < since:
+                continue
+        yield {
+            "author": author,
+            "date": date,
             # Parse HTML content
-            content_text = _strip_html(desc_elem.text)
+            "content": _strip_html(description) if description else "",
+        }
+
+
+def _parse_rss_comments(content: bytes) -> list[dict[str, str]]:
+    return list(iter_rss_comments(content))
+
+
+def _rss_date(value: str) -> datetime | None:
+    try:
+        posted = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return posted if posted.tzinfo else posted.replace(tzinfo=timezone.utc)
+
+
+def _select_comments(
+    comments: Iterable[dict[str, str]], limit: int | None
+) -> list[dict[str, str]]:
+    """All ``comments``, or the newest ``limit`` of them, oldest first.
+
+    Keeps at most ``limit`` comments in memory while streaming; undated
+    comments count as the oldest.
+    """
+    if limit is None:
+        return list(comments)
+    heap: list[tuple[float, int, dict[str, str]]] = []
+    for position, comment in enumerate(comments):
+        posted = _rss_date(comment["date"])
+        item = (posted.timestamp() if posted else float("-inf"), position, comment)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif heap and item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    return [comment for *_, comment in sorted(heap, key=lambda item: item[:2])]
+
+
+def get_many(
+    ticket_ids: Iterable[int],
+    workers: int = DEFAULT_WORKERS,
+    rate: float | None = None,
+    backend: str = "html",
+) -> Iterator[dict[str, Any]]:
+    """
+    Fetch many tickets concurrently, yielding each as soon as it is done.
+
+    Results come in completion order, not input order; duplicate IDs are
+    fetched once. A ticket that cannot be fetched yields
+    ``{"id": <id>, "error": "<message>"}`` instead of stopping the stream.
+
+    Args:
+        ticket_ids: Ticket numbers
+        workers: Tickets in flight at once (each is two requests)
+        rate: Per-host requests/second for this and later calls
+            (default: keep the current ``RATE_LIMIT``)
+        backend: As for ``get_ticket``. With "auto"/"csv" the fields of all
+            tickets are prefetched with ``query_tickets`` so each ticket
+            then costs only its RSS request.
+    """
+    if backend not in TICKET_BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}; expected one of {TICKET_BACKENDS}")
+    if rate is not None:
+        set_rate_limit(rate)
+    ids = list(dict.fromkeys(ticket_ids))
+
+    prefetched: dict[int, dict[str, Any]] = {}
+    if backend != "html":
+        try:
+            prefetched = query_tickets(ids)
+        except (HTTPError, URLError, ValueError):
+            pass  # each ticket falls back on its own in get_ticket
 
-        comments.append({"author": author, "date": date, "content": content_text})
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = {
+            executor.submit(_complete_ticket, ticket_id, prefetched.get(ticket_id), backend):
+                ticket_id
+            for ticket_id in ids
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except (HTTPError, URLError, ValueError, ElementTree.ParseError) as exc:
+                yield {"id": futures[future], "error": str(exc)}
+    finally:
+        # Closing the generator early drops the tickets not started yet.
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    return comments
+
+def _complete_ticket(
+    ticket_id: int, fields: dict[str, Any] | None, backend: str
+) -> dict[str, Any]:
+    if fields is None:
+        return get_ticket(ticket_id, backend)
+    return {**fields, "comments": _get_comments_from_rss(ticket_id)}
+
+
+def parse_ticket_ids(text: str) -> list[int]:
+    """Ticket IDs from free text: whitespace/comma separated, ``#`` optional."""
+    ids = []
+    for token in re.split(r"[\s,]+", text):
+        token = token.strip().lstrip("#")
+        if not token:
+            continue
+        if not token.isdigit():
+            raise ValueError(f"not a ticket id: {token!r}")
+        ids.append(int(token))
+    return ids
 
 
 def search(query: str, max_results: int = 20) -> list[dict[str, Any]]:
@@ -262,22 +777,66 @@ def search(query: str, max_results: int = 20) -> list[dict[str, Any]]:
 
     Args:
         query: Search query (e.g., "ManyToManyField RenameField migration")
-        max_results: Maximum number of results to return
+        max_results: Maximum number of results to return; further result
+            pages are fetched as needed (see ``iter_search``)
 
     Returns:
         [{"id": 36800, "summary": "...", "status": "closed", "resolution": "..."}, ...]
     """
-    html = _request_text(
-        f"{TRAC_BASE_URL}/search",
-        params={"q": query, "noquickjump": "1", "ticket": "on"},
-    )
+    return list(islice(iter_search(query, prefetch=False), max(0, max_results)))
 
-    results = []
+
+def iter_search(
+    query: str, prefetch: bool = True, max_pages: int | None = None
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield Trac search hits lazily, following the result pages (``page=``).
+
+    With ``prefetch`` the next page is requested in the background as soon
+    as the current one has been parsed, so it is usually ready by the time
+    the caller has consumed the current page. Stops after the last page
+    (no ``rel="next"`` link), at ``max_pages``, or when the caller stops
+    iterating.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    pending = None
+    page = 1
+    try:
+        html = _search_page(query, page)
+        while True:
+            results, has_next = _parse_search_page(html)
+            has_next = has_next and bool(results) and page != max_pages
+            if has_next and executor is not None:
+                pending = executor.submit(_search_page, query, page + 1)
+            yield from results
+            if not has_next:
+                return
+            page += 1
+            html = pending.result() if pending is not None else _search_page(query, page)
+            pending = None
+    finally:
+        if pending is not None:
+            pending.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _search_page(query: str, page: int) -> str:
+    params = {"q": query, "noquickjump": "1", "ticket": "on"}
+    if page > 1:
+        params["page"] = str(page)
+    return _request_text(f"{TRAC_BASE_URL}/search", params=params)
+
+
+def _parse_search_page(html: str) -> tuple[list[dict[str, Any]], bool]:
+    """Ticket hits on one search results page, and whether a next page exists."""
+    has_next = _NEXT_PAGE_RE.search(html) is not None
+    results: list[dict[str, Any]] = []
 
     # Find search results - they're in <dl id="results">
     dl_match = re.search(r'<dl id="results">(.*?)</dl>', html, re.DOTALL)
     if not dl_match:
-        return []
+        return results, False
 
     # Each result is a <dt> with a link
     for dt_match in re.finditer(
@@ -317,38 +876,367 @@ def search(query: str, max_results: int = 20) -> list[dict[str, Any]]:
             "status": status,
             "resolution": resolution,
         })
-        if len(results) >= max_results:
-            break
 
-    return results
+    return results, has_next
+
+
+# ---------------------------------------------------------------------------
+# Local mirror (sync / search --local)
+# ---------------------------------------------------------------------------
+
+MIRROR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY,
+    summary TEXT NOT NULL,
+    status TEXT,
+    resolution TEXT,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+    summary, keywords, description, comments, tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS pending (id INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def mirror_path() -> Path:
+    return http_cache.cache_dir() / "trac-mirror.sqlite3"
+
+
+def open_mirror(path: Path | None = None) -> sqlite3.Connection:
+    """Open (creating if needed) the local ticket mirror."""
+    path = path or mirror_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path), timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(MIRROR_SCHEMA)
+    return db
+
+
+def _store_ticket(db: sqlite3.Connection, ticket: dict[str, Any]) -> None:
+    ticket_id = ticket["id"]
+    db.execute(
+        "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            ticket_id,
+            ticket["summary"],
+            ticket["status"],
+            ticket["resolution"],
+            json.dumps(ticket, ensure_ascii=False),
+            time.time(),
+        ),
+    )
+    db.execute("DELETE FROM tickets_fts WHERE rowid = ?", (ticket_id,))
+    db.execute(
+        "INSERT INTO tickets_fts (rowid, summary, keywords, description, comments) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (
+            ticket_id,
+            ticket["summary"],
+            " ".join(ticket["keywords"]),
+            ticket["description"],
+            "\n".join(c["content"] for c in ticket.get("comments", [])),
+        ),
+    )
+    db.execute("DELETE FROM pending WHERE id = ?", (ticket_id,))
+
+
+def changed_ticket_ids(days: int) -> list[int]:
+    """
+    IDs of tickets changed in the last ``days`` days, from the CSV query export.
+
+    The timeline feed would be the obvious source, but its RSS stops at 50
+    events unless asked for more, and Trac clamps ``daysback`` to its
+    ``max_daysback`` setting; a ``changetime`` query has no such limits.
+    """
+    since = datetime.now(timezone.utc).timestamp() - max(0, days) * 86400
+    since_iso = datetime.fromtimestamp(since, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return _query_ids({"changetime": f"{since_iso}.."})
+
+
+def all_ticket_ids() -> list[int]:
+    """Every ticket ID, from the CSV query export."""
+    return _query_ids({"time": "2000-01-01.."})
+
+
+def _query_ids(filters: dict[str, str]) -> list[int]:
+    """IDs of all tickets matching the ``/query`` ``filters``, uncapped."""
+    text = _request_text(
+        f"{TRAC_BASE_URL}/query",
+        params={"format": "csv", "col": "id", **filters, "max": 0, "order": "id"},
+    )
+    ids = []
+    for row in _parse_query_csv(text, required=frozenset({"id"})):
+        try:
+            ids.append(int(row["id"].lstrip("#")))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def sync(
+    db_path: Path | None = None,
+    days: int | None = None,
+    all_tickets: bool = False,
+    workers: int = DEFAULT_WORKERS,
+    progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Bring the local mirror up to date.
+
+    Which tickets are fetched:
+        all_tickets: every ticket (a full rebuild; slow, be patient)
+        days: those changed in the last ``days`` days (``changetime`` query)
+        neither: those changed since the previous sync, or in the last
+            ``SYNC_DEFAULT_DAYS`` days on a fresh mirror
+    Tickets that failed last time are always retried.
+
+    Returns:
+        {"synced": 12, "failed": [36814], "source": "changed", "days": 3,
+         "tickets": 3456}
+    """
+    db = open_mirror(db_path)
+    try:
+        started = time.time()
+        if all_tickets:
+            source, ids = "query", all_ticket_ids()
+        else:
+            if days is None:
+                row = db.execute("SELECT value FROM meta WHERE key = 'last_sync'").fetchone()
+                if row is None:
+                    days = SYNC_DEFAULT_DAYS
+                else:
+                    # Whole days back to the previous sync, plus one for overlap.
+                    days = int((started - float(row[0])) // 86400) + 1
+            source, ids = "changed", changed_ticket_ids(days)
+        ids += [row[0] for row in db.execute("SELECT id FROM pending")]
+
+        synced, failed = 0, []
+        for ticket in get_many(ids, workers=workers, backend="csv"):
+            if "error" in ticket:
+                failed.append(ticket["id"])
+                db.execute("INSERT OR IGNORE INTO pending VALUES (?)", (ticket["id"],))
+            else:
+                _store_ticket(db, ticket)
+                synced += 1
+            db.commit()
+            if progress is not None:
+                progress(ticket)
+
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('last_sync', ?)", (repr(started),)
+            )
+        total = db.execute("SELECT count(*) FROM tickets").fetchone()[0]
+    finally:
+        db.close()
+    result: dict[str, Any] = {"synced": synced, "failed": sorted(failed), "source": source}
+    if source == "changed":
+        result["days"] = days
+    result["tickets"] = total
+    return result
+
+
+def _fts_query(query: str) -> str:
+    """Plain words as an FTS5 query: every word must match (like Trac search)."""
+    words = re.findall(r"\w+", query)
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def search_local(
+    query: str, max_results: int = 20, db_path: Path | None = None
+) -> list[dict[str, Any]]:
+    """
+    Search the local mirror (see ``sync``), best matches first.
+
+    Returns the same shape as ``search``.
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+    db = open_mirror(db_path)
+    try:
+        rows = db.execute(
+            "SELECT t.id, t.summary, t.status, t.resolution FROM tickets_fts f "
+            "JOIN tickets t ON t.id = f.rowid WHERE tickets_fts MATCH ? "
+            "ORDER BY bm25(tickets_fts, 10.0, 5.0, 2.0, 1.0) LIMIT ?",
+            (match, max_results),
+        ).fetchall()
+    finally:
+        db.close()
+    return [
+        {"id": ticket_id, "summary": summary, "status": status or "", "resolution": resolution or ""}
+        for ticket_id, summary, status, resolution in rows
+    ]
 
 
 def main():
     """CLI interface."""
+    try:
+        sys.argv[1:] = http_cache.pop_cli_flags(sys.argv[1:])
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  trac.py get <ticket_id>")
-        print("  trac.py search <query>")
+        print("  trac.py get <ticket_id> [--backend=html|csv|auto]")
+        print("  trac.py get-many [--workers=4] [--rate=10] [--file=ids.txt] [--backend=...]")
+        print("                   [<ticket_id> ...]")
+        print("  trac.py comments <ticket_id> [--since=2025-12-01] [--limit=N]")
+        print("  trac.py search [--limit=20] [--local] [--db=PATH] <query>")
+        print("  trac.py sync [--days=N | --all] [--workers=4] [--db=PATH]")
+        print()
+        print("sync keeps a local SQLite mirror of tickets up to date from Trac queries;")
+        print("search --local queries its full-text index instead of Trac.")
+        print()
+        print("get-many reads IDs from stdin when none are given (or with '-'),")
+        print("and prints one JSON object per line as each ticket finishes.")
+        print()
+        print("Cache flags (any command): --offline --no-cache --cache-ttl=SECONDS")
         sys.exit(1)
 
     command = sys.argv[1]
 
+    backend = "html"
+    for arg in sys.argv[2:]:
+        if arg.startswith("--backend="):
+            backend = arg.split("=", 1)[1]
+            sys.argv.remove(arg)
+            if backend not in TICKET_BACKENDS:
+                print(f"Error: --backend must be one of {', '.join(TICKET_BACKENDS)}")
+                sys.exit(1)
+
     if command == "get":
         if len(sys.argv) < 3:
             print("Error: ticket_id required")
             sys.exit(1)
         ticket_id = int(sys.argv[2])
-        result = get_ticket(ticket_id)
+        result = get_ticket(ticket_id, backend)
         print(json.dumps(result, indent=2, ensure_ascii=False))
 
+    elif command == "comments":
+        ticket_id = None
+        since = None
+        limit = None
+        try:
+            for arg in sys.argv[2:]:
+                if arg.startswith("--since="):
+                    since = datetime.fromisoformat(arg.split("=", 1)[1])
+                elif arg.startswith("--limit="):
+                    limit = int(arg.split("=", 1)[1])
+                else:
+                    ticket_id = int(arg.lstrip("#"))
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        if ticket_id is None:
+            print("Error: ticket_id required")
+            sys.exit(1)
+        results = get_comments(ticket_id, since=since, limit=limit)
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    elif command == "get-many":
+        workers = DEFAULT_WORKERS
+        rate = None
+        texts = []
+        read_stdin = False
+        try:
+            for arg in sys.argv[2:]:
+                if arg.startswith("--workers="):
+                    workers = int(arg.split("=", 1)[1])
+                elif arg.startswith("--rate="):
+                    rate = float(arg.split("=", 1)[1])
+                elif arg.startswith("--file="):
+                    with open(arg.split("=", 1)[1], encoding="utf-8") as f:
+                        texts.append(f.read())
+                elif arg == "-":
+                    read_stdin = True
+                else:
+                    texts.append(arg)
+            if read_stdin or not texts:
+                texts.append(sys.stdin.read())
+            ticket_ids = parse_ticket_ids(" ".join(texts))
+        except (OSError, ValueError) as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        if not ticket_ids:
+            print("Error: ticket_id required")
+            sys.exit(1)
+
+        failed = 0
+        for result in get_many(ticket_ids, workers=workers, rate=rate, backend=backend):
+            failed += "error" in result
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        if failed:
+            sys.exit(1)
+
     elif command == "search":
         if len(sys.argv) < 3:
             print("Error: query required")
             sys.exit(1)
-        query = " ".join(sys.argv[2:])
-        results = search(query)
+        local = False
+        db_path = None
+        limit = None
+        query_parts = []
+        try:
+            for arg in sys.argv[2:]:
+                if arg == "--local":
+                    local = True
+                elif arg.startswith("--limit="):
+                    limit = int(arg.split("=", 1)[1])
+                    if limit <= 0:
+                        raise ValueError("--limit must be a positive number")
+                elif arg.startswith("--db="):
+                    db_path = Path(arg.split("=", 1)[1])
+                else:
+                    query_parts.append(arg)
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        query = " ".join(query_parts)
+        if local:
+            results = search_local(query, max_results=limit or 50, db_path=db_path)
+        else:
+            results = search(query, max_results=limit or 20)
         print(json.dumps(results, indent=2, ensure_ascii=False))
 
+    elif command == "sync":
+        days = None
+        all_tickets = False
+        workers = DEFAULT_WORKERS
+        db_path = None
+        try:
+            for arg in sys.argv[2:]:
+                if arg.startswith("--days="):
+                    days = int(arg.split("=", 1)[1])
+                elif arg == "--all":
+                    all_tickets = True
+                elif arg.startswith("--workers="):
+                    workers = int(arg.split("=", 1)[1])
+                elif arg.startswith("--db="):
+                    db_path = Path(arg.split("=", 1)[1])
+                else:
+                    raise ValueError(f"unknown argument: {arg}")
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+
+        done = 0
+
+        def progress(ticket: dict[str, Any]) -> None:
+            nonlocal done
+            done += 1
+            if done % 50 == 0:
+                print(f"  {done} tickets...", file=sys.stderr, flush=True)
+
+        result = sync(db_path, days=days, all_tickets=all_tickets, workers=workers,
+                      progress=progress)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        if result["failed"]:
+            sys.exit(1)
+
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
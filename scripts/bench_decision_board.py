@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Benchmark decision-board's serve.py on synthetic specs of growing size.
+
+For each size (number of decisions) it generates a spec with long markdown
+fields and measures, in-process:
+
+    parse      load_spec: read + json.loads
+    validate   validate_spec
+    render     inline the spec into the template (what --static writes)
+    encode     the compact JSON + gzip the server sends for /api/spec
+    serve      GET /api/spec over HTTP: cold (first hit: stat, parse,
+               validate, encode) and warm (cache hit), plus the page shell
+    memory     tracemalloc peak across parse + validate + render
+
+Times are milliseconds: the median and the best of ``--repeat`` runs.
+Results are JSON (``--out``, default stdout); ``--compare old.json`` flags
+metrics that got slower than ``--threshold`` and exits 1 if any did.
+
+Usage:
+    python3 scripts/bench_decision_board.py
+    python3 scripts/bench_decision_board.py --sizes 10 1000 --repeat 3 --out new.json
+    python3 scripts/bench_decision_board.py --out new.json --compare old.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "skills" / "decision-board" / "scripts"))
+
+import serve  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+WORDS = (
+    "latency cache schema rollout migration budget review owner fallback "
+    "quota index replica tenant deadline feature risk audit backlog"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# Synthetic specs
+# ---------------------------------------------------------------------------
+
+def _markdown(rng: random.Random, chars: int) -> str:
+    """Roughly ``chars`` of markdown: paragraphs, a list, a code block."""
+    parts: list[str] = []
+    size = 0
+    while size < chars:
+        kind = rng.random()
+        if kind < 0.6:
+            block = " ".join(rng.choice(WORDS) for _ in range(40)).capitalize() + "."
+            block = block.replace(" risk ", " **risk** ", 1)
+        elif kind < 0.85:
+            block = "\n".join(
+                f"- `{rng.choice(WORDS)}` {' '.join(rng.choices(WORDS, k=8))}"
+                for _ in range(4)
+            )
+        else:
+            block = "```python\n" + "\n".join(
+                f"{rng.choice(WORDS)} = {rng.randint(0, 999)}" for _ in range(6)
+            ) + "\n```"
+        parts.append(block)
+        size += len(block) + 2
+    return "\n\n".join(parts)
+
+
+def make_spec(decisions: int, md_chars: int = 1500, seed: int = 0) -> dict[str, Any]:
+    """A valid spec with ``decisions`` decisions, 3 options each."""
+    rng = random.Random(seed)
+    categories = ["infra", "product", "security", "data"]
+    spec: dict[str, Any] = {
+        "title": f"Synthetic board ({decisions} decisions)",
+        "categories": categories,
+        "decisions": [],
+    }
+    for i in range(1, decisions + 1):
+        spec["decisions"].append({
+            "id": i,
+            "title": f"Decision {i}: {' '.join(rng.choices(WORDS, k=5))}",
+            "category": categories[i % len(categories)],
+            "context": _markdown(rng, md_chars),
+            "options": [
+                {
+                    "key": key,
+                    "label": f"Option {key.upper()}",
+                    "reversibility": rng.choice(["easy", "hard"]),
+                    "preview": _markdown(rng, md_chars // 3),
+                }
+                for key in ("a", "b", "c")
+            ],
+        })
+    return spec
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def _timed(fn: Callable[[], Any], repeat: int) -> tuple[dict[str, float], Any]:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median": round(statistics.median(times), 3), "min": round(min(times), 3)}, result
+
+
+def _serve_timings(spec_path: Path, repeat: int) -> dict[str, Any]:
+    board = serve.Board(spec_path, spec_path.with_suffix(".result.json"))
+    registry = serve.BoardRegistry(root=board, heartbeat_timeout=None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(serve.BoardHandler, registry))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = HTTPConnection("127.0.0.1", server.server_address[1], timeout=60)
+
+    def get(path: str, headers: dict[str, str] | None = None) -> int:
+        conn.request("GET", path, headers=headers or {})
+        resp = conn.getresponse()
+        return len(resp.read())
+
+    try:
+        cold, _ = _timed(lambda: get("/api/spec"), 1)
+        warm, size = _timed(lambda: get("/api/spec"), repeat)
+        gz_headers = {"Accept-Encoding": "gzip"}
+        gzip_cold, _ = _timed(lambda: get("/api/spec", gz_headers), 1)
+        gzip_warm, gz_size = _timed(lambda: get("/api/spec", gz_headers), repeat)
+        shell, _ = _timed(lambda: get("/"), repeat)
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+        board.draft.discard()
+    return {
+        "api_spec_cold_ms": cold,
+        "api_spec_warm_ms": warm,
+        "api_spec_gzip_cold_ms": gzip_cold,
+        "api_spec_gzip_warm_ms": gzip_warm,
+        "shell_ms": shell,
+        "api_spec_bytes": size,
+        "api_spec_gzip_bytes": gz_size,
+    }
+
+
+def bench_size(
+    decisions: int, repeat: int, md_chars: int, template: str, workdir: Path
+) -> dict[str, Any]:
+    spec_path = workdir / f"spec-{decisions}.json"
+    spec_path.write_text(json.dumps(make_spec(decisions, md_chars)), encoding="utf-8")
+
+    parse, spec = _timed(lambda: serve.load_spec(spec_path), repeat)
+    validate, _ = _timed(lambda: serve.validate_spec(serve.load_spec(spec_path)), repeat)
+    validate = {  # subtract the parse that had to precede each validate
+        k: round(max(0.0, validate[k] - parse[k]), 3) for k in validate
+    }
+    serve.validate_spec(spec)
+    render, html = _timed(lambda: serve.inline_spec(template, spec), repeat)
+    encode, payload = _timed(
+        lambda: json.dumps(spec, ensure_ascii=False, separators=(",", ":")).encode(),
+        repeat,
+    )
+    compress, _ = _timed(lambda: gzip.compress(payload, compresslevel=6, mtime=0), repeat)
+
+    tracemalloc.start()
+    fresh = serve.load_spec(spec_path)
+    serve.validate_spec(fresh)
+    serve.inline_spec(template, fresh)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "decisions": decisions,
+        "spec_bytes": spec_path.stat().st_size,
+        "html_bytes": len(html.encode("utf-8")),
+        "parse_ms": parse,
+        "validate_ms": validate,
+        "render_ms": render,
+        "encode_ms": encode,
+        "gzip_ms": compress,
+        "peak_memory_kb": round(peak / 1024, 1),
+        **_serve_timings(spec_path, repeat),
+    }
+
+
+def run(sizes: list[int], repeat: int, md_chars: int) -> dict[str, Any]:
+    template = serve.read_template()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            print(f"  {n} decisions...", file=sys.stderr, flush=True)
+            results.append(bench_size(n, repeat, md_chars, template, Path(tmp)))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "md_chars": md_chars,
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+TABLE_COLUMNS = (
+    ("parse_ms", "parse"),
+    ("validate_ms", "validate"),
+    ("render_ms", "render"),
+    ("api_spec_cold_ms", "GET cold"),
+    ("api_spec_warm_ms", "GET warm"),
+)
+
+
+def print_table(report: dict[str, Any]) -> None:
+    header = f"{'decisions':>10} {'spec KB':>9}" + "".join(
+        f" {title:>10}" for _, title in TABLE_COLUMNS
+    ) + f" {'peak KB':>10}"
+    print(header, file=sys.stderr)
+    for row in report["results"]:
+        line = f"{row['decisions']:>10} {row['spec_bytes'] / 1024:>9.0f}"
+        line += "".join(f" {row[key]['median']:>10.2f}" for key, _ in TABLE_COLUMNS)
+        line += f" {row['peak_memory_kb']:>10.0f}"
+        print(line, file=sys.stderr)
+
+
+def compare(old: dict[str, Any], new: dict[str, Any], threshold: float) -> list[str]:
+    """Metrics (median ms, peak memory) more than ``threshold`` worse than ``old``."""
+    old_rows = {row["decisions"]: row for row in old.get("results", [])}
+    regressions = []
+    for row in new["results"]:
+        base = old_rows.get(row["decisions"])
+        if base is None:
+            continue
+        for key, value in row.items():
+            before = base.get(key)
+            if isinstance(value, dict) and isinstance(before, dict):
+                value, before = value.get("median"), before.get("median")
+            elif key != "peak_memory_kb":
+                continue
+            if not before or value is None:
+                continue
+            ratio = value / before
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{row['decisions']} decisions: {key} {before:g} -> {value:g} "
+                    f"({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help=f"Decision counts to benchmark (default: {' '.join(map(str, DEFAULT_SIZES))})",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (default: 5)")
+    parser.add_argument(
+        "--md-chars", type=int, default=1500,
+        help="Markdown length of each decision's context (default: 1500)",
+    )
+    parser.add_argument("--out", type=Path, default=None, help="Write JSON here (default: stdout)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to diff against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="Slowdown ratio that counts as a regression (default: 0.25 = 25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, max(1, args.repeat), args.md_chars)
+    print_table(report)
+    text = json.dumps(report, indent=2) + "\n"
+    if args.out is not None:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("no regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Benchmark django-ticket-triage's ticket page extraction.
+
+Compares the single-pass ``trac.parse_ticket_page`` with the multi-pass
+regex extractor it replaced (kept below as ``regex_extract``) on saved ticket
+pages (``--pages``: files or directories of ``*.html``) or, by default, on
+synthetic pages with a growing number of comments. Each page is also
+checked for the two extractors agreeing on every field.
+
+Times are milliseconds: the median and the best of ``--repeat`` runs.
+
+Usage:
+    python3 scripts/bench_trac_parse.py
+    python3 scripts/bench_trac_parse.py --pages saved-pages/ --repeat 20 --out parse.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import html as html_lib
+import json
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "skills" / "django-ticket-triage" / "scripts"))
+
+import trac  # noqa: E402
+
+DEFAULT_COMMENTS = (0, 10, 100, 500)
+WORDS = (
+    "migration field queryset model admin template cache form lookup "
+    "manager index constraint database backend regression patch"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# Baseline: the regex extractor parse_ticket_page replaced
+# ---------------------------------------------------------------------------
+
+def _legacy_old_values(html: str) -> dict[str, str]:
+    match = re.search(r"old_values\s*=\s*(\{)", html)
+    if not match:
+        return {}
+    start = match.start(1)
+    depth = 0
+    in_string = False
+    escape_next = False
+    end = start
+    for i, char in enumerate(html[start:], start):
+        if escape_next:
+            escape_next = False
+            continue
+        if char == "\\":
+            escape_next = True
+            continue
+        if char == '"':
+            in_string = not in_string
+            continue
+        if not in_string:
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    end = i + 1
+                    break
+    try:
+        return json.loads(html[start:end])
+    except json.JSONDecodeError:
+        return {}
+
+
+def regex_extract(html: str) -> dict[str, Any]:
+    old_values = _legacy_old_values(html)
+    created = last_modified = None
+    date_block = re.search(r'<div class="date">(.*?)</div>', html, re.DOTALL)
+    if date_block:
+        for m in re.finditer(r"<p[^>]*>(.*?)</p>", date_block.group(1), re.DOTALL):
+            p_html = m.group(1)
+            link = re.search(
+                r'<a[^>]*class="timeline"[^>]*title="See timeline at ([^"]+)"', p_html
+            )
+            if link:
+                p_text = trac._strip_html(p_html)
+                if "Opened" in p_text:
+                    created = link.group(1)
+                elif "Last modified" in p_text:
+                    last_modified = link.group(1)
+    summary = ""
+    title_m = re.search(r"<title>(.+?)</title>", html)
+    if title_m:
+        match = re.search(r"#\d+\s*\((.+?)\)\s*[–-]", title_m.group(1))
+        if match:
+            summary = match.group(1)
+    description = ""
+    desc_m = re.search(
+        r'<div class="description">.*?<div class="searchable">(.*?)</div>', html, re.DOTALL
+    )
+    if desc_m:
+        description = trac._strip_html(desc_m.group(1))
+    return {
+        "summary": summary,
+        "created": created,
+        "last_modified": last_modified,
+        "description": description,
+        "old_values": old_values,
+    }
+
+
+def scan_extract(html: str) -> dict[str, Any]:
+    return trac.parse_ticket_page(html)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic pages
+# ---------------------------------------------------------------------------
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_page(comments: int, seed: int = 0) -> str:
+    """A page shaped like a Trac ticket: scripts, ticket box, change history."""
+    rng = random.Random(seed)
+    old_values = {
+        "component": "Database layer (models, ORM)", "has_patch": "1",
+        "keywords": "orm, migration", "owner": "", "reporter": "alice",
+        "resolution": "", "severity": "Normal", "stage": "Accepted",
+        "status": "new", "summary": "QuerySet {crash} with \"quotes\"", "version": "6.0",
+    }
+    nav = "".join(
+        f'<li><a href="/wiki/Page{i}" title="{_sentence(rng, 4)}">Page {i}</a></li>'
+        for i in range(60)
+    )
+    description = "".join(f"<p>{_sentence(rng, 30)}<br />{_sentence(rng, 12)}</p>\n" for _ in range(4))
+    history = []
+    for i in range(1, comments + 1):
+        history.append(
+            f'<div class="change" id="trac-change-{i}"><h3 class="change">'
+            f'<span class="threading"><a href="#comment:{i}">comment:{i}</a></span> '
+            f'Changed <a class="timeline" href="/timeline?from=x" title="See timeline at '
+            f'Dec {1 + i % 28}, 2025, 9:00:00 AM">1 day ago</a> by user{i}</h3>'
+            f'<ul class="changes"><li><strong class="trac-field-stage">Triage Stage</strong> '
+            f'changed from <em>Unreviewed</em> to <em>Accepted</em></li></ul>'
+            f'<div class="comment searchable"><p>{_sentence(rng, 60)}</p>'
+            f'<pre class="wiki">{html_lib.escape(_sentence(rng, 20))}</pre>'
+            f'<p>{_sentence(rng, 40)}</p></div></div>\n'
+        )
+    return (
+        "<!DOCTYPE html>\n<html><head>\n"
+        "<title>#36814 (QuerySet crash when renaming a field) – Django</title>\n"
+        + '<script src="/chrome/common/js/jquery.js"></script>\n' * 6
+        + f"<script>\n  jQuery(function($) {{ var old_values = {json.dumps(old_values)};\n"
+        "  $('#field-summary').focus(); });\n</script>\n</head><body>\n"
+        f'<div id="mainnav"><ul>{nav}</ul></div>\n<div id="ticket">\n'
+        '<div class="date">\n'
+        '<p>Opened <a class="timeline" href="/timeline?from=a" '
+        'title="See timeline at Dec 20, 2025, 8:56:37 AM">4 weeks ago</a></p>\n'
+        '<p>Last modified <a class="timeline" href="/timeline?from=b" '
+        'title="See timeline at Dec 23, 2025, 3:37:30 AM">3 weeks ago</a></p>\n'
+        "</div>\n"
+        '<div class="description"><h3 id="comment:description">Description</h3>\n'
+        f'<div class="searchable">\n{description}</div>\n</div>\n</div>\n'
+        f'<div id="changelog">\n{"".join(history)}</div>\n</body></html>\n'
+    )
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def _timed(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"median": round(statistics.median(times), 3), "min": round(min(times), 3)}
+
+
+def bench_page(name: str, html: str, repeat: int) -> dict[str, Any]:
+    regex_ms = _timed(lambda: regex_extract(html), repeat)
+    scan_ms = _timed(lambda: scan_extract(html), repeat)
+    expected, got = regex_extract(html), scan_extract(html)
+    return {
+        "page": name,
+        "bytes": len(html.encode("utf-8")),
+        "regex_ms": regex_ms,
+        "scan_ms": scan_ms,
+        "speedup": round(regex_ms["median"] / scan_ms["median"], 2) if scan_ms["median"] else None,
+        "mismatches": sorted(k for k in expected if expected[k] != got[k]),
+    }
+
+
+def load_pages(paths: list[Path]) -> list[tuple[str, str]]:
+    pages = []
+    for path in paths:
+        files = sorted(path.glob("*.html")) if path.is_dir() else [path]
+        for file in files:
+            pages.append((file.name, file.read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def run(pages: list[tuple[str, str]], repeat: int) -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": [bench_page(name, html, repeat) for name, html in pages],
+    }
+
+
+def print_table(report: dict[str, Any]) -> None:
+    print(f"{'page':>24} {'KB':>7} {'regex':>9} {'scan':>9} {'speedup':>8}  mismatches",
+          file=sys.stderr)
+    for row in report["results"]:
+        print(
+            f"{row['page'][-24:]:>24} {row['bytes'] / 1024:>7.0f} "
+            f"{row['regex_ms']['median']:>9.3f} {row['scan_ms']['median']:>9.3f} "
+            f"{row['speedup'] or 0:>7.2f}x  {', '.join(row['mismatches']) or '-'}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--pages", type=Path, nargs="+", default=None,
+        help="Saved ticket pages (files or directories of *.html)",
+    )
+    parser.add_argument(
+        "--comments", type=int, nargs="+", default=list(DEFAULT_COMMENTS),
+        help="Comment counts of the synthetic pages (default: "
+             f"{' '.join(map(str, DEFAULT_COMMENTS))}); ignored with --pages",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per timing (default: 20)")
+    parser.add_argument("--out", type=Path, default=None, help="Write JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.pages:
+        pages = load_pages(args.pages)
+    else:
+        pages = [(f"synthetic-{n}-comments", make_page(n)) for n in args.comments]
+    if not pages:
+        parser.error("no pages found")
+
+    report = run(pages, max(1, args.repeat))
+    print_table(report)
+    text = json.dumps(report, indent=2) + "\n"
+    if args.out is not None:
+        args.out.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
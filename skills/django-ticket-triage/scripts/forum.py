@@ -12,12 +12,16 @@ import re
 import sys
 import time
 from datetime import datetime, timezone
+from email.message import Message
 from email.utils import parsedate_to_datetime
+from functools import partial
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
+import http_cache
+
 FORUM_BASE_URL = "https://forum.djangoproject.com"
 DEFAULT_TIMEOUT = 30.0
 MAX_RETRIES = 5
@@ -73,16 +77,22 @@ def _backoff_delay(attempt: int, retry_after: str | None = None) -> float:
 
 
 def _request_bytes(url: str, params: dict[str, Any] | None = None) -> bytes:
-    """Perform HTTP GET with retry/backoff for transient failures."""
+    """Perform HTTP GET through the response cache (see ``http_cache``)."""
     query = urlencode(params or {}, doseq=True)
     full_url = f"{url}?{query}" if query else url
+    return http_cache.fetch(full_url, partial(_send, full_url))
+
 
+def _send(url: str, headers: dict[str, str]) -> tuple[int, Message, bytes]:
+    """Perform HTTP GET with retry/backoff for transient failures."""
     for attempt in range(1, MAX_RETRIES + 1):
-        request = Request(full_url, headers=HEADERS, method="GET")
+        request = Request(url, headers={**HEADERS, **headers}, method="GET")
         try:
             with urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
-                return response.read()
+                return response.status, response.headers, response.read()
         except HTTPError as exc:
+            if exc.code == 304:  # urllib reports "Not Modified" as an error
+                return 304, exc.headers, b""
             if exc.code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
                 time.sleep(_backoff_delay(attempt, exc.headers.get("Retry-After")))
                 continue
@@ -281,6 +291,11 @@ def search_by_ticket(ticket_id: int) -> list[dict[str, Any]]:
 
 def main():
     """CLI interface."""
+    try:
+        sys.argv[1:] = http_cache.pop_cli_flags(sys.argv[1:])
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
     if len(sys.argv) < 2:
         print("Usage:")
         print("  forum.py search <query> [--category=internals]")
@@ -288,6 +303,7 @@ def main():
         print("  forum.py ticket <ticket_id>")
         print()
         print("Categories: announcements, users, internals, projects, events, packages")
+        print("Cache flags (any command): --offline --no-cache --cache-ttl=SECONDS")
         sys.exit(1)
 
     command = sys.argv[1]
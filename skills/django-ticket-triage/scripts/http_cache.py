@@ -0,0 +1,215 @@
+"""On-disk HTTP response cache shared by trac.py and forum.py.
+
+Responses are stored in SQLite under the XDG cache directory, keyed by URL,
+together with their ``ETag``/``Last-Modified`` validators:
+
+- every cached body is revalidated with ``If-None-Match``/``If-Modified-Since``,
+  so an unchanged page costs a bodiless 304 (``--cache-ttl=SECONDS`` skips
+  the request for bodies younger than that, at the price of stale data);
+- in offline mode only the cache is consulted, whatever the age;
+- if the network is unreachable, a stale cached body is better than none.
+
+Command-line flags (any position, removed before the command is parsed):
+``--offline``, ``--no-cache``, ``--cache-ttl=SECONDS``. Entries not fetched
+or revalidated for ``MAX_AGE`` seconds are pruned when the cache is opened.
+The cache lives in ``$DJANGO_TRIAGE_CACHE_DIR`` if set, otherwise
+``$XDG_CACHE_HOME/django-ticket-triage`` (``~/.cache/django-ticket-triage``).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from email.message import Message
+from pathlib import Path
+from typing import Callable
+from urllib.error import HTTPError, URLError
+
+DEFAULT_TTL = 0.0  # always revalidate: triage needs live ticket state
+TTL = DEFAULT_TTL
+MAX_AGE = 7 * 86400
+OFFLINE = False
+ENABLED = True
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL
+)
+"""
+
+# send(headers) performs the GET with the extra request headers and returns
+# (status, response headers, body); status is 200 or, when revalidating, 304.
+Send = Callable[[dict[str, str]], tuple[int, Message, bytes]]
+
+
+class OfflineError(URLError):
+    """Offline mode and the URL is not in the cache."""
+
+    def __init__(self, url: str):
+        super().__init__(f"offline and not cached: {url}")
+        self.url = url
+
+
+def cache_dir() -> Path:
+    override = os.environ.get("DJANGO_TRIAGE_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "django-ticket-triage"
+
+
+class HttpCache:
+    """URL -> (body, validators, stored_at) in one SQLite file; thread-safe."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(SCHEMA)
+
+    def get(self, url: str) -> sqlite3.Row | None:
+        with self.lock:
+            return self.db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+    def put(
+        self, url: str, body: bytes, etag: str | None, last_modified: str | None
+    ) -> None:
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time()),
+            )
+
+    def touch(self, url: str) -> None:
+        """Mark ``url`` fresh again after a 304."""
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE responses SET stored_at = ? WHERE url = ?", (time.time(), url)
+            )
+
+    def prune(self, max_age: float) -> int:
+        """Drop entries older than ``max_age`` seconds; return how many."""
+        with self.lock, self.db:
+            return self.db.execute(
+                "DELETE FROM responses WHERE stored_at < ?", (time.time() - max_age,)
+            ).rowcount
+
+    def clear(self) -> None:
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+
+_cache: HttpCache | None = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> HttpCache | None:
+    """The shared cache, or ``None`` when disabled or it cannot be opened."""
+    global _cache, _cache_failed
+    if not ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None and not _cache_failed:
+            try:
+                _cache = HttpCache(cache_dir() / "http.sqlite3")
+                _cache.prune(MAX_AGE)
+            except (OSError, sqlite3.Error):
+                _cache_failed = True  # e.g. read-only home: run uncached
+        return _cache
+
+
+def configure(
+    ttl: float | None = None,
+    offline: bool | None = None,
+    enabled: bool | None = None,
+) -> None:
+    """Change cache settings; the cache file is reopened on next use."""
+    global TTL, OFFLINE, ENABLED, _cache, _cache_failed
+    with _cache_lock:
+        if ttl is not None:
+            TTL = ttl
+        if offline is not None:
+            OFFLINE = offline
+        if enabled is not None:
+            ENABLED = enabled
+        if _cache is not None:
+            _cache.close()
+        _cache, _cache_failed = None, False
+
+
+def pop_cli_flags(args: list[str]) -> list[str]:
+    """Apply and remove the cache flags from ``args``; return the rest.
+
+    Raises:
+        ValueError: ``--cache-ttl`` is not a number of seconds >= 0
+    """
+    rest = []
+    for arg in args:
+        if arg == "--offline":
+            configure(offline=True)
+        elif arg == "--no-cache":
+            configure(enabled=False)
+        elif arg.startswith("--cache-ttl="):
+            try:
+                ttl = float(arg.split("=", 1)[1])
+            except ValueError:
+                ttl = -1.0
+            if not ttl >= 0:  # also rejects nan
+                raise ValueError("--cache-ttl must be a number of seconds >= 0")
+            configure(ttl=ttl)
+        else:
+            rest.append(arg)
+    return rest
+
+
+def fetch(url: str, send: Send) -> bytes:
+    """Body of ``url``: from the cache when fresh, else via ``send``."""
+    cache = get_cache()
+    if cache is None:
+        if OFFLINE:
+            raise OfflineError(url)
+        return send({})[2]
+
+    entry = cache.get(url)
+    if entry is not None and (OFFLINE or time.time() - entry["stored_at"] < TTL):
+        return entry["body"]
+    if OFFLINE:
+        raise OfflineError(url)
+
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        status, response_headers, body = send(headers)
+    except URLError as exc:
+        if entry is not None and not isinstance(exc, HTTPError):
+            return entry["body"]  # unreachable: stale beats nothing
+        raise
+
+    if status == 304 and entry is not None:
+        cache.touch(url)
+        return entry["body"]
+    cache.put(url, body, response_headers.get("ETag"), response_headers.get("Last-Modified"))
+    return body
@@ -0,0 +1,989 @@
+"""Tests for decision-board's serve.py — spec validation, rendering, server."""
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from functools import partial
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).parent.parent
+SCRIPTS_DIR = ROOT / "skills" / "decision-board" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import serve
+
+# --------------------
+# helpers
+# --------------------
+
+
+def _spec(n=2, **extra):
+    return {
+        "title": "Test board",
+        "decisions": [
+            {
+                "id": i,
+                "title": f"Decision {i}",
+                "options": [
+                    {"key": "a", "label": "Option A"},
+                    {"key": "b", "label": "Option B"},
+                ],
+            }
+            for i in range(1, n + 1)
+        ],
+        **extra,
+    }
+
+
+def _validated(spec):
+    serve.validate_spec(spec)  # coerces ids to strings in place
+    return spec
+
+
+class _TmpDirMixin:
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write_spec(self, spec, name="spec.json"):
+        path = self.tmpdir / name
+        path.write_text(json.dumps(spec), encoding="utf-8")
+        return path
+
+
+# --------------------
+# SpecCache / BoardAssets
+# --------------------
+
+
+class TestSpecCache(_TmpDirMixin, unittest.TestCase):
+    def test_hit_returns_same_bytes(self):
+        cache = serve.SpecCache(self._write_spec(_spec()))
+        first = cache.get()
+        self.assertEqual(json.loads(first.body)["decisions"][0]["id"], "1")
+        self.assertIs(cache.get(), first)
+
+    def test_spec_edit_rerenders(self):
+        path = self._write_spec(_spec())
+        cache = serve.SpecCache(path)
+        first = cache.get()
+        path.write_text(json.dumps(_spec(title="Renamed board")), encoding="utf-8")
+        # force a distinct mtime even on coarse-grained filesystems
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        second = cache.get()
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertIn("Renamed board".encode(), second.body)
+
+    def test_invalid_spec_raises(self):
+        cache = serve.SpecCache(self._write_spec({"title": "x", "decisions": []}))
+        with self.assertRaises(serve.SpecError):
+            cache.get()
+
+
+class TestCheck(_TmpDirMixin, unittest.TestCase):
+    def test_check_spec_reports_timing(self):
+        report = serve.check_spec(self._write_spec(_spec()))
+        self.assertTrue(report["ok"])
+        self.assertIsNone(report["error"])
+        self.assertGreaterEqual(report["parse_ms"], 0)
+        self.assertGreaterEqual(report["validate_ms"], 0)
+
+        broken = self.tmpdir / "broken.json"
+        broken.write_text("{")
+        report = serve.check_spec(broken)
+        self.assertFalse(report["ok"])
+        self.assertIn("not valid JSON", report["error"])
+        self.assertIsNone(report["validate_ms"])
+
+    def test_check_batch_exit_code(self):
+        good = self._write_spec(_spec(), "good.json")
+        bad = self._write_spec({"title": "x", "decisions": []}, "bad.json")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(serve.main([str(good), "--check"]), 0)
+            self.assertEqual(serve.main([str(good), str(bad), "--check"]), 1)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("ok    "))
+        self.assertTrue(any(l.startswith("FAIL  ") and "bad.json" in l for l in lines))
+        self.assertIn("2 spec(s), 1 invalid", lines[-1])
+
+    def test_check_json(self):
+        bad = self._write_spec({"decisions": [{"id": 1, "options": []}]}, "bad.json")
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(serve.main([str(bad), "--check", "--json"]), 1)
+        doc = json.loads(out.getvalue())
+        self.assertFalse(doc["ok"])
+        self.assertEqual(doc["summary"]["errors"], 3)
+        self.assertEqual(
+            [e["pointer"] for e in doc["specs"][0]["errors"]],
+            ["/title", "/decisions/0/title", "/decisions/0/options"],
+        )
+
+    def test_registry_reuses_startup_parse(self):
+        registry = serve.BoardRegistry(heartbeat_timeout=None)
+        board = registry.add(self._write_spec(_spec()))
+        with mock.patch.object(serve, "load_spec", side_effect=AssertionError):
+            board.spec_cache.get()
+
+
+class TestSpecErrors(unittest.TestCase):
+    def test_collects_every_error_with_pointer(self):
+        spec = {
+            "decisions": [
+                {"id": 1, "title": "A", "options": [{"key": "a"}, {"key": "a", "label": "x"}]},
+                {"title": "B", "options": [], "category": "nope"},
+                "junk",
+                {"id": 1, "title": "C", "options": [{"key": "x", "label": "X", "reversibility": "maybe"}]},
+            ],
+            "categories": ["infra"],
+        }
+        pointers = [e["pointer"] for e in serve.spec_errors(spec)]
+        self.assertEqual(pointers, [
+            "/title",
+            "/decisions/0/options/0/label",
+            "/decisions/0/options/1/key",
+            "/decisions/1/id",
+            "/decisions/1/options",
+            "/decisions/1/category",
+            "/decisions/2",
+            "/decisions/3/id",
+            "/decisions/3/options/0/reversibility",
+        ])
+        with self.assertRaises(serve.SpecError) as ctx:
+            serve.validate_spec(spec)
+        self.assertEqual(len(ctx.exception.errors), 9)
+        self.assertTrue(str(ctx.exception).startswith("spec has 9 errors:"))
+
+    def test_single_error_message_unchanged(self):
+        spec = _spec()
+        del spec["title"]
+        with self.assertRaises(serve.SpecError) as ctx:
+            serve.validate_spec(spec)
+        self.assertEqual(str(ctx.exception), "spec.title is required")
+        self.assertEqual(ctx.exception.errors, [{"pointer": "/title", "message": "spec.title is required"}])
+
+    def test_pointer_escaping(self):
+        self.assertEqual(serve._pointer("a/b", "c~d", 0), "/a~1b/c~0d/0")
+
+
+class TestBatchStatic(_TmpDirMixin, unittest.TestCase):
+    def _specs(self):
+        src = self.tmpdir / "specs"
+        src.mkdir()
+        for name in ("a", "b", "c"):
+            (src / f"{name}.json").write_text(json.dumps(_spec()))
+        (src / "bad.json").write_text(json.dumps({"title": "x", "decisions": []}))
+        (src / "a.20260101-000000.result.json").write_text("{}")
+        return src
+
+    def test_expand_specs(self):
+        src = self._specs()
+        names = [p.name for p in serve.expand_specs([src])]
+        self.assertEqual(names, ["a.json", "b.json", "bad.json", "c.json"])
+        names = [p.name for p in serve.expand_specs([src / "?.json", src / "a.json"])]
+        self.assertEqual(names, ["a.json", "b.json", "c.json"])
+
+    def _run(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = serve.main([str(a) for a in args])
+        return code, out.getvalue().splitlines()
+
+    def test_batch_render_reports_each_spec(self):
+        src = self._specs()
+        for jobs in ("1", "2"):
+            out_dir = self.tmpdir / f"out{jobs}"
+            code, lines = self._run(src, "--static", out_dir, "--jobs", jobs)
+            self.assertEqual(code, 1)
+            self.assertEqual(
+                sorted(p.name for p in out_dir.iterdir()), ["a.html", "b.html", "c.html"]
+            )
+            self.assertIn("const SPEC =", (out_dir / "a.html").read_text())
+            self.assertTrue(any(l.startswith("FAIL") and "bad.json" in l for l in lines))
+            self.assertTrue(lines[-1].startswith("3 rendered, 1 failed"))
+
+    def test_same_stem_gets_suffix(self):
+        for sub in ("x", "y"):
+            (self.tmpdir / sub).mkdir()
+            (self.tmpdir / sub / "s.json").write_text(json.dumps(_spec()))
+        out_dir = self.tmpdir / "out"
+        code, _ = self._run(self.tmpdir / "x", self.tmpdir / "y", "--static", out_dir)
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(p.name for p in out_dir.iterdir()), ["s-2.html", "s.html"])
+
+    def test_single_spec_render_is_atomic(self):
+        spec_path = self.tmpdir / "s.json"
+        spec_path.write_text(json.dumps(_spec()))
+        out = self.tmpdir / "out" / "board.html"
+        with mock.patch.object(serve, "_write_atomic", wraps=serve._write_atomic) as write:
+            code, lines = self._run(spec_path, "--static", out)
+        self.assertEqual(code, 0)
+        write.assert_called_once()
+        self.assertEqual(lines, [f"wrote {out}"])
+        self.assertEqual([p.name for p in out.parent.iterdir()], ["board.html"])
+        self.assertIn("const SPEC =", out.read_text())
+
+
+class TestBoardAssets(unittest.TestCase):
+    def test_shell_links_hashed_assets(self):
+        assets = serve.TEMPLATE_CACHE.get()
+        shell = assets.shell.body.decode()
+        self.assertNotIn(serve.SPEC_PLACEHOLDER, shell)
+        self.assertNotIn("<style>", shell)
+        for name in assets.files:
+            self.assertIn(f"/static/{name}", shell)
+        self.assertIn(b"await fetch('api/spec'", assets.js.body)
+
+    def test_static_render_stays_inline(self):
+        html = serve.render_html(_validated(_spec()))
+        self.assertIn("<style>", html)
+        self.assertIn("const SPEC = {", html)
+
+
+# --------------------
+# conditional GET / gzip
+# --------------------
+
+
+class TestHeaderHelpers(unittest.TestCase):
+    def test_accepts_gzip(self):
+        self.assertTrue(serve._accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(serve._accepts_gzip("br;q=1.0, gzip;q=0.8"))
+        self.assertFalse(serve._accepts_gzip("gzip;q=0"))
+        self.assertFalse(serve._accepts_gzip("identity"))
+        self.assertFalse(serve._accepts_gzip(None))
+
+    def test_etag_matches(self):
+        self.assertTrue(serve._etag_matches('"x", "abc"', '"abc"'))
+        self.assertTrue(serve._etag_matches('W/"abc"', '"abc"'))
+        self.assertTrue(serve._etag_matches("*", '"abc"'))
+        self.assertFalse(serve._etag_matches('"abd"', '"abc"'))
+        self.assertFalse(serve._etag_matches(None, '"abc"'))
+
+
+class _ServerMixin(_TmpDirMixin):
+    """Runs BoardHandler on an ephemeral port for the duration of a test."""
+
+    handler_kwargs = {}
+
+    def setUp(self):
+        super().setUp()
+        self.registry = self._make_registry()
+        handler = partial(serve.BoardHandler, self.registry, **self.handler_kwargs)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def _make_registry(self):
+        self.spec_path = self._write_spec(_spec())
+        self.result_path = self.tmpdir / "result.json"
+        self.board = serve.Board(self.spec_path, self.result_path)
+        return serve.BoardRegistry(root=self.board, heartbeat_timeout=None)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def _request(self, method, path, body=None, headers=None):
+        conn = HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            return resp, resp.read()
+        finally:
+            conn.close()
+
+    def _post_json(self, path, payload):
+        resp, body = self._request(
+            "POST", path, body=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        return resp, json.loads(body) if body else None
+
+
+class TestConditionalGet(_ServerMixin, unittest.TestCase):
+    def test_etag_then_304(self):
+        resp, body = self._request("GET", "/")
+        self.assertEqual(resp.status, 200)
+        etag = resp.getheader("ETag")
+        self.assertTrue(etag)
+        self.assertEqual(resp.getheader("Cache-Control"), "no-cache")
+
+        resp, body = self._request("GET", "/", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_gzip_negotiation(self):
+        resp, plain = self._request("GET", "/")
+        self.assertIsNone(resp.getheader("Content-Encoding"))
+
+        resp, packed = self._request("GET", "/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(resp.getheader("Vary"), "Accept-Encoding")
+        self.assertLess(len(packed), len(plain))
+        self.assertEqual(gzip.decompress(packed), plain)
+
+        # a gzip ETag revalidates too
+        resp, _ = self._request(
+            "GET", "/",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": resp.getheader("ETag")},
+        )
+        self.assertEqual(resp.status, 304)
+
+
+class TestSplitPayload(_ServerMixin, unittest.TestCase):
+    def test_static_assets_are_immutable(self):
+        name = next(iter(serve.TEMPLATE_CACHE.get().files))
+        resp, body = self._request("GET", f"/static/{name}")
+        self.assertEqual(resp.status, 200)
+        self.assertIn("immutable", resp.getheader("Cache-Control"))
+        resp, _ = self._request("GET", "/static/board.000000000000.js")
+        self.assertEqual(resp.status, 404)
+
+    def test_spec_endpoint(self):
+        resp, body = self._request("GET", "/api/spec")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(json.loads(body)["title"], "Test board")
+        resp, _ = self._request(
+            "GET", "/api/spec", headers={"If-None-Match": resp.getheader("ETag")}
+        )
+        self.assertEqual(resp.status, 304)
+
+    def test_invalid_spec_fails_shell(self):
+        self.spec_path.write_text("{", encoding="utf-8")
+        st = self.spec_path.stat()
+        os.utime(self.spec_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        resp, _ = self._request("GET", "/")
+        self.assertEqual(resp.status, 500)
+
+
+# --------------------
+# single board: submit / cancel
+# --------------------
+
+
+class TestSingleBoard(_ServerMixin, unittest.TestCase):
+    def test_submit_writes_result(self):
+        resp, body = self._post_json("/api/submit", {"decisions": {"1": {"choice": "a"}}})
+        self.assertEqual(resp.status, 200)
+        # the handler replies before recording the outcome
+        self.assertTrue(self.board.done.wait(2))
+        self.assertEqual(self.board.exit_code, serve.EXIT_SUBMITTED)
+        saved = json.loads(self.result_path.read_text())
+        self.assertEqual(saved["decisions"]["1"]["choice"], "a")
+
+    def test_racing_submits_write_once(self):
+        write = serve.write_result
+        calls = []
+
+        def slow_write(path, data, result_format="pretty"):
+            calls.append(data["decisions"]["1"]["choice"])
+            time.sleep(0.2)
+            write(path, data, result_format)
+
+        statuses = {}
+
+        def submit(choice):
+            resp, _ = self._post_json("/api/submit", {"decisions": {"1": {"choice": choice}}})
+            statuses[choice] = resp.status
+
+        with mock.patch.object(serve, "write_result", side_effect=slow_write):
+            threads = [threading.Thread(target=submit, args=(c,)) for c in ("a", "b")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(sorted(statuses.values()), [200, 409])
+        self.assertEqual(len(calls), 1)
+        winner = next(c for c, status in statuses.items() if status == 200)
+        self.assertTrue(self.board.done.wait(2))
+        saved = json.loads(self.result_path.read_text())
+        self.assertEqual(saved["decisions"]["1"]["choice"], winner)
+
+    def test_claimed_board_ignores_other_outcomes(self):
+        self.assertTrue(self.board.try_claim())
+        self.assertFalse(self.board.try_claim())
+        self.assertFalse(self.board.finish(serve.EXIT_USER_CANCELLED))
+        self.board.release_claim()
+        self.assertTrue(self.board.finish(serve.EXIT_USER_CANCELLED))
+        self.assertFalse(self.board.try_claim())
+
+    def test_cancel_sets_exit_code(self):
+        resp, _ = self._post_json("/api/cancel", {})
+        self.assertEqual(resp.status, 200)
+        self.assertTrue(self.board.done.wait(2))
+        self.assertEqual(self.board.exit_code, serve.EXIT_USER_CANCELLED)
+        self.assertFalse(self.result_path.exists())
+
+
+class TestRequestBody(_ServerMixin, unittest.TestCase):
+    handler_kwargs = {"max_body": 1024}
+
+    def test_oversized_body_is_refused_unread(self):
+        payload = {"decisions": {"1": {"choice": "a", "comment": "x" * 4096}}}
+        resp, body = self._post_json("/api/submit", payload)
+        self.assertEqual(resp.status, 413)
+        self.assertEqual(resp.getheader("Connection"), "close")
+        self.assertIsNone(self.board.exit_code)
+        self.assertFalse(self.result_path.exists())
+
+    def test_missing_content_length(self):
+        conn = HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        try:
+            conn.putrequest("POST", "/api/submit")
+            conn.endheaders()
+            resp = conn.getresponse()
+            resp.read()
+            self.assertEqual(resp.status, 411)
+        finally:
+            conn.close()
+
+    def test_metrics_off_by_default(self):
+        resp, _ = self._request("GET", "/api/metrics")
+        self.assertEqual(resp.status, 404)
+
+    def test_invalid_json(self):
+        resp, _ = self._request("POST", "/api/submit", body=b"{nope")
+        self.assertEqual(resp.status, 400)
+        self.assertIsNone(self.board.exit_code)
+
+
+class TestResultWriting(_TmpDirMixin, unittest.TestCase):
+    RESULT = {
+        "decisions": {"1": {"choice": "a", "comment": "é"}, "2": {"choice": None}},
+        "meta": {"counts": {"decided": 1, "undecided": 1}},
+    }
+
+    def test_formats(self):
+        path = self.tmpdir / "r.json"
+        serve.write_result(path, self.RESULT)
+        self.assertIn('\n  "decisions"', path.read_text(encoding="utf-8"))
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8")), self.RESULT)
+
+        serve.write_result(path, self.RESULT, "compact")
+        text = path.read_text(encoding="utf-8")
+        self.assertEqual(text.count("\n"), 1)
+        self.assertEqual(json.loads(text), self.RESULT)
+
+        serve.write_result(path, self.RESULT, "ndjson")
+        lines = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(lines[0], {"meta": self.RESULT["meta"]})
+        self.assertEqual(lines[1], {"id": "1", "choice": "a", "comment": "é"})
+        self.assertEqual(lines[2], {"id": "2", "choice": None})
+
+    def test_failed_write_keeps_previous_file(self):
+        path = self.tmpdir / "r.json"
+        serve.write_result(path, self.RESULT)
+        before = path.read_text(encoding="utf-8")
+        with self.assertRaises(TypeError):
+            serve.write_result(path, {"decisions": {"1": {"choice": object()}}})
+        self.assertEqual(path.read_text(encoding="utf-8"), before)
+        self.assertEqual([p.name for p in self.tmpdir.iterdir() if p.name != "spec.json"], ["r.json"])
+
+    def test_unknown_format_rejected(self):
+        with self.assertRaises(ValueError):
+            serve.Board(self.tmpdir / "s.json", self.tmpdir / "r.json", result_format="xml")
+
+    def test_size_parsing(self):
+        self.assertEqual(serve._size("512"), 512)
+        self.assertEqual(serve._size("64k"), 64 * 1024)
+        self.assertEqual(serve._size("8MB"), 8 * 1024 * 1024)
+        with self.assertRaises(Exception):
+            serve._size("lots")
+
+
+class TestDraftJournal(_TmpDirMixin, unittest.TestCase):
+    def test_burst_is_one_append(self):
+        journal = serve.DraftJournal(self.tmpdir / "r.draft.ndjson", delay=0.05)
+        for value in ("a", "b", "a"):
+            journal.record({"1": {"value": value, "comment": ""}})
+        journal.record({"2": {"value": "hold", "comment": "later"}})
+        self.assertEqual(journal.snapshot()["1"]["value"], "a")
+        time.sleep(0.3)
+        lines = journal.path.read_text().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(set(json.loads(lines[0])["choices"]), {"1", "2"})
+
+    def test_replay_compacts_and_skips_torn_line(self):
+        path = self.tmpdir / "r.draft.ndjson"
+        path.write_text(
+            '{"t":1,"choices":{"1":{"value":"a"}}}\n'
+            '{"t":2,"choices":{"1":{"value":"b"},"2":{"value":null}}}\n'
+            '{"t":3,"choi'
+        )
+        journal = serve.DraftJournal(path)
+        self.assertEqual(journal.snapshot(), {"1": {"value": "b"}, "2": {"value": None}})
+        self.assertEqual(len(path.read_text().splitlines()), 1)
+
+    def test_close_flushes_and_discard_removes(self):
+        journal = serve.DraftJournal(self.tmpdir / "r.draft.ndjson", delay=60)
+        journal.record({"1": {"value": "a"}})
+        journal.close()
+        self.assertTrue(journal.path.exists())
+        self.assertFalse(journal.record({"1": {"value": "b"}}))
+        journal.discard()
+        self.assertFalse(journal.path.exists())
+
+
+class TestDraftEndpoint(_ServerMixin, unittest.TestCase):
+    def test_draft_roundtrip_and_restore(self):
+        resp, _ = self._post_json("/api/draft", {"choices": {"1": {"value": "a", "comment": ""}}})
+        self.assertEqual(resp.status, 202)
+        resp, body = self._request("GET", "/api/draft")
+        self.assertEqual(json.loads(body)["choices"]["1"]["value"], "a")
+
+        # the board is lost; a new one on the same result path picks it up
+        self.registry.finish(self.board, serve.EXIT_HEARTBEAT_TIMEOUT)
+        self.assertEqual(self.board.draft.path.name, "result.draft.ndjson")
+        restarted = serve.Board(self.spec_path, self.result_path)
+        self.assertEqual(restarted.draft.snapshot()["1"]["value"], "a")
+
+    def test_submit_removes_draft(self):
+        self._post_json("/api/draft", {"choices": {"1": {"value": "a"}}})
+        self.board.draft.flush()
+        self.assertTrue(self.board.draft.path.exists())
+        self._post_json("/api/submit", {"decisions": {"1": {"choice": "a"}}})
+        self.assertTrue(self.board.done.wait(2))
+        self.assertFalse(self.board.draft.path.exists())
+        resp, _ = self._post_json("/api/draft", {"choices": {"1": {"value": "b"}}})
+        self.assertEqual(resp.status, 409)
+
+    def test_rejects_malformed_draft(self):
+        resp, _ = self._post_json("/api/draft", {"choices": {"1": "a"}})
+        self.assertEqual(resp.status, 400)
+
+    def test_ctrl_c_flushes_pending_picks(self):
+        self.board.draft.record({"1": {"value": "a", "comment": ""}})  # still coalescing
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(serve.BoardHandler, self.registry))
+        self.addCleanup(signal.signal, signal.SIGTERM, signal.getsignal(signal.SIGTERM))
+        with mock.patch.object(self.board.done, "wait", side_effect=KeyboardInterrupt), \
+                contextlib.redirect_stdout(io.StringIO()):
+            code = serve._run_board(
+                server, server.server_address[1], self.board, self.spec_path,
+                self.result_path, True, self.registry,
+            )
+        self.assertEqual(code, 130)
+        restarted = serve.Board(self.spec_path, self.result_path)
+        self.assertEqual(restarted.draft.snapshot()["1"]["value"], "a")
+
+
+class TestPortLocks(_TmpDirMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": str(self.tmpdir)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.spec_path = self._write_spec(_spec())
+
+    def _holder(self, spec_path):
+        """A child process listening on a port with a lock naming ``spec_path``."""
+        child = subprocess.Popen(
+            [sys.executable, "-c",
+             "import socket,sys,time;s=socket.socket();s.bind(('127.0.0.1',0));"
+             "s.listen();print(s.getsockname()[1],flush=True);time.sleep(30)"],
+            stdout=subprocess.PIPE, text=True,
+        )
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+        port = int(child.stdout.readline())
+        lock = {"pid": child.pid, "port": port, "spec": str(spec_path.resolve())}
+        serve.lock_dir().mkdir(parents=True, exist_ok=True)
+        (serve.lock_dir() / f"port-{port}.json").write_text(json.dumps(lock))
+        return child, port
+
+    def _claim(self, port, **kwargs):
+        server, bound = serve.claim_port(
+            ThreadingHTTPServer, port, serve.BoardHandler, self.spec_path, **kwargs
+        )
+        server.server_close()
+        serve.release_lock(bound)
+        return bound
+
+    def test_lock_roundtrip(self):
+        serve.write_lock(7999, self.spec_path)
+        lock = serve.read_lock(7999)
+        self.assertEqual(lock["pid"], os.getpid())
+        self.assertEqual(lock["spec"], str(self.spec_path.resolve()))
+        serve.release_lock(7999)
+        self.assertIsNone(serve.read_lock(7999))
+
+    def test_stale_lock_is_dropped(self):
+        child = subprocess.Popen([sys.executable, "-c", "pass"])
+        child.wait()
+        serve.lock_dir().mkdir(parents=True, exist_ok=True)
+        path = serve.lock_dir() / "port-7998.json"
+        path.write_text(json.dumps({"pid": child.pid, "port": 7998, "spec": None}))
+        self.assertIsNone(serve.read_lock(7998))
+        self.assertFalse(path.exists())
+
+    def test_other_board_is_left_alone(self):
+        child, port = self._holder(self.tmpdir / "other.json")
+        with contextlib.redirect_stderr(io.StringIO()) as err:
+            bound = self._claim(port)
+        self.assertNotEqual(bound, port)
+        self.assertIsNone(child.poll())
+        self.assertIn("--takeover", err.getvalue())
+
+    def test_same_spec_is_replaced(self):
+        child, port = self._holder(self.spec_path)
+        self.assertEqual(self._claim(port), port)
+        self.assertIsNotNone(child.wait(5))
+
+    def test_takeover(self):
+        child, port = self._holder(self.tmpdir / "other.json")
+        self.assertEqual(self._claim(port, takeover=True), port)
+        self.assertIsNotNone(child.wait(5))
+
+
+class TestMetrics(_ServerMixin, unittest.TestCase):
+    def setUp(self):
+        self.metrics = serve.Metrics()
+        self.handler_kwargs = {"metrics": self.metrics}
+        super().setUp()
+
+    def test_histogram(self):
+        hist = serve.Histogram((1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            hist.observe(value)
+        snap = hist.snapshot()
+        self.assertEqual(snap["count"], 5)
+        self.assertEqual(snap["buckets"], {"le_1": 1, "le_10": 2, "le_100": 1, "inf": 1})
+        self.assertEqual(snap["p50"], 10)
+        self.assertEqual(snap["p99"], 500)
+
+    def test_endpoint_stats(self):
+        for _ in range(3):
+            self._request("GET", "/api/spec")
+        resp, _ = self._request("GET", "/api/spec")
+        self._request("GET", "/api/spec", headers={"If-None-Match": resp.getheader("ETag")})
+        self._post_json("/api/heartbeat", {})
+        self._post_json("/api/heartbeat", {})
+
+        resp, body = self._request("GET", "/api/metrics")
+        self.assertEqual(resp.status, 200)
+        snap = json.loads(body)
+        spec = snap["endpoints"]["GET /api/spec"]
+        self.assertEqual(spec["count"], 5)
+        self.assertEqual(spec["status"], {"200": 4, "304": 1})
+        self.assertEqual(spec["bytes_sent"], 4 * len(self.board.spec_cache.get().body))
+        self.assertEqual(snap["spec_cache"]["misses"], 1)
+        self.assertGreater(snap["spec_cache"]["hit_ratio"], 0.5)
+        self.assertEqual(snap["heartbeat_interval_s"]["count"], 1)
+
+    def test_event_stream_bytes_are_counted(self):
+        conn = HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        self.addCleanup(conn.close)
+        conn.request("GET", "/api/events")
+        resp = conn.getresponse()
+        streamed = b""
+        while b"event: hello" not in streamed:
+            streamed += resp.fp.readline()
+        self.registry.finish(self.board, serve.EXIT_USER_CANCELLED)
+        streamed += resp.read()  # the closed event, then the server hangs up
+        self.assertIn(b"event: closed", streamed)
+        self.assertEqual(self._endpoint("GET /api/events")["bytes_sent"], len(streamed))
+
+    def test_head_counts_no_body(self):
+        resp, body = self._request("HEAD", "/api/spec")
+        self.assertEqual(body, b"")
+        self.assertEqual(self._endpoint("HEAD /api/spec")["bytes_sent"], 0)
+
+    def _endpoint(self, label):
+        # A request is recorded just after its response went out.
+        for _ in range(100):
+            endpoints = self.metrics.snapshot(self.registry.boards())["endpoints"]
+            if label in endpoints:
+                return endpoints[label]
+            time.sleep(0.02)
+        self.fail(f"{label} was never recorded")
+
+    def test_route_labels(self):
+        self.assertEqual(serve._route_label("GET", "/b/one/api/spec"), "GET /b/*/api/spec")
+        self.assertEqual(serve._route_label("GET", "/static/board.ab12.js"), "GET /static/*")
+        self.assertEqual(
+            serve._route_label("GET", "/api/boards/x/wait"), "GET /api/boards/*/wait"
+        )
+
+
+class TestConcurrency(_ServerMixin, unittest.TestCase):
+    def test_keep_alive_reuses_connection(self):
+        conn = HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        try:
+            for path in ("/", "/api/heartbeat", "/"):
+                conn.request("GET" if path == "/" else "POST", path)
+                resp = conn.getresponse()
+                resp.read()
+                self.assertEqual(resp.status, 200)
+                self.assertEqual(resp.version, 11)
+                self.assertFalse(resp.will_close)
+        finally:
+            conn.close()
+
+    def test_stalled_client_does_not_block_heartbeat(self):
+        # A client that never finishes its request used to hold the only
+        # handler thread.
+        stalled = socket.create_connection(("127.0.0.1", self.server.server_address[1]))
+        try:
+            stalled.sendall(b"GET / HTTP/1.1\r\nHost: x\r\n")
+            resp, _ = self._request("POST", "/api/heartbeat")
+            self.assertEqual(resp.status, 200)
+        finally:
+            stalled.close()
+
+
+# --------------------
+# heartbeat deadline
+# --------------------
+
+
+class TestLiveness(_TmpDirMixin, unittest.TestCase):
+    def _board(self, timeout):
+        board = serve.Board(self._write_spec(_spec()), self.tmpdir / "r.json")
+        serve.BoardRegistry(root=board, heartbeat_timeout=timeout)
+        return board
+
+    def test_expires_without_heartbeat(self):
+        board = self._board(0.05)
+        self.assertTrue(board.done.wait(2))
+        self.assertEqual(board.exit_code, serve.EXIT_HEARTBEAT_TIMEOUT)
+
+    def test_heartbeat_rearms(self):
+        board = self._board(0.3)
+        for _ in range(5):
+            time.sleep(0.1)
+            board.heartbeat()
+        self.assertIsNone(board.exit_code)
+        self.assertTrue(board.done.wait(2))
+        self.assertEqual(board.exit_code, serve.EXIT_HEARTBEAT_TIMEOUT)
+
+    def test_finish_cancels_deadline(self):
+        board = self._board(0.05)
+        board.finish(serve.EXIT_SUBMITTED)
+        time.sleep(0.15)
+        self.assertEqual(board.exit_code, serve.EXIT_SUBMITTED)
+
+    def test_duration_parsing(self):
+        self.assertEqual(serve._duration("60"), 60.0)
+        self.assertEqual(serve._duration("1.5s"), 1.5)
+        self.assertAlmostEqual(serve._duration("250ms"), 0.25)
+        with self.assertRaises(Exception):
+            serve._duration("0")
+
+
+class TestEventStream(_ServerMixin, unittest.TestCase):
+    def _make_registry(self):
+        self.spec_path = self._write_spec(_spec())
+        self.result_path = self.tmpdir / "result.json"
+        self.board = serve.Board(self.spec_path, self.result_path)
+        return serve.BoardRegistry(
+            root=self.board, heartbeat_timeout=0.2, disconnect_grace=0.1,
+        )
+
+    def _open_stream(self):
+        conn = HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+        conn.request("GET", "/api/events")
+        resp = conn.getresponse()
+        self.assertEqual(resp.getheader("Content-Type"), "text/event-stream")
+        self.addCleanup(resp.close)
+        self.addCleanup(conn.close)
+        return conn, resp
+
+    def _close(self, conn, resp):
+        # the response holds its own reference to the socket
+        resp.close()
+        conn.close()
+
+    def _read_event(self, resp):
+        lines = []
+        while True:
+            line = resp.fp.readline().decode()
+            if line == "\n" and any(l.startswith("event:") for l in lines):
+                return lines
+            if line.strip():
+                lines.append(line.strip())
+
+    def test_open_stream_holds_deadline(self):
+        conn, resp = self._open_stream()
+        try:
+            self.assertIn("event: hello", self._read_event(resp))
+            time.sleep(0.4)  # twice the heartbeat timeout
+            self.assertIsNone(self.board.exit_code)
+        finally:
+            self._close(conn, resp)
+        # closing the stream ends the board after the grace period
+        self.assertTrue(self.board.done.wait(2))
+        self.assertEqual(self.board.exit_code, serve.EXIT_HEARTBEAT_TIMEOUT)
+
+    def test_reconnect_within_grace_keeps_board(self):
+        conn, resp = self._open_stream()
+        self._read_event(resp)
+        self._close(conn, resp)
+        conn, resp = self._open_stream()
+        self._read_event(resp)
+        time.sleep(0.3)
+        self.assertIsNone(self.board.exit_code)
+
+    def test_publish_and_closed_event(self):
+        conn, resp = self._open_stream()
+        try:
+            self._read_event(resp)
+            self.board.publish("note", {"x": 1})
+            self.assertIn('data: {"x":1}', self._read_event(resp))
+            self._post_json("/api/submit", {"decisions": {}})
+            event = self._read_event(resp)
+            self.assertIn("event: closed", event)
+            self.assertIn('data: {"exit_code":0}', event)
+        finally:
+            self._close(conn, resp)
+
+    def test_spec_edit_is_pushed_as_diff(self):
+        conn, resp = self._open_stream()
+        self._read_event(resp)
+        spec = _spec(3)
+        spec["decisions"][1]["title"] = "Edited"
+        self.spec_path.write_text(json.dumps(spec), encoding="utf-8")
+        st = self.spec_path.stat()
+        os.utime(self.spec_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        event = self._read_event(resp)
+        self.assertIn("event: spec", event)
+        patch = json.loads(next(l for l in event if l.startswith("data:"))[5:])
+        self.assertEqual([d["id"] for d in patch["decisions"]], ["2", "3"])
+        self.assertEqual(patch["order"], ["1", "2", "3"])
+        self.assertEqual(patch["removed"], [])
+
+
+class TestSpecDiff(unittest.TestCase):
+    def test_only_changed_decisions(self):
+        old = _validated(_spec(3))
+        new = _validated(_spec(3, subtitle="now with subtitle"))
+        new["decisions"][0]["options"].append({"key": "c", "label": "C"})
+        del new["decisions"][2]
+        diff = serve.spec_diff(old, new)
+        self.assertEqual([d["id"] for d in diff["decisions"]], ["1"])
+        self.assertEqual(diff["removed"], ["3"])
+        self.assertEqual(diff["order"], ["1", "2"])
+        self.assertEqual(diff["set"], {"subtitle": "now with subtitle"})
+        self.assertEqual(diff["unset"], [])
+
+    def test_identical_spec_is_empty(self):
+        diff = serve.spec_diff(_validated(_spec()), _validated(_spec()))
+        self.assertEqual(diff["decisions"], [])
+        self.assertEqual(diff["set"], {})
+
+    def test_large_spec_single_edit(self):
+        old = _validated(_spec(5000))
+        new = _validated(_spec(5000))
+        new["decisions"][10]["title"] = "Edited"
+        del new["decisions"][-1]
+        diff = serve.spec_diff(old, new)
+        self.assertEqual([d["id"] for d in diff["decisions"]], ["11"])
+        self.assertEqual(diff["removed"], ["5000"])
+
+
+# --------------------
+# multi-board mode
+# --------------------
+
+
+class TestMultiBoard(_ServerMixin, unittest.TestCase):
+    def _make_registry(self):
+        return serve.BoardRegistry(heartbeat_timeout=None)
+
+    def _add(self, name, **extra):
+        spec = self._write_spec(_spec(), name)
+        return self._post_json("/api/boards", {"spec": str(spec), **extra})
+
+    def test_boards_are_isolated(self):
+        resp, one = self._add("one.json")
+        self.assertEqual(resp.status, 201)
+        _, two = self._add("two.json", output=str(self.tmpdir / "two.result.json"))
+        self.assertEqual(one["url_path"], "/b/one/")
+
+        resp, body = self._request("GET", "/b/one/")
+        self.assertEqual(resp.status, 200)
+        resp, _ = self._request("GET", "/b/one")
+        self.assertEqual(resp.status, 301)
+        self.assertEqual(resp.getheader("Location"), "/b/one/")
+
+        self._post_json("/b/two/api/submit", {"decisions": {}})
+        _, waited = self._request("GET", "/api/boards/two/wait?timeout=1")
+        self.assertEqual(json.loads(waited)["exit_code"], serve.EXIT_SUBMITTED)
+        self.assertTrue((self.tmpdir / "two.result.json").exists())
+        self.assertEqual(two["result_format"], "pretty")
+        self.assertIsNone(self.registry.get("one").exit_code)
+
+        # a finished board refuses a second submit
+        resp, _ = self._post_json("/b/two/api/submit", {"decisions": {}})
+        self.assertEqual(resp.status, 409)
+
+    def test_register_with_result_format(self):
+        resp, info = self._add("nd.json", format="ndjson")
+        self.assertEqual(resp.status, 201)
+        self.assertEqual(info["result_format"], "ndjson")
+        resp, body = self._add("bad-format.json", format="xml")
+        self.assertEqual(resp.status, 400)
+        self.assertIn("result format", body["error"])
+
+    def test_non_string_id_or_format_rejected(self):
+        for extra in ({"id": 123}, {"format": ["ndjson"]}):
+            resp, body = self._add("typed.json", **extra)
+            self.assertEqual(resp.status, 400)
+            self.assertIn("must be strings", body["error"])
+        self.assertEqual(self.registry.boards(), [])
+
+    def test_duplicate_stem_gets_suffix(self):
+        self._add("same.json")
+        sub = self.tmpdir / "sub"
+        sub.mkdir()
+        spec = sub / "same.json"
+        spec.write_text(json.dumps(_spec()))
+        _, info = self._post_json("/api/boards", {"spec": str(spec)})
+        self.assertEqual(info["id"], "same-2")
+
+    def test_invalid_spec_rejected(self):
+        spec = self._write_spec({"title": "x", "decisions": []}, "bad.json")
+        resp, body = self._post_json("/api/boards", {"spec": str(spec)})
+        self.assertEqual(resp.status, 400)
+        self.assertIn("decisions", body["error"])
+        self.assertEqual(body["errors"][0]["pointer"], "/decisions")
+
+    def test_register_requires_json_content_type(self):
+        spec = self._write_spec(_spec(), "x.json")
+        resp, _ = self._request(
+            "POST", "/api/boards", body=json.dumps({"spec": str(spec)}),
+            headers={"Content-Type": "text/plain"},
+        )
+        self.assertEqual(resp.status, 415)
+
+    def test_delete_retires_pending_board(self):
+        self._add("gone.json")
+        resp, body = self._request("DELETE", "/api/boards/gone")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(json.loads(body)["exit_code"], serve.EXIT_USER_CANCELLED)
+        resp, _ = self._request("GET", "/b/gone/")
+        self.assertEqual(resp.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
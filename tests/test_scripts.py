@@ -1,4 +1,5 @@
-"""Tests for scripts/ — validate.py, version_bump.py"""
+"""Tests for scripts/ — validate.py, version_bump.py, bench_decision_board.py,
+bench_trac_parse.py"""
 
 import shutil
 import sys
@@ -9,6 +10,8 @@ from pathlib import Path
 SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
 sys.path.insert(0, str(SCRIPTS_DIR))
 
+import bench_decision_board
+import bench_trac_parse
 import validate
 import version_bump
 
@@ -169,5 +172,54 @@ class TestUpdateFrontmatterVersion(_TmpDirMixin, unittest.TestCase):
         self.assertIn("## Instructions\nDo stuff", p.read_text())
 
 
+# --------------------
+# bench_decision_board.py
+# --------------------
+
+
+class TestBenchDecisionBoard(unittest.TestCase):
+    def test_synthetic_spec_is_valid(self):
+        spec = bench_decision_board.make_spec(25, md_chars=300)
+        bench_decision_board.serve.validate_spec(spec)
+        self.assertEqual(len(spec["decisions"]), 25)
+        self.assertGreaterEqual(len(spec["decisions"][0]["context"]), 300)
+
+    def test_run_reports_every_size(self):
+        report = bench_decision_board.run([3, 6], repeat=1, md_chars=100)
+        self.assertEqual([r["decisions"] for r in report["results"]], [3, 6])
+        row = report["results"][0]
+        for key in ("parse_ms", "validate_ms", "render_ms", "api_spec_warm_ms"):
+            self.assertIn("median", row[key])
+        self.assertGreater(row["peak_memory_kb"], 0)
+
+    def test_compare_flags_slowdowns(self):
+        old = {"results": [{"decisions": 10, "render_ms": {"median": 1.0}, "peak_memory_kb": 100}]}
+        new = {"results": [{"decisions": 10, "render_ms": {"median": 2.0}, "peak_memory_kb": 101}]}
+        regressions = bench_decision_board.compare(old, new, threshold=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("render_ms", regressions[0])
+
+
+# --------------------
+# bench_trac_parse.py
+# --------------------
+
+
+class TestBenchTracParse(unittest.TestCase):
+    def test_extractors_agree_on_synthetic_pages(self):
+        pages = [(f"p{n}", bench_trac_parse.make_page(n)) for n in (0, 5)]
+        report = bench_trac_parse.run(pages, repeat=1)
+        self.assertEqual([r["page"] for r in report["results"]], ["p0", "p5"])
+        for row in report["results"]:
+            self.assertEqual(row["mismatches"], [])
+            self.assertIn("median", row["scan_ms"])
+
+    def test_synthetic_page_fields(self):
+        fields = bench_trac_parse.scan_extract(bench_trac_parse.make_page(3))
+        self.assertEqual(fields["summary"], "QuerySet crash when renaming a field")
+        self.assertEqual(fields["old_values"]["stage"], "Accepted")
+        self.assertTrue(fields["description"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,987 @@
+"""Tests for django-ticket-triage's scripts against a local fake Trac/forum."""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+from xml.etree import ElementTree
+from urllib.error import HTTPError, URLError
+
+ROOT = Path(__file__).parent.parent
+SCRIPTS_DIR = ROOT / "skills" / "django-ticket-triage" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import forum
+import http_cache
+import trac
+
+# --------------------
+# helpers
+# --------------------
+
+TICKET_HTML = """<!DOCTYPE html>
+<html><head><title>#{id} (Crash when renaming a field) – Django</title></head>
+<body>
+<div class="date">
+  <p>Opened <a class="timeline" href="/timeline" title="See timeline at Dec 20, 2025, 8:56:37 AM">3 weeks ago</a></p>
+  <p>Last modified <a class="timeline" href="/timeline" title="See timeline at Dec 23, 2025, 3:37:30 AM">2 weeks ago</a></p>
+</div>
+<div class="description"><h3>Description</h3>
+  <div class="searchable"><p>Renaming a field crashes.<br/>Steps {{below}}.</p></div>
+</div>
+<script>
+  var old_values = {{"component": "Migrations", "has_patch": "1", "keywords": "migration, m2m",
+    "owner": "", "reporter": "alice", "resolution": "", "severity": "Normal",
+    "stage": "Accepted", "status": "new", "version": "6.0", "summary": "a {{brace}} \\"q\\""}};
+</script>
+</body></html>
+"""
+
+TICKET_RSS = """<?xml version="1.0"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>Ticket #{id}</title>
+<item><dc:creator>bob</dc:creator><pubDate>Sun, 21 Dec 2025 10:00:00 GMT</pubDate>
+  <description>&lt;p&gt;Reproduced.&lt;/p&gt;</description></item>
+<item><dc:creator>carol</dc:creator><pubDate>Mon, 22 Dec 2025 10:00:00 GMT</pubDate>
+  <description>&lt;p&gt;Accepted.&lt;/p&gt;</description></item>
+</channel></rss>
+"""
+
+
+TICKET_CSV_ROW = {
+    "summary": "Crash when renaming a field",
+    "reporter": "alice",
+    "owner": "",
+    "component": "Migrations",
+    "version": "6.0",
+    "severity": "Normal",
+    "status": "new",
+    "resolution": "",
+    "keywords": "migration, m2m",
+    "stage": "Accepted",
+    "has_patch": "1",
+    "time": "2025-12-20T08:56:37+00:00",
+    "changetime": "2025-12-23T03:37:30+00:00",
+    "description": "Renaming a field crashes.\r\nSteps, \"quoted\", {below}.",
+}
+
+
+def query_route(ticket_ids, overrides=None, changed=None):
+    """``/query?format=csv`` answering for the known ``ticket_ids``.
+
+    ``overrides`` maps a ticket id to the fields that differ from
+    ``TICKET_CSV_ROW``. A ``changetime`` query lists the ids in ``changed``
+    (a list the test may update), whatever the time.
+    """
+    known = set(ticket_ids)
+    overrides = overrides or {}
+
+    def route(handler):
+        params = parse_qs(urlsplit(handler.path).query)
+        if params.get("format") != ["csv"]:
+            return 404, {}, "not found"
+        cols = params["col"]
+        if "changetime" in params:
+            wanted = set(changed or ())
+        elif "id" in params:
+            wanted = known.intersection(int(i) for i in params["id"][0].split(","))
+        else:
+            wanted = known
+        out = io.StringIO()
+        writer = csv.writer(out)  # Trac writes a BOM and CRLF line ends
+        writer.writerow(cols)
+        for ticket_id in sorted(wanted):
+            row = {**TICKET_CSV_ROW, **overrides.get(ticket_id, {}), "id": str(ticket_id)}
+            writer.writerow([row[col] for col in cols])
+        return 200, {"Content-Type": "text/csv"}, "\ufeff" + out.getvalue()
+
+    return route
+
+
+def ticket_routes(*ticket_ids):
+    routes = {"/query": query_route(ticket_ids)}
+    for ticket_id in ticket_ids:
+        routes[f"/ticket/{ticket_id}"] = (200, {}, TICKET_HTML.format(id=ticket_id))
+        routes[f"/ticket/{ticket_id}?format=rss"] = (200, {}, TICKET_RSS.format(id=ticket_id))
+    return routes
+
+
+class FakeTrac:
+    """A keep-alive HTTP/1.1 server serving canned ``routes``.
+
+    ``routes`` maps a request path (with query, or without it to match any
+    query) to ``(status, headers, body)`` or to a callable ``(handler) ->``
+    one of those. Every request
+    path is appended to ``requests``; ``connections`` counts TCP connections.
+    """
+
+    def __init__(self, routes=None):
+        self.routes = dict(routes or {})
+        self.requests = []
+        self.connections = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake.lock:
+                    fake.connections += 1
+
+            def do_GET(self):
+                with fake.lock:
+                    fake.requests.append(self.path)
+                route = fake.routes.get(self.path)
+                if route is None:
+                    route = fake.routes.get(self.path.split("?", 1)[0])
+                while callable(route):
+                    route = route(self)
+                status, headers, body = route or (404, {}, "not found")
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _FakeTracMixin:
+    routes = {}
+
+    def setUp(self):
+        self.fake = FakeTrac(self.routes)
+        patches = [
+            mock.patch.object(trac, "TRAC_BASE_URL", self.fake.url),
+            mock.patch.object(trac, "_backoff_delay", return_value=0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        environ = mock.patch.dict(os.environ)  # the fake is never behind a proxy
+        environ.start()
+        self.addCleanup(environ.stop)
+        for name in [n for n in os.environ if n.lower().endswith("_proxy")]:
+            del os.environ[name]
+        self.addCleanup(trac.set_rate_limit, trac.RATE_LIMIT, trac.RATE_BURST)
+        trac.set_rate_limit(None)
+        trac.close_connections()
+        self.addCleanup(trac.close_connections)
+        self.addCleanup(self.fake.close)
+        self.addCleanup(
+            http_cache.configure,
+            ttl=http_cache.TTL, offline=http_cache.OFFLINE, enabled=http_cache.ENABLED,
+        )
+        # Network tests see every request; TestHttpCache turns the cache on.
+        http_cache.configure(enabled=False)
+
+
+# --------------------
+# connection pool
+# --------------------
+
+
+class TestConnectionPool(_FakeTracMixin, unittest.TestCase):
+    routes = {
+        **ticket_routes(1, 2),
+        "/moved": (301, {"Location": "/ticket/1"}, ""),
+        "/loop": (302, {"Location": "/loop"}, ""),
+        "/closing": (200, {"Connection": "close"}, "bye"),
+    }
+
+    def test_requests_reuse_one_connection(self):
+        for _ in range(3):
+            trac._request_text(f"{self.fake.url}/ticket/1")
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertEqual(self.fake.connections, 1)
+
+    def test_get_ticket_reuses_pooled_connections(self):
+        for ticket_id in (1, 2, 1):
+            trac.get_ticket(ticket_id)
+        self.assertEqual(len(self.fake.requests), 6)
+        # At most one connection each for the page and the feed.
+        self.assertLessEqual(self.fake.connections, 2)
+
+    def test_stale_connection_is_replaced_transparently(self):
+        def drop_after(handler):
+            # Answer without "Connection: close", then hang up anyway, the
+            # way a server reaps an idle keep-alive connection.
+            handler.close_connection = True
+            return 200, {}, "ok"
+
+        self.fake.routes["/drop"] = drop_after
+        trac._request_text(f"{self.fake.url}/drop")
+        time.sleep(0.1)
+        with mock.patch.object(trac.time, "sleep") as sleep:
+            self.assertIn("Crash", trac._request_text(f"{self.fake.url}/ticket/1"))
+        sleep.assert_not_called()
+        self.assertEqual(self.fake.connections, 2)
+
+    def test_connection_close_response_is_not_pooled(self):
+        self.assertEqual(trac._request_text(f"{self.fake.url}/closing"), "bye")
+        self.assertEqual(sum(len(idle) for idle in trac._pool.values()), 0)
+
+    def test_follows_redirects(self):
+        self.assertIn("Crash", trac._request_text(f"{self.fake.url}/moved"))
+        self.assertEqual(self.fake.requests, ["/moved", "/ticket/1"])
+
+    def test_redirect_loop_gives_up(self):
+        with self.assertRaises(URLError):
+            trac._request_bytes(f"{self.fake.url}/loop")
+
+    def test_plain_http_goes_through_the_proxy(self):
+        def proxied(handler):
+            return 200, {}, handler.headers.get("Proxy-Authorization", "")
+
+        self.fake.routes["http://trac.example/ticket/1"] = proxied
+        os.environ["http_proxy"] = self.fake.url.replace("http://", "http://bob:s%40lt@")
+        self.assertEqual(trac._request_text("http://trac.example/ticket/1"), "Basic Ym9iOnNAbHQ=")
+        self.assertEqual(self.fake.requests, ["http://trac.example/ticket/1"])
+
+    def test_no_proxy_bypasses_the_proxy(self):
+        os.environ["http_proxy"] = "http://127.0.0.1:9"
+        os.environ["no_proxy"] = "127.0.0.1"
+        self.assertIn("Crash", trac._request_text(f"{self.fake.url}/ticket/1"))
+
+    def test_https_is_tunnelled_through_the_proxy(self):
+        os.environ["https_proxy"] = "http://bob:pw@proxy.example:3128"
+        proxy = trac._proxy_for("https", "code.djangoproject.com")
+        conn, reused = trac._acquire("https", "code.djangoproject.com", proxy)
+        self.assertFalse(reused)
+        self.assertEqual((conn.host, conn.port), ("proxy.example", 3128))
+        self.assertEqual(conn._tunnel_host, "code.djangoproject.com")
+        self.assertTrue(conn._tunnel_headers["Proxy-Authorization"].startswith("Basic "))
+        self.assertIsNone(trac._proxy_for("http", "code.djangoproject.com"))
+
+    def test_client_error_raises_http_error_without_retry(self):
+        with self.assertRaises(HTTPError) as ctx:
+            trac._request_bytes(f"{self.fake.url}/missing")
+        self.assertEqual(ctx.exception.code, 404)
+        self.assertEqual(self.fake.requests, ["/missing"])
+
+    def test_retryable_status_is_retried_with_retry_after(self):
+        calls = []
+
+        def flaky(handler):
+            calls.append(1)
+            if len(calls) < 3:
+                return 503, {"Retry-After": "7"}, "busy"
+            return 200, {}, "ok"
+
+        self.fake.routes["/flaky"] = flaky
+        with mock.patch.object(trac.time, "sleep"):
+            self.assertEqual(trac._request_text(f"{self.fake.url}/flaky"), "ok")
+        self.assertEqual(len(calls), 3)
+        trac._backoff_delay.assert_called_with(2, "7")
+
+    def test_unreachable_host_raises_url_error(self):
+        self.fake.close()
+        with mock.patch.object(trac.time, "sleep"), self.assertRaises(URLError):
+            trac._request_bytes(f"{self.fake.url}/ticket/1")
+
+
+# --------------------
+# ticket parsing
+# --------------------
+
+
+class TestGetTicket(_FakeTracMixin, unittest.TestCase):
+    routes = ticket_routes(36814)
+
+    def assert_common_fields(self, ticket):
+        self.assertEqual(ticket["id"], 36814)
+        self.assertEqual(ticket["summary"], "Crash when renaming a field")
+        self.assertEqual(ticket["component"], "Migrations")
+        self.assertEqual(ticket["keywords"], ["migration", "m2m"])
+        self.assertIsNone(ticket["owner"])
+        self.assertTrue(ticket["has_patch"])
+        self.assertEqual(ticket["triage_stage"], "Accepted")
+        self.assertEqual(
+            [(c["author"], c["content"]) for c in ticket["comments"]],
+            [("bob", "Reproduced."), ("carol", "Accepted.")],
+        )
+        self.assertEqual(list(ticket)[-1], "comments")
+
+    def test_html_backend(self):
+        ticket = trac.get_ticket(36814, backend="html")
+        self.assert_common_fields(ticket)
+        self.assertEqual(ticket["created"], "Dec 20, 2025, 8:56:37 AM")
+        self.assertEqual(ticket["last_modified"], "Dec 23, 2025, 3:37:30 AM")
+        self.assertEqual(ticket["description"], "Renaming a field crashes.\nSteps {below}.")
+        self.assertNotIn("/query", "".join(self.fake.requests))
+
+    def test_html_backend_is_the_default(self):
+        ticket = trac.get_ticket(36814)
+        self.assertEqual(ticket["created"], "Dec 20, 2025, 8:56:37 AM")
+        self.assertFalse(any(p.startswith("/query") for p in self.fake.requests))
+
+    def test_csv_backend(self):
+        ticket = trac.get_ticket(36814, backend="csv")
+        self.assert_common_fields(ticket)
+        self.assertEqual(ticket["created"], "2025-12-20T08:56:37+00:00")
+        self.assertEqual(ticket["last_modified"], "2025-12-23T03:37:30+00:00")
+        self.assertEqual(
+            ticket["description"], 'Renaming a field crashes.\nSteps, "quoted", {below}.'
+        )
+        self.assertNotIn("/ticket/36814", self.fake.requests)
+
+    def test_same_keys_from_both_backends(self):
+        self.assertEqual(
+            list(trac.get_ticket(36814, backend="csv")),
+            list(trac.get_ticket(36814, backend="html")),
+        )
+
+    def test_falls_back_to_html_when_export_unavailable(self):
+        for route in [(403, {}, "no export"), (200, {}, "<!DOCTYPE html><p>login</p>")]:
+            self.fake.routes["/query"] = route
+            ticket = trac.get_ticket(36814, backend="auto")
+            self.assertEqual(ticket["created"], "Dec 20, 2025, 8:56:37 AM")
+
+    def test_csv_backend_does_not_fall_back(self):
+        self.fake.routes["/query"] = (403, {}, "no export")
+        with self.assertRaises(HTTPError):
+            trac.get_ticket(36814, backend="csv")
+        self.fake.routes["/query"] = query_route([36814])
+        with self.assertRaises(ValueError):
+            trac.get_ticket(1, backend="csv")  # not in the export
+        with self.assertRaises(ValueError):
+            trac.get_ticket(36814, backend="xml")
+
+    def test_query_tickets_chunks_ids(self):
+        self.fake.routes["/query"] = query_route(range(1, 8))
+        with mock.patch.object(trac, "QUERY_CHUNK", 3):
+            tickets = trac.query_tickets([7, 1, 2, 3, 4, 5, 6, 99, 1])
+        self.assertEqual(sorted(tickets), [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(len(self.fake.requests), 3)
+        self.assertNotIn("comments", tickets[1])
+
+    def test_page_and_feed_are_fetched_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        for path, route in ticket_routes(36814).items():
+            def wait_for_sibling(handler, route=route):
+                barrier.wait()  # raises BrokenBarrierError if fetched serially
+                return route
+
+            self.fake.routes[path] = wait_for_sibling
+        ticket = trac.get_ticket(36814)
+        self.assertEqual(len(ticket["comments"]), 2)
+
+    def test_missing_ticket_raises_page_error(self):
+        with self.assertRaises(HTTPError) as ctx:
+            trac.get_ticket(404)
+        self.assertEqual(ctx.exception.code, 404)
+        self.assertIn("/ticket/404", ctx.exception.url)
+        self.assertNotIn("format=rss", ctx.exception.url)
+
+    def test_feed_failure_raises_feed_error(self):
+        self.fake.routes["/ticket/36814?format=rss"] = (403, {}, "forbidden")
+        with self.assertRaises(HTTPError) as ctx:
+            trac.get_ticket(36814)
+        self.assertEqual(ctx.exception.code, 403)
+        self.assertIn("format=rss", ctx.exception.url)
+
+
+class TestParseTicketPage(unittest.TestCase):
+    def test_fixture_page(self):
+        page = trac.parse_ticket_page(TICKET_HTML.format(id=7))
+        self.assertEqual(page["summary"], "Crash when renaming a field")
+        self.assertEqual(page["created"], "Dec 20, 2025, 8:56:37 AM")
+        self.assertEqual(page["old_values"]["summary"], 'a {brace} "q"')
+
+    def test_nested_div_stays_in_description(self):
+        html = (
+            '<div class="description"><div class="searchable">'
+            '<p>Before</p><div class="code"><pre>x = 1</pre></div><p>After</p>'
+            '</div></div><div class="change"><p>comment</p></div>'
+        )
+        self.assertEqual(trac.parse_ticket_page(html)["description"], "Beforex = 1After")
+
+    def test_missing_parts_fall_back_to_defaults(self):
+        page = trac.parse_ticket_page("<html><script>var old_values = {broken</script></html>")
+        self.assertEqual(
+            page,
+            {"summary": "", "created": None, "last_modified": None,
+             "description": "", "old_values": {}},
+        )
+
+
+def rss_feed(count, body_chars=20):
+    """A ticket feed of ``count`` comments, one a day from Dec 1, 2025."""
+    items = "".join(
+        f"<item><dc:creator>user{i}</dc:creator>"
+        f"<pubDate>{(datetime(2025, 12, 1, tzinfo=timezone.utc) + timedelta(days=i)):%a, %d %b %Y %H:%M:%S GMT}</pubDate>"
+        f"<description>&lt;p&gt;comment {i} {'x' * body_chars}&lt;/p&gt;</description></item>"
+        for i in range(count)
+    )
+    return (
+        '<?xml version="1.0"?><rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f"<channel><title>Ticket</title>{items}</channel></rss>"
+    ).encode()
+
+
+class TestRssComments(unittest.TestCase):
+    def test_streams_in_feed_order(self):
+        comments = trac.iter_rss_comments(rss_feed(3))
+        first = next(comments)
+        self.assertEqual(first["author"], "user0")
+        self.assertEqual(first["content"], "comment 0 " + "x" * 20)
+        self.assertEqual([c["author"] for c in comments], ["user1", "user2"])
+
+    def test_since_skips_older_comments(self):
+        comments = list(trac.iter_rss_comments(rss_feed(10), since=datetime(2025, 12, 8)))
+        self.assertEqual([c["author"] for c in comments], ["user7", "user8", "user9"])
+
+    def test_newest_limit_whatever_the_feed_order(self):
+        feed = list(trac.iter_rss_comments(rss_feed(10)))
+        for ordered in (feed, feed[::-1]):
+            newest = trac._select_comments(iter(ordered), 3)
+            self.assertEqual([c["author"] for c in newest], ["user7", "user8", "user9"])
+        self.assertEqual(trac._select_comments(iter(feed), 0), [])
+        self.assertEqual(len(trac._select_comments(iter(feed), 50)), 10)
+
+    def test_undated_comments_count_as_oldest(self):
+        comments = [{"author": "a", "date": "", "content": ""}, *trac.iter_rss_comments(rss_feed(2))]
+        self.assertEqual([c["author"] for c in trac._select_comments(comments, 2)],
+                         ["user0", "user1"])
+
+    def test_peak_memory_stays_flat(self):
+        content = rss_feed(400, body_chars=5000)
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            ElementTree.fromstring(content)
+            tree_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            for _ in trac.iter_rss_comments(content):
+                pass
+            stream_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(stream_peak, tree_peak / 4)
+
+
+class TestGetComments(_FakeTracMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.fake.routes["/ticket/5?format=rss"] = (200, {}, rss_feed(6))
+
+    def test_since_and_limit(self):
+        comments = trac.get_comments(5, since=datetime(2025, 12, 3), limit=2)
+        self.assertEqual([c["author"] for c in comments], ["user4", "user5"])
+
+    def test_cli(self):
+        out = io.StringIO()
+        argv = ["trac.py", "comments", "5", "--limit=1"]
+        with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(out):
+            trac.main()
+        self.assertEqual([c["author"] for c in json.loads(out.getvalue())], ["user5"])
+
+
+# --------------------
+# bulk fetch
+# --------------------
+
+
+class TestHostLimiter(unittest.TestCase):
+    def test_burst_then_rate(self):
+        limiter = trac._HostLimiter(rate=50, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.02)
+        for _ in range(5):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+    def test_defer_holds_every_caller(self):
+        limiter = trac._HostLimiter(rate=None, burst=1)
+        limiter.defer(0.1)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        limiter.defer(0.0)  # never moves the hold earlier
+        limiter.acquire()
+
+
+class TestParseTicketIds(unittest.TestCase):
+    def test_separators_and_hash(self):
+        self.assertEqual(trac.parse_ticket_ids("1, #2\n3\t 4"), [1, 2, 3, 4])
+
+    def test_rejects_garbage(self):
+        with self.assertRaises(ValueError):
+            trac.parse_ticket_ids("12 abc")
+
+
+class TestGetMany(_FakeTracMixin, unittest.TestCase):
+    routes = ticket_routes(*range(1, 9))
+
+    def test_yields_each_ticket_once(self):
+        results = list(trac.get_many([3, 1, 2, 3, 8], workers=3, backend="csv"))
+        self.assertEqual(sorted(r["id"] for r in results), [1, 2, 3, 8])
+        self.assertTrue(all(r["summary"] == "Crash when renaming a field" for r in results))
+        # One CSV query for all the fields, then one feed per ticket.
+        self.assertEqual(len(self.fake.requests), 5)
+        self.assertEqual(sum(p.startswith("/query?") for p in self.fake.requests), 1)
+
+    def test_html_backend_scrapes_each_page(self):
+        results = list(trac.get_many([1, 2]))
+        self.assertEqual({r["created"] for r in results}, {"Dec 20, 2025, 8:56:37 AM"})
+        self.assertFalse(any(p.startswith("/query") for p in self.fake.requests))
+
+    def test_tickets_missing_from_export_fall_back_per_ticket(self):
+        self.fake.routes["/query"] = query_route([1])
+        results = {r["id"]: r for r in trac.get_many([1, 2, 404], backend="auto")}
+        self.assertEqual(results[1]["created"], "2025-12-20T08:56:37+00:00")
+        self.assertEqual(results[2]["created"], "Dec 20, 2025, 8:56:37 AM")
+        self.assertIn("404", results[404]["error"])
+
+    def test_fetches_concurrently_up_to_worker_limit(self):
+        active = [0, 0]  # current, peak
+        lock = threading.Lock()
+        for path, route in ticket_routes(*range(1, 9)).items():
+            def slow(handler, route=route):
+                with lock:
+                    active[0] += 1
+                    active[1] = max(active[1], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+                return route
+
+            self.fake.routes[path] = slow
+        results = list(trac.get_many(range(1, 9), workers=2))
+        self.assertEqual(len(results), 8)
+        self.assertGreater(active[1], 1)
+        self.assertLessEqual(active[1], 4)  # 2 tickets x (page + feed)
+
+    def test_failures_are_reported_inline(self):
+        results = {r["id"]: r for r in trac.get_many([1, 999])}
+        self.assertIn("404", results[999]["error"])
+        self.assertNotIn("error", results[1])
+
+    def test_retry_after_holds_every_worker(self):
+        trac._backoff_delay.return_value = 0.2
+        times = []
+        lock = threading.Lock()
+        for path, route in ticket_routes(1, 2, 3).items():
+            def record(handler, route=route):
+                with lock:
+                    times.append(time.monotonic())
+                    if len(times) == 1:
+                        return 429, {"Retry-After": "1"}, "slow down"
+                return route
+
+            self.fake.routes[path] = record
+        results = list(trac.get_many([1, 2, 3], workers=1, backend="csv"))
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all("error" not in r for r in results))
+        self.assertEqual(len(times), 5)  # query, three feeds, one retry
+        # The throttled query goes first; everything after waits the hold out.
+        self.assertTrue(all(t - times[0] >= 0.19 for t in sorted(times)[1:]))
+
+
+class TestGetManyCli(_FakeTracMixin, unittest.TestCase):
+    routes = ticket_routes(1, 2)
+
+    def run_cli(self, *args, stdin=""):
+        out = io.StringIO()
+        argv = ["trac.py", "get-many", *args]
+        with mock.patch.object(sys, "argv", argv), \
+                mock.patch.object(sys, "stdin", io.StringIO(stdin)), \
+                contextlib.redirect_stdout(out):
+            try:
+                trac.main()
+                code = 0
+            except SystemExit as exc:
+                code = exc.code
+        return code, out.getvalue()
+
+    def test_ids_from_args_stream_ndjson(self):
+        code, out = self.run_cli("1", "#2")
+        self.assertEqual(code, 0)
+        lines = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(sorted(r["id"] for r in lines), [1, 2])
+
+    def test_ids_from_stdin_and_exit_code_on_failure(self):
+        code, out = self.run_cli("--workers=1", stdin="1\n3\n")
+        self.assertEqual(code, 1)
+        lines = {r["id"]: r for r in map(json.loads, out.splitlines())}
+        self.assertIn("error", lines[3])
+        self.assertEqual(lines[1]["component"], "Migrations")
+
+    def test_bad_id(self):
+        code, out = self.run_cli("x1")
+        self.assertEqual(code, 1)
+        self.assertIn("not a ticket id", out)
+
+
+# --------------------
+# response cache
+# --------------------
+
+
+def etag_route(body, etag='"v1"'):
+    """A route honouring If-None-Match; counts 304s in ``route.not_modified``."""
+
+    def route(handler):
+        if handler.headers.get("If-None-Match") == etag:
+            route.not_modified += 1
+            return 304, {"ETag": etag}, b""
+        return 200, {"ETag": etag, "Last-Modified": "Mon, 22 Dec 2025 10:00:00 GMT"}, body
+
+    route.not_modified = 0
+    return route
+
+
+class TestHttpCache(_FakeTracMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        env = mock.patch.dict("os.environ", {"DJANGO_TRIAGE_CACHE_DIR": self.cache_dir})
+        env.start()
+        self.addCleanup(env.stop)
+        http_cache.configure(ttl=60, offline=False, enabled=True)
+        self.addCleanup(http_cache.configure)  # close the file before rmtree
+        self.page = etag_route("page body")
+        self.fake.routes["/page"] = self.page
+        self.url = f"{self.fake.url}/page"
+
+    def test_fresh_hit_skips_the_network(self):
+        self.assertEqual(trac._request_text(self.url), "page body")
+        self.assertEqual(trac._request_text(self.url), "page body")
+        self.assertEqual(self.fake.requests, ["/page"])
+
+    def test_stale_entry_is_revalidated(self):
+        http_cache.configure(ttl=0)
+        trac._request_text(self.url)
+        self.assertEqual(trac._request_text(self.url), "page body")
+        self.assertEqual(len(self.fake.requests), 2)
+        self.assertEqual(self.page.not_modified, 1)
+
+    def test_changed_page_replaces_entry(self):
+        http_cache.configure(ttl=0)
+        trac._request_text(self.url)
+        self.fake.routes["/page"] = etag_route("new body", etag='"v2"')
+        self.assertEqual(trac._request_text(self.url), "new body")
+        self.assertEqual(http_cache.get_cache().get(self.url)["etag"], '"v2"')
+
+    def test_offline_serves_cache_only(self):
+        http_cache.configure(ttl=0)
+        trac._request_text(self.url)
+        http_cache.configure(offline=True)
+        self.assertEqual(trac._request_text(self.url), "page body")
+        with self.assertRaises(http_cache.OfflineError):
+            trac._request_text(f"{self.fake.url}/other")
+        self.assertEqual(self.fake.requests, ["/page"])
+
+    def test_unreachable_serves_stale(self):
+        http_cache.configure(ttl=0)
+        trac._request_text(self.url)
+        self.fake.close()
+        trac.close_connections()
+        with mock.patch.object(trac.time, "sleep"):
+            self.assertEqual(trac._request_text(self.url), "page body")
+
+    def test_http_errors_are_not_masked_by_stale_entry(self):
+        http_cache.configure(ttl=0)
+        trac._request_text(self.url)
+        self.fake.routes["/page"] = (410, {}, "gone")
+        with self.assertRaises(HTTPError):
+            trac._request_text(self.url)
+
+    def test_forum_revalidates_through_urlopen(self):
+        http_cache.configure(ttl=0)
+        self.fake.routes["/t/1.json"] = topic = etag_route(b'{"id": 1, "title": "T"}')
+        with mock.patch.object(forum, "FORUM_BASE_URL", self.fake.url):
+            self.assertEqual(forum.get_topic(1)["title"], "T")
+            self.assertEqual(forum.get_topic(1)["title"], "T")
+        self.assertEqual(topic.not_modified, 1)
+
+    def test_cli_flags_are_consumed(self):
+        rest = http_cache.pop_cli_flags(["get", "--offline", "1", "--cache-ttl=5"])
+        self.assertEqual(rest, ["get", "1"])
+        self.assertTrue(http_cache.OFFLINE)
+        self.assertEqual(http_cache.TTL, 5)
+
+    def test_bad_cache_ttl_is_a_cli_error(self):
+        for value in ("abc", "-1", "nan"):
+            for module, name in ((trac, "trac.py"), (forum, "forum.py")):
+                out = io.StringIO()
+                argv = [name, "search", "x", f"--cache-ttl={value}"]
+                with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(out):
+                    with self.assertRaises(SystemExit) as ctx:
+                        module.main()
+                self.assertEqual(ctx.exception.code, 1)
+                self.assertIn("Error: --cache-ttl", out.getvalue())
+
+    def test_revalidates_by_default(self):
+        self.assertEqual(http_cache.DEFAULT_TTL, 0)
+        http_cache.configure(ttl=http_cache.DEFAULT_TTL)
+        trac._request_text(self.url)
+        trac._request_text(self.url)
+        self.assertEqual(self.page.not_modified, 1)
+
+    def test_old_entries_are_pruned_on_open(self):
+        trac._request_text(self.url)
+        cache = http_cache.get_cache()
+        with cache.lock, cache.db:
+            cache.db.execute(
+                "UPDATE responses SET stored_at = ?", (time.time() - http_cache.MAX_AGE - 1,)
+            )
+        http_cache.configure()  # reopen
+        self.assertIsNone(http_cache.get_cache().get(self.url))
+
+
+# --------------------
+# search
+# --------------------
+
+
+def search_route(total, per_page=10):
+    """``/search`` paginating ``total`` ticket hits, ``per_page`` at a time."""
+
+    def route(handler):
+        params = parse_qs(urlsplit(handler.path).query)
+        page = int(params.get("page", ["1"])[0])
+        first = (page - 1) * per_page + 1
+        last = min(total, page * per_page)
+        if first > total and page > 1:
+            return 500, {}, "page beyond the end"
+        hits = "".join(
+            f'<dt><a href="/ticket/{i}" class="searchable">#{i}: Database layer: '
+            f"Hit number {i} (closed: duplicate)</a></dt><dd>...</dd>"
+            for i in range(first, last + 1)
+        )
+        head = '<link rel="next" href="/search?page=%d" />' % (page + 1) if last < total else ""
+        return 200, {}, f'<html><head>{head}</head><body><dl id="results">{hits}</dl></body></html>'
+
+    return route
+
+
+class TestSearch(_FakeTracMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.fake.routes["/search"] = search_route(25)
+
+    def pages_requested(self):
+        return [
+            parse_qs(urlsplit(p).query).get("page", ["1"])[0]
+            for p in self.fake.requests if p.startswith("/search")
+        ]
+
+    def test_search_follows_pages_up_to_max_results(self):
+        results = trac.search("hit", max_results=15)
+        self.assertEqual([r["id"] for r in results], list(range(1, 16)))
+        self.assertEqual(results[0], {
+            "id": 1, "summary": "Hit number 1", "status": "closed", "resolution": "duplicate",
+        })
+        self.assertEqual(self.pages_requested(), ["1", "2"])
+
+    def test_iter_search_stops_after_last_page(self):
+        self.assertEqual(len(list(trac.iter_search("hit"))), 25)
+        self.assertEqual(self.pages_requested(), ["1", "2", "3"])
+
+    def test_iter_search_is_lazy(self):
+        hits = trac.iter_search("hit", prefetch=False)
+        self.assertEqual(next(hits)["id"], 1)
+        self.assertEqual(self.pages_requested(), ["1"])
+        hits.close()
+
+    def test_prefetch_requests_next_page_before_it_is_needed(self):
+        hits = trac.iter_search("hit")
+        self.assertEqual(next(hits)["id"], 1)
+        deadline = time.monotonic() + 5
+        while len(self.pages_requested()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.pages_requested(), ["1", "2"])
+        self.assertEqual([h["id"] for h in hits], list(range(2, 26)))
+        self.assertEqual(self.pages_requested(), ["1", "2", "3"])
+
+    def test_max_pages(self):
+        self.assertEqual(len(list(trac.iter_search("hit", max_pages=2))), 20)
+        self.assertEqual(self.pages_requested(), ["1", "2"])
+
+    def test_no_results(self):
+        self.fake.routes["/search"] = (200, {}, "<html><p>No matches found.</p></html>")
+        self.assertEqual(trac.search("zzz"), [])
+
+    def run_cli(self, *args):
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", ["trac.py", "search", *args]), \
+                contextlib.redirect_stdout(out):
+            try:
+                trac.main()
+                code = 0
+            except SystemExit as exc:
+                code = exc.code
+        return code, out.getvalue()
+
+    def test_cli_limit(self):
+        code, out = self.run_cli("hit", "--limit=12")
+        self.assertEqual(code, 0)
+        self.assertEqual(len(json.loads(out)), 12)
+        for bad in ("x", "0", "-3"):
+            code, out = self.run_cli("hit", f"--limit={bad}")
+            self.assertEqual(code, 1)
+            self.assertTrue(out.startswith("Error:"))
+
+
+# --------------------
+# local mirror
+# --------------------
+
+
+def timeline_route(*ticket_ids):
+    """``/timeline?format=rss`` listing changes to ``ticket_ids``.
+
+    Like Trac, the feed stops at 50 events unless ``max`` says otherwise.
+    """
+
+    def route(handler):
+        limit = int(parse_qs(urlsplit(handler.path).query).get("max", ["50"])[0])
+        shown = ticket_ids[:limit] if limit else ticket_ids
+        items = "".join(
+            f"<item><title>Ticket #{i} updated</title>"
+            f"<link>https://code.djangoproject.com/ticket/{i}#comment:1</link></item>"
+            for i in shown
+        )
+        return 200, {}, f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+    return route
+
+
+MIRROR_OVERRIDES = {
+    2: {"summary": "Admin widget ignores timezone", "keywords": "admin",
+        "description": "The date widget shows UTC."},
+    3: {"summary": "Docs typo", "keywords": "",
+        "description": "Unrelated to renaming a field, but mentions it."},
+}
+
+
+class TestMirror(_FakeTracMixin, unittest.TestCase):
+    routes = ticket_routes(1, 2, 3)
+
+    def setUp(self):
+        super().setUp()
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        self.db = tmp / "mirror.sqlite3"
+        self.changed = [1, 2]
+        self.fake.routes["/query"] = query_route([1, 2, 3], MIRROR_OVERRIDES, self.changed)
+
+    def changed_days(self):
+        """How far back each ``changetime`` query looked, in whole days."""
+        days = []
+        for path in self.fake.requests:
+            since = parse_qs(urlsplit(path).query).get("changetime")
+            if since:
+                start = datetime.fromisoformat(since[0].rstrip(".").replace("Z", "+00:00"))
+                days.append(round((datetime.now(timezone.utc) - start) / timedelta(days=1)))
+        return days
+
+    def test_first_sync_covers_default_window(self):
+        result = trac.sync(self.db)
+        self.assertEqual(result, {
+            "synced": 2, "failed": [], "source": "changed",
+            "days": trac.SYNC_DEFAULT_DAYS, "tickets": 2,
+        })
+        self.assertEqual(self.changed_days(), [trac.SYNC_DEFAULT_DAYS])
+
+    def test_changes_beyond_the_timeline_feed_cap_are_synced(self):
+        ids = list(range(1, 61))
+        self.fake.routes.update(ticket_routes(*ids))
+        self.fake.routes["/timeline"] = timeline_route(*ids)
+        self.fake.routes["/query"] = query_route(ids, changed=ids)
+        result = trac.sync(self.db)
+        self.assertEqual((result["synced"], result["tickets"]), (60, 60))
+        self.assertFalse(any(p.startswith("/timeline") for p in self.fake.requests))
+
+    def test_mirror_stores_csv_fields_only(self):
+        self.fake.routes["/query"] = query_route([1], changed=[1, 2])  # 2 not exported
+        result = trac.sync(self.db)
+        self.assertEqual((result["synced"], result["failed"]), (1, [2]))
+        self.assertFalse(any(p.startswith("/ticket/") and "?" not in p for p in self.fake.requests))
+        with contextlib.closing(trac.open_mirror(self.db)) as db:
+            data = json.loads(db.execute("SELECT data FROM tickets").fetchone()[0])
+        self.assertEqual(data["created"], "2025-12-20T08:56:37+00:00")
+
+    def test_next_sync_is_incremental(self):
+        trac.sync(self.db)
+        self.changed[:] = [3]
+        result = trac.sync(self.db)
+        self.assertEqual((result["synced"], result["days"], result["tickets"]), (1, 1, 3))
+        self.assertEqual(self.changed_days()[-1], 1)
+
+    def test_failed_tickets_are_retried(self):
+        self.changed[:] = [1, 404]
+        self.assertEqual(trac.sync(self.db)["failed"], [404])
+        self.changed[:] = []
+        self.fake.routes["/ticket/404?format=rss"] = self.fake.routes["/ticket/1?format=rss"]
+        self.fake.routes["/query"] = query_route([1, 404], changed=[])
+        result = trac.sync(self.db)
+        self.assertEqual((result["synced"], result["failed"]), (1, []))
+
+    def test_all_rebuilds_from_query(self):
+        result = trac.sync(self.db, all_tickets=True)
+        self.assertEqual((result["source"], result["tickets"]), ("query", 3))
+        self.assertEqual(self.changed_days(), [])
+
+    def test_search_local_ranks_and_matches_all_words(self):
+        trac.sync(self.db, all_tickets=True)
+        self.assertEqual(
+            [r["id"] for r in trac.search_local("renaming field", db_path=self.db)], [1, 3]
+        )
+        hits = trac.search_local("timezone widget", db_path=self.db)
+        self.assertEqual(hits, [{
+            "id": 2, "summary": "Admin widget ignores timezone",
+            "status": "new", "resolution": "",
+        }])
+        self.assertEqual(trac.search_local("renaming nonexistentword", db_path=self.db), [])
+
+    def test_search_local_treats_query_as_plain_words(self):
+        trac.sync(self.db, all_tickets=True)
+        # FTS5 operators are just words to match: no syntax errors.
+        self.assertEqual(trac.search_local('crash" NEAR(', db_path=self.db), [])
+        self.assertEqual(trac.search_local('timezone" (', db_path=self.db)[0]["id"], 2)
+        self.assertEqual(trac.search_local("--", db_path=self.db), [])
+
+    def test_resync_replaces_index_entry(self):
+        trac.sync(self.db, all_tickets=True)
+        self.fake.routes["/query"] = query_route(
+            [1], {1: {"summary": "Renamed summary"}}, changed=[1]
+        )
+        trac.sync(self.db)
+        self.assertEqual(trac.search_local("when", db_path=self.db), [])
+        self.assertEqual(trac.search_local("renamed", db_path=self.db)[0]["id"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()